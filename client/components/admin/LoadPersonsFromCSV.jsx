@@ -40,7 +40,10 @@ const LoadPersonsFromCSV = ({ onSuccess }) => {
         // Polling loop
         const pollInterval = setInterval(async () => {
           try {
-            const pollResult = await personService.loadPersonsFromCSV();
+            // The load runs as a persistent job: poll /jobs/{id}
+            const pollResult = data.job_id
+              ? await personService.getJob(data.job_id)
+              : await personService.loadPersonsFromCSV();
 
             if (pollResult.success) {
               const pollData = pollResult.data;
@@ -58,12 +61,12 @@ const LoadPersonsFromCSV = ({ onSuccess }) => {
                 });
                 toast.success(message);
                 if (onSuccess) onSuccess(pollData);
-              } else if (pollData.status === 'failed') {
+              } else if (pollData.status === 'failed' || pollData.status === 'cancelled') {
                 clearInterval(pollInterval);
                 setLoading(false);
                 setLastResult({ type: 'danger', message: pollData.message || 'Error en la carga' });
                 toast.error(pollData.message || 'Error en la carga');
-              } else if (pollData.status === 'loading') {
+              } else if (pollData.status === 'loading' || pollData.status === 'running') {
                 // Update progress
                 setLastResult(prev => ({
                   ...prev,
@@ -58,6 +58,15 @@ class LogsService {
         queryParams.append('size', filters.size.toString());
       }
       
+      // Paginación por cursor (next_cursor de la respuesta anterior)
+      if (filters.cursor) {
+        queryParams.append('cursor', filters.cursor);
+      }
+      
+      if (filters.include_total) {
+        queryParams.append('include_total', 'true');
+      }
+      
       const url = `${this.baseURL}/logs${queryParams.toString() ? '?' + queryParams.toString() : ''}`;
       
       const response = await fetch(url, {
@@ -117,9 +117,40 @@ class PersonService extends BaseService {
     }
   }
 
-  // Obtener archivos de una persona
+  // Obtener archivos de una persona (el listado es paginado: se recorren
+  // todas las páginas siguiendo X-Next-Cursor)
   async getPersonFiles(personId) {
-    return this.get(`/files/person/${personId}`);
+    const files = [];
+    let cursor = null;
+
+    try {
+      do {
+        const params = new URLSearchParams({ limit: '500' });
+        if (cursor) params.append('cursor', cursor);
+
+        const response = await this.fetch(
+          `${this.baseURL}/files/person/${personId}?${params.toString()}`,
+          { method: 'GET', headers: this.getHeaders() }
+        );
+        const data = await response.json().catch(() => ({}));
+
+        if (!response.ok) {
+          return {
+            success: false,
+            error: data.detail || data.message || 'Error en la solicitud',
+            status: response.status
+          };
+        }
+
+        files.push(...data);
+        cursor = response.headers.get('X-Next-Cursor');
+      } while (cursor);
+
+      return { success: true, data: files };
+    } catch (error) {
+      console.error('PersonService.getPersonFiles error:', error);
+      return { success: false, error: error.message || 'Error de conexión' };
+    }
   }
 
   // Eliminar un archivo de una persona
@@ -287,9 +318,10 @@ class PersonService extends BaseService {
     }
   }
 
-  // Nota: el endpoint /persons/load-csv/status/ fue removido del backend.
-  // Ya no existe `getLoadCsvStatus` porque ahora el backend devuelve
-  // el resultado final tras el bulk create.
+  // Estado de una tarea en segundo plano (p. ej. la carga del padrón)
+  async getJob(jobId) {
+    return this.get(`/jobs/${jobId}`);
+  }
 }
 
 export default new PersonService();
\ No newline at end of file
@@ -252,8 +252,9 @@ class RecordService {
     }
   }
 
-  // Método para buscar antecedentes
-  async searchRecords(searchTerm = null, filters = {}) {
+  // Método para buscar antecedentes (paginado: `cursor` es el nextCursor
+  // de la página anterior)
+  async searchRecords(searchTerm = null, filters = {}, cursor = null) {
     try {
       const token = this.getAuthToken();
 
@@ -272,6 +273,7 @@ class RecordService {
       if (filters.date_from) params.append('date_from', filters.date_from);
       if (filters.date_to) params.append('date_to', filters.date_to);
       if (filters.person_name) params.append('person_name', filters.person_name);
+      if (cursor) params.append('cursor', cursor);
 
       const url = `${this.baseURL}/records/search?${params.toString()}`;
       const headers = this.getHeaders();
@@ -283,18 +285,14 @@ class RecordService {
 
       if (response.ok) {
         const data = await response.json();
+        // Cursor de la página siguiente (null si no hay más resultados)
+        const nextCursor = response.headers.get('X-Next-Cursor');
 
-        // Si la respuesta es directamente un array, devolverla como data
-        if (Array.isArray(data)) {
-          return { success: true, data: data };
-        }
-
-        // Si es un objeto, devolver tal como está
-        return { success: true, data: data };
+        return { success: true, data: data, nextCursor: nextCursor };
       } else {
         // Si es 404, devolver array vacío
         if (response.status === 404) {
-          return { success: true, data: [] };
+          return { success: true, data: [], nextCursor: null };
         }
 
         const errorData = await response.json().catch(() => ({}));
@@ -63,6 +63,11 @@ export default function LogsPage() {
   const [pageSize, setPageSize] = useState(10);
   const [totalPages, setTotalPages] = useState(0);
   const [totalLogs, setTotalLogs] = useState(0);
+  // El total por defecto es aproximado (estadísticas de la tabla)
+  const [totalIsEstimate, setTotalIsEstimate] = useState(false);
+  // Paginación por cursor: cursors[i] es el cursor para pedir la página i + 1
+  const [cursors, setCursors] = useState([null]);
+  const [nextCursor, setNextCursor] = useState(null);
   
   const [isPermissionError, setIsPermissionError] = useState(false);
 
@@ -83,13 +88,19 @@ export default function LogsPage() {
     };
   }, [isAdmin, page, pageSize]);
 
-  const loadLogs = async () => {
+  const loadLogs = async (targetPage = page) => {
     setLoading(true);
     // Asegurarse de que no haya falsos positivos en errores de permisos
     setIsPermissionError(false);
     try {
       // Convertir fechas si están presentes
-      const apiFilters = { ...filters, page, size: pageSize };
+      // El total (COUNT) solo se pide en la primera página
+      const apiFilters = {
+        ...filters,
+        size: pageSize,
+        cursor: targetPage > 1 ? cursors[targetPage - 1] : null,
+        include_total: targetPage === 1,
+      };
       
       if (filters.start_date) {
         apiFilters.start_date = new Date(filters.start_date);
@@ -107,8 +118,12 @@ export default function LogsPage() {
       if (result.success) {
         if (result.data.data) {
             setLogs(result.data.data);
-            setTotalPages(result.data.pages);
-            setTotalLogs(result.data.total);
+            setNextCursor(result.data.next_cursor || null);
+            if (result.data.total !== null && result.data.total !== undefined) {
+              setTotalPages(result.data.pages);
+              setTotalLogs(result.data.total);
+              setTotalIsEstimate(result.data.total_mode === 'estimated');
+            }
         } else {
             setLogs(result.data);
             setTotalLogs(result.data.length);
@@ -163,10 +178,17 @@ export default function LogsPage() {
     }));
   };
 
+  const goToNextPage = () => {
+    if (!nextCursor) return;
+    setCursors(prev => [...prev.slice(0, page), nextCursor]);
+    setPage(page + 1);
+  };
+
   const handleSubmitFilters = (e) => {
     e.preventDefault();
+    setCursors([null]);
     setPage(1);
-    loadLogs();
+    loadLogs(1);
   };
 
   const handleClearFilters = () => {
@@ -176,8 +198,9 @@ export default function LogsPage() {
       action: '',
       entity_type: '',
     });
+    setCursors([null]);
     setPage(1);
-    loadLogs();
+    loadLogs(1);
   };
 
   // Si no es admin, mostrar mensaje de error
@@ -405,7 +428,7 @@ export default function LogsPage() {
                 </h6>
                 {logs.length > 0 && (
                   <Badge bg="primary" pill className="px-3">
-                    {totalLogs} registros
+                    {totalIsEstimate ? '≈ ' : ''}{totalLogs} registros
                   </Badge>
                 )}
               </div>
@@ -510,24 +533,18 @@ export default function LogsPage() {
                 
                 <div className="d-flex justify-content-between align-items-center p-3 border-top bg-light bg-opacity-10">
                   <div className="text-muted small">
-                    Mostrando {logs.length} de {totalLogs} registros
+                    Mostrando {logs.length} de {totalIsEstimate ? '≈ ' : ''}{totalLogs} registros
                   </div>
                   <Pagination className="mb-0 shadow-sm">
                     <Pagination.First onClick={() => setPage(1)} disabled={page === 1} />
                     <Pagination.Prev onClick={() => setPage(prev => Math.max(prev - 1, 1))} disabled={page === 1} />
                     
-                    {page > 2 && <Pagination.Item onClick={() => setPage(1)}>1</Pagination.Item>}
-                    {page > 3 && <Pagination.Ellipsis />}
-                    
                     {page > 1 && <Pagination.Item onClick={() => setPage(page - 1)}>{page - 1}</Pagination.Item>}
                     <Pagination.Item active>{page}</Pagination.Item>
-                    {page < totalPages && <Pagination.Item onClick={() => setPage(page + 1)}>{page + 1}</Pagination.Item>}
-                    
-                    {page < totalPages - 2 && <Pagination.Ellipsis />}
-                    {page < totalPages - 1 && <Pagination.Item onClick={() => setPage(totalPages)}>{totalPages}</Pagination.Item>}
+                    {nextCursor && <Pagination.Item onClick={goToNextPage}>{page + 1}</Pagination.Item>}
+                    {nextCursor && page + 1 < totalPages && <Pagination.Ellipsis disabled />}
                     
-                    <Pagination.Next onClick={() => setPage(prev => Math.min(prev + 1, totalPages))} disabled={page === totalPages} />
-                    <Pagination.Last onClick={() => setPage(totalPages)} disabled={page === totalPages} />
+                    <Pagination.Next onClick={goToNextPage} disabled={!nextCursor} />
                   </Pagination>
                 </div>
                 </>
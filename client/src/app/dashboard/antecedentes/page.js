@@ -12,6 +12,10 @@ export default function RecordsList() {
   const [records, setRecords] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  // Paginación de la búsqueda: cursor de la página siguiente (X-Next-Cursor)
+  const [nextCursor, setNextCursor] = useState(null);
+  const [lastSearch, setLastSearch] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const ANTECEDENT_TYPES = [
     { value: 'ROBO', label: 'Robo' },
@@ -40,6 +44,7 @@ export default function RecordsList() {
 
       if (result.success) {
         setRecords(Array.isArray(result.data) ? result.data : []);
+        setNextCursor(null);
       } else {
         toast.error(result.error || 'Error al cargar los antecedentes');
       }
@@ -81,6 +86,9 @@ export default function RecordsList() {
 
       if (result.success) {
         setRecords(Array.isArray(result.data) ? result.data : []);
+        setNextCursor(result.nextCursor || null);
+        // El cursor solo vale para la misma búsqueda
+        setLastSearch({ term: searchTerm, filters: effectiveFilters });
       } else {
         toast.error(result.error || 'Error al buscar antecedentes');
       }
@@ -92,6 +100,32 @@ export default function RecordsList() {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor || !lastSearch) return;
+
+    try {
+      setLoadingMore(true);
+      const result = await recordService.searchRecords(
+        lastSearch.term,
+        lastSearch.filters,
+        nextCursor
+      );
+
+      if (result.success) {
+        const more = Array.isArray(result.data) ? result.data : [];
+        setRecords(prev => [...prev, ...more]);
+        setNextCursor(result.nextCursor || null);
+      } else {
+        toast.error(result.error || 'Error al cargar más antecedentes');
+      }
+    } catch (error) {
+      console.error('Error loading more records:', error);
+      toast.error('Error inesperado al cargar más antecedentes');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleFilterChange = (e) => {
     const { name, value } = e.target;
     setFilters(prev => ({
@@ -364,9 +398,10 @@ export default function RecordsList() {
                         onClick={() => handleViewRecord(record.record_id)}
                       >
                         <Badge bg="secondary" className="py-1 px-2">
-                          {(record.person_relationships?.length ||
-                            record.personRelationships?.length ||
-                            record.relationships?.length || 0)} personas
+                          {record.person_count ??
+                            (record.person_relationships?.length ||
+                              record.personRelationships?.length ||
+                              record.relationships?.length || 0)} personas
                         </Badge>
                       </td>
                       <td className="py-3 text-center">
@@ -415,6 +450,24 @@ export default function RecordsList() {
               </tbody>
             </Table>
           </div>
+          {!loading && nextCursor && (
+            <Card.Footer className="bg-light border-1 py-3 text-center">
+              <Button
+                variant="outline-dark"
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+              >
+                {loadingMore ? (
+                  <>
+                    <Spinner animation="border" size="sm" className="me-2" />
+                    Cargando...
+                  </>
+                ) : (
+                  'Cargar más'
+                )}
+              </Button>
+            </Card.Footer>
+          )}
         </Card>
       </Container>
     </DashboardLayout>
@@ -16,3 +16,40 @@ if os.getenv("TOKEN_EXPIRATION_MINUTES"):
 else:
     token_expires_minutes = 60
 
+
+# Cache de roles por usuario (dependencies/checked_role.get_role)
+role_cache_ttl_seconds = float(os.getenv("ROLE_CACHE_TTL_SECONDS", 60))
+role_cache_max_size = int(os.getenv("ROLE_CACHE_MAX_SIZE", 1024))
+
+# Escritor de auditoría en segundo plano (services/logs_writer.py)
+log_writer_queue_size = int(os.getenv("LOG_WRITER_QUEUE_SIZE", 10000))
+log_writer_batch_size = int(os.getenv("LOG_WRITER_BATCH_SIZE", 200))
+log_writer_flush_interval = float(os.getenv("LOG_WRITER_FLUSH_INTERVAL", 1.0))
+
+# Cache de claves derivadas por salt (utils/file_encryption.py)
+file_key_cache_size = int(os.getenv("FILE_KEY_CACHE_SIZE", 4096))
+
+# Pools de workers para trabajo bloqueante (utils/executors.py)
+executor_thread_workers = int(os.getenv("EXECUTOR_THREAD_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+executor_process_workers = int(os.getenv("EXECUTOR_PROCESS_WORKERS", os.cpu_count() or 1))
+
+# Importación del padrón (services/padron_import.py)
+padron_csv_path = os.getenv("PADRON_CSV_PATH", "padron.csv")
+padron_import_batch_size = int(os.getenv("PADRON_IMPORT_BATCH_SIZE", 2000))
+
+# Registro de tareas en segundo plano (services/jobs_services.py)
+job_lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", 60))
+job_heartbeat_interval = float(os.getenv("JOB_HEARTBEAT_INTERVAL", 10))
+
+# Totales del listado de logs (services/logs_services.py)
+logs_count_cache_ttl_seconds = float(os.getenv("LOGS_COUNT_CACHE_TTL_SECONDS", 60))
+logs_count_cache_max_size = int(os.getenv("LOGS_COUNT_CACHE_MAX_SIZE", 256))
+
+# Retención y archivo de logs por mes (services/logs_retention.py)
+logs_retention_months = int(os.getenv("LOGS_RETENTION_MONTHS", 12))
+logs_archive_dir = os.getenv("LOGS_ARCHIVE_DIR", "./storage/archive/logs")
+logs_partitions_ahead = int(os.getenv("LOGS_PARTITIONS_AHEAD", 3))
+logs_retention_batch_size = int(os.getenv("LOGS_RETENTION_BATCH_SIZE", 5000))
+
+# Índice en memoria de vínculos entre personas (services/persons_graph.py)
+connection_index_refresh_seconds = float(os.getenv("CONNECTION_INDEX_REFRESH_SECONDS", 300))
@@ -1,10 +1,20 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, status
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    UploadFile,
+    File,
+    Form,
+    Depends,
+    Header,
+    Query,
+    Response,
+    status,
+)
 from database.db import get_db
 from fastapi.responses import StreamingResponse, JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.files_services import FilesService
-from sqlalchemy import select
 from models.schemas.file_schemas import (
     FileResponse,
     FileListResponse,
@@ -13,6 +23,9 @@ from models.schemas.file_schemas import (
 from typing import List, Optional, Dict
 import io
 from dependencies.is_auth import is_authenticated
+from utils.http_range import RangeNotSatisfiableError
+from utils.pagination import InvalidCursorError, page_headers
+from utils.file_encryption import FileValidator, FileTooLargeError
 from dependencies.checked_role import check_rol_all, check_rol_all_or_viewer
 
 router = APIRouter(tags=["Files"], prefix="/files")
@@ -47,23 +60,15 @@ async def upload_file(
                 detail="No se proporcionó ningún archivo",
             )
 
-        # Leer contenido del archivo
-        file_content = await file.read()
-        file_size = len(file_content)
-
-        if file_size == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="El archivo está vacío"
-            )
-
-        # Crear stream de memoria
-        file_stream = io.BytesIO(file_content)
+        # Rechazar antes de leer si el tamaño ya se conoce
+        if file.size is not None:
+            FileValidator.validate_file_size(file.size)
 
-        # Subir archivo usando el servicio
+        # Subir archivo usando el servicio (lee y encripta por bloques)
         uploaded_file = await files_service.upload_file(
-            file_stream=file_stream,
+            upload=file,
             original_filename=file.filename,
-            file_size=file_size,
+            file_size=file.size,
             mime_type=file.content_type or "application/octet-stream",
             person_id=person_id,
             uploaded_by=current_user["user_id"],
@@ -80,6 +85,12 @@ async def upload_file(
 
         return uploaded_file
 
+    except HTTPException:
+        raise
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -117,6 +128,7 @@ async def get_file_info(
 @router.get("/{file_id}/download")
 async def download_file(
     file_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
     current_user: Dict = Depends(is_authenticated),
     is_authorized: bool = Depends(check_rol_all_or_viewer),
     db: AsyncSession = Depends(get_db),
@@ -127,21 +139,27 @@ async def download_file(
             detail="No tienes permiso para descargar archivos",
         )
     """
-    Descarga un archivo del sistema
+    Descarga un archivo del sistema (soporta Range / 206 Partial Content)
     """
     try:
-        print(f"DEBUG: Intentando descargar archivo con ID: {file_id}")
-        file_data, original_filename, mime_type = await files_service.download_file(
-            file_id, db
-        )
+        download = await files_service.download_file(file_id, db, range_header)
+
+        headers = {
+            "Content-Disposition": f'attachment; filename="{download.original_filename}"',
+            "Content-Length": str(download.content_length),
+            "Accept-Ranges": "bytes",
+        }
+        status_code = status.HTTP_200_OK
+        if download.byte_range:
+            start, end = download.byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{download.total_size}"
+            status_code = status.HTTP_206_PARTIAL_CONTENT
 
         return StreamingResponse(
-            io.BytesIO(file_data),
-            media_type=mime_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{original_filename}"',
-                "Content-Length": str(len(file_data)),
-            },
+            download.chunks,
+            status_code=status_code,
+            media_type=download.mime_type,
+            headers=headers,
         )
 
     except FileNotFoundError:
@@ -149,6 +167,12 @@ async def download_file(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Archivo no encontrado"
         )
+    except RangeNotSatisfiableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail=str(e),
+            headers={"Content-Range": f"bytes */{e.total_size}"},
+        )
     except ValueError as e:
         print(f"ERROR: Valor inválido para file_id {file_id}: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -163,6 +187,10 @@ async def download_file(
 @router.get("/person/{person_id}", response_model=List[FileListResponse])
 async def get_files_by_person(
     person_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor X-Next-Cursor de la página anterior"),
+    include_total: bool = Query(False, description="Incluir X-Total-Count (hace un COUNT)"),
     current_user: Dict = Depends(is_authenticated),
     is_authorized: bool = Depends(check_rol_all),
     db: Session = Depends(get_db),
@@ -173,15 +201,25 @@ async def get_files_by_person(
             detail="No tienes permiso para ver archivos de personas",
         )
     """
-    Obtiene todos los archivos de una persona específica
+    Obtiene los archivos de una persona específica (paginado por cursor)
     """
-    files = await files_service.get_files_by_person(person_id, db)
-    return files
+    try:
+        page = await files_service.get_files_by_person(
+            person_id, db, limit=limit, cursor=cursor, with_total=include_total
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers.update(page_headers(page))
+    return page.items
 
 
 @router.get("/record/{record_id}", response_model=List[FileListResponse])
 async def get_files_by_record(
     record_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor X-Next-Cursor de la página anterior"),
+    include_total: bool = Query(False, description="Incluir X-Total-Count (hace un COUNT)"),
     current_user: Dict = Depends(is_authenticated),
     is_authorized: bool = Depends(check_rol_all_or_viewer),
     db: Session = Depends(get_db),
@@ -192,10 +230,16 @@ async def get_files_by_record(
             detail="No tienes permiso para ver archivos de registros",
         )
     """
-    Obtiene todos los archivos asociados a un record específico
+    Obtiene los archivos asociados a un record específico (paginado por cursor)
     """
-    files = await files_service.get_files_by_record(record_id, db)
-    return files
+    try:
+        page = await files_service.get_files_by_record(
+            record_id, db, limit=limit, cursor=cursor, with_total=include_total
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    response.headers.update(page_headers(page))
+    return page.items
 
 
 @router.put("/{file_id}", response_model=FileResponse)
@@ -310,29 +354,26 @@ async def get_file_stats(
 
 @router.get("", response_model=List[FileListResponse])
 async def list_all_files(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor X-Next-Cursor de la página anterior"),
+    include_total: bool = Query(False, description="Incluir X-Total-Count (hace un COUNT)"),
     file_type: Optional[str] = None,
     current_user: Dict = Depends(is_authenticated),
     db: Session = Depends(get_db),
 ):
     """
-    Lista todos los archivos del sistema con paginación
+    Lista todos los archivos del sistema con paginación por cursor
     """
     try:
-        # Construir query base
-        stm = select(files_service.fileModel).filter(files_service.fileModel.is_active)
-        query = db.execute(stm)
-
-        # Filtrar por tipo si se especifica
-        if file_type:
-            query = query.filter(files_service.fileModel.file_type == file_type)
-
-        # Aplicar paginación
-        files = query.offset(skip).limit(limit).all()
-
-        return files
+        page = await files_service.list_files(
+            db, limit=limit, cursor=cursor, file_type=file_type, with_total=include_total
+        )
+        response.headers.update(page_headers(page))
+        return page.items
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.db import get_db
+from dependencies.is_auth import is_authenticated
+from dependencies.checked_role import check_rol_admin
+from models.schemas.job_schemas import JobResponse
+from services.jobs_services import jobs_service
+
+router = APIRouter(tags=["Jobs"], prefix="/jobs")
+
+
+def _require_admin(is_admin: bool):
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tiene permisos para acceder a las tareas",
+        )
+
+
+@router.get("", status_code=status.HTTP_200_OK, response_model=List[JobResponse])
+async def list_jobs(
+    job_type: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Dict = Depends(is_authenticated),
+    is_admin: bool = Depends(check_rol_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Lista las tareas en segundo plano más recientes
+    """
+    _require_admin(is_admin)
+    return await jobs_service.list_jobs(db, job_type=job_type, limit=limit)
+
+
+@router.get("/{job_id}", status_code=status.HTTP_200_OK, response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: Dict = Depends(is_authenticated),
+    is_admin: bool = Depends(check_rol_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Estado, avance y lease de una tarea (visible desde cualquier worker)
+    """
+    _require_admin(is_admin)
+    try:
+        job = await jobs_service.get_job(job_id, db)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="ID de tarea inválido"
+        )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada"
+        )
+    return job
+
+
+@router.post("/{job_id}/cancel", status_code=status.HTTP_200_OK, response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: Dict = Depends(is_authenticated),
+    is_admin: bool = Depends(check_rol_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Pide la cancelación de una tarea activa; se detiene en su próximo punto de control
+    """
+    _require_admin(is_admin)
+    try:
+        job = await jobs_service.request_cancel(job_id, db)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="ID de tarea inválido"
+        )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tarea no encontrada"
+        )
+    return job
@@ -1,11 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from typing import Dict, Optional
+from typing import Dict, Literal, Optional
 from database.db import get_db
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from models.schemas.logs_schemas import PaginatedLogResponse
-from services.logs_services import logs_service
-from middlewares.auth_middlewares import is_autenticate as is_authenticated
+from models.schemas.job_schemas import JobResponse
+from services.logs_services import logs_service, COUNT_ESTIMATED
+from services.logs_rollup import start_rollup_backfill
+from services.logs_retention import start_retention
+from config.config import logs_retention_months
+from services.jobs_services import JobConflictError
+from dependencies.is_auth import is_authenticated
 from dependencies.checked_role import check_rol_admin
+from utils.pagination import InvalidCursorError
 
 
 router = APIRouter(prefix="/logs", tags=["logs"])
@@ -22,12 +28,25 @@ async def get_logs(
     current_user: Dict = Depends(is_authenticated),
     is_admin: bool = Depends(check_rol_admin),
     db_session=Depends(get_db),
-    page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    include_total: bool = Query(False, description="Calcular total y pages"),
+    count_mode: Literal["exact", "estimated", "cached"] = Query(
+        COUNT_ESTIMATED,
+        description="exact: COUNT(*); estimated: estadísticas de la tabla; cached: COUNT con TTL",
+    ),
+    page: Optional[int] = Query(
+        None, ge=1, description="Paginación por OFFSET (obsoleto, usar cursor)"
+    ),
 ):
     """
     Obtiene los registros de logs con filtros opcionales.
     Solo disponible para administradores.
+
+    Se pagina por cursor: cada respuesta trae `next_cursor` para pedir la
+    siguiente página. El total solo se calcula con `include_total=true`, con
+    la estrategia de `count_mode` (por defecto aproximado, en tiempo constante).
+    `page` (OFFSET) se mantiene por compatibilidad y siempre calcula el total.
     """
     if not is_admin:
         raise HTTPException(
@@ -48,14 +67,25 @@ async def get_logs(
         if user_id:
             filters["user_id"] = user_id
 
-        # Calcular skip
-        skip = (page - 1) * size
-
-        # Obtener total de registros
-        total = await logs_service.count_logs(db_session, filters)
+        next_cursor = None
+        legacy_paging = page is not None and not cursor
+        if legacy_paging:
+            # Paginación por OFFSET (compatibilidad)
+            skip = (page - 1) * size
+            logs = await logs_service.get_logs(db_session, skip, size, filters)
+        else:
+            result_page = await logs_service.get_logs_page(
+                db_session, limit=size, cursor=cursor, filters=filters
+            )
+            logs = result_page.items
+            next_cursor = result_page.next_cursor
 
-        # Obtener logs paginados
-        logs = await logs_service.get_logs(db_session, skip, size, filters)
+        total = None
+        total_mode = None
+        if include_total or legacy_paging:
+            total, total_mode = await logs_service.count_logs_with_mode(
+                db_session, filters, count_mode
+            )
 
         # Enriquecer los resultados con información del usuario
         response_logs = []
@@ -82,15 +112,19 @@ async def get_logs(
             response_logs.append(log_dict)
 
         # Calcular total de páginas
-        pages = (total + size - 1) // size if size > 0 else 0
+        pages = (total + size - 1) // size if total is not None else None
 
         return {
             "total": total,
             "page": page,
             "size": size,
             "pages": pages,
+            "next_cursor": next_cursor,
+            "total_mode": total_mode,
             "data": response_logs,
         }
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         print(f"Error al obtener logs: {e}")
         raise HTTPException(
@@ -103,6 +137,9 @@ async def get_logs(
 async def get_logs_summary(
     request: Request,
     days: int = Query(7, ge=1, le=30),
+    source: Literal["rollup", "logs"] = Query(
+        "rollup", description="rollup: días completos (rápido); logs: exacto al segundo"
+    ),
     current_user: Dict = Depends(is_authenticated),
     is_admin: bool = Depends(check_rol_admin),
     db_session=Depends(get_db),
@@ -117,59 +154,15 @@ async def get_logs_summary(
             detail="No tiene permisos para acceder a los logs",
         )
     try:
-        start_date = datetime.utcnow() - timedelta(days=days)
-        filters = {"start_date": start_date}
-
-        logs = await logs_service.get_logs(db_session, 0, 1000, filters)
-
-        # Preparar resumen
-        actions_count = {}
-        entities_count = {}
-        users_count = {}
-        daily_activity = {}
+        end_date = datetime.utcnow()
+        start_date = end_date - timedelta(days=days)
 
-        for log in logs:
-            # Contar por tipo de acción
-            if log.action not in actions_count:
-                actions_count[log.action] = 0
-            actions_count[log.action] += 1
-
-            # Contar por tipo de entidad
-            if log.entity_type not in entities_count:
-                entities_count[log.entity_type] = 0
-            entities_count[log.entity_type] += 1
-
-            # Contar por usuario
-            user_key = str(log.user_id) if log.user_id is not None else "anonymous"
-            if user_key not in users_count:
-                # Obtener username de manera segura
-                username = "Anónimo"
-                try:
-                    if log.user and hasattr(log.user, "username"):
-                        username = log.user.username
-                except Exception as e:
-                    print(f"Error al obtener username en resumen: {e}")
-
-                users_count[user_key] = {"count": 0, "username": username}
-            users_count[user_key]["count"] += 1
-
-            # Actividad diaria
-            day_key = log.created_at.strftime("%Y-%m-%d")
-            if day_key not in daily_activity:
-                daily_activity[day_key] = 0
-            daily_activity[day_key] += 1
-
-        summary = {
-            "total_logs": len(logs),
-            "actions": actions_count,
-            "entities": entities_count,
-            "users": users_count,
-            "daily_activity": daily_activity,
-            "period": {
-                "start_date": start_date,
-                "end_date": datetime.utcnow(),
-                "days": days,
-            },
+        summary = await logs_service.get_summary(db_session, start_date, end_date, source=source)
+        summary["period"] = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "days": days,
+            "source": source,
         }
 
         return summary
@@ -179,3 +172,91 @@ async def get_logs_summary(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error interno al obtener el resumen de logs",
         )
+
+
+@router.get("/trends")
+async def get_logs_trends(
+    days: int = Query(90, ge=1, le=730),
+    granularity: Literal["day", "month"] = Query("day"),
+    action: Optional[str] = Query(None),
+    entity_type: Optional[str] = Query(None),
+    current_user: Dict = Depends(is_authenticated),
+    is_admin: bool = Depends(check_rol_admin),
+    db_session=Depends(get_db),
+):
+    """
+    Serie de actividad por día o por mes, leída del rollup diario.
+    Solo disponible para administradores.
+    """
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tiene permisos para acceder a los logs",
+        )
+    end_day = datetime.utcnow().date()
+    start_day = end_day - timedelta(days=days - 1)
+    series = await logs_service.get_trends(
+        db_session, start_day, end_day, granularity, action=action, entity_type=entity_type
+    )
+    return {
+        "granularity": granularity,
+        "period": {"start_date": start_day, "end_date": end_day, "days": days},
+        "series": series,
+    }
+
+
+@router.post(
+    "/rollup/backfill", status_code=status.HTTP_202_ACCEPTED, response_model=JobResponse
+)
+async def backfill_logs_rollup(
+    start_day: Optional[date] = Query(None, alias="from"),
+    end_day: Optional[date] = Query(None, alias="to"),
+    current_user: Dict = Depends(is_authenticated),
+    is_admin: bool = Depends(check_rol_admin),
+):
+    """
+    Reconstruye logs_daily_rollup desde logs para el rango de días dado
+    (por defecto, todo). Corre como tarea: seguirla en /jobs/{job_id}.
+    """
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tiene permisos para acceder a los logs",
+        )
+    if start_day and end_day and start_day > end_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha inicial es posterior a la final",
+        )
+    try:
+        return await start_rollup_backfill(start_day, end_day, current_user["user_id"])
+    except JobConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya hay una reconstrucción en curso ({e.active_job.job_id if e.active_job else ''})",
+        )
+
+
+@router.post("/retention", status_code=status.HTTP_202_ACCEPTED, response_model=JobResponse)
+async def apply_logs_retention(
+    months: int = Query(logs_retention_months, ge=1, description="Meses completos a conservar"),
+    archive: bool = Query(True, description="Exportar cada mes a JSONL comprimido antes de descartarlo"),
+    current_user: Dict = Depends(is_authenticated),
+    is_admin: bool = Depends(check_rol_admin),
+):
+    """
+    Archiva y descarta los meses de logs anteriores a los últimos `months`
+    (por partición en MariaDB/MySQL). Corre como tarea: seguirla en /jobs/{job_id}.
+    """
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tiene permisos para acceder a los logs",
+        )
+    try:
+        return await start_retention(months, archive, current_user["user_id"])
+    except JobConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya hay una retención en curso ({e.active_job.job_id if e.active_job else ''})",
+        )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict
+from dependencies.is_auth import is_authenticated
+from dependencies.checked_role import check_rol_admin
+from utils.role_cache import role_cache
+from services.logs_writer import log_writer
+from utils.metrics import download_metrics
+from utils.file_encryption import FileEncryption
+from utils.executors import executors_stats
+
+router = APIRouter(tags=["Metrics"], prefix="/metrics")
+
+
+@router.get("", status_code=status.HTTP_200_OK)
+async def get_metrics(
+    current_user: Dict = Depends(is_authenticated),
+    is_admin: bool = Depends(check_rol_admin),
+):
+    """
+    Expone métricas internas del proceso (caches, contadores).
+    Solo disponible para administradores.
+    """
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tiene permisos para acceder a las métricas",
+        )
+    return {
+        "role_cache": role_cache.stats(),
+        "log_writer": log_writer.stats(),
+        "downloads": download_metrics.snapshot(),
+        "file_key_cache": FileEncryption.key_cache_stats(),
+        "executors": executors_stats(),
+    }
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi import APIRouter, HTTPException, Query, Response, status, Depends
 from starlette.status import HTTP_200_OK
 from services.persons_services import PersonsService
+from services.persons_search import NAME_MATCH_CONTAINS
+from services.persons_graph import (
+    person_graph,
+    connection_index,
+    GRAPH_MAX_DEPTH,
+    GRAPH_MAX_NODES,
+    PATH_MAX_HOPS,
+)
 from models.schemas.person_schemas import PersonSchema, PersonResponse
+from models.schemas.job_schemas import JobResponse
 from database.db import get_db
-from typing import List, Dict, Optional
+from typing import List, Dict, Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from dependencies.is_auth import is_authenticated
 import logging
@@ -13,7 +22,9 @@ from dependencies.checked_role import (
     check_rol_all_or_viewer,
 )
 from services.logs_services import LogsService
+from utils.pagination import InvalidCursorError, page_headers
 import traceback
+import uuid
 
 router = APIRouter(tags=["Persons"], prefix="/persons")
 person_service = PersonsService()
@@ -22,10 +33,18 @@ logs_services = LogsService()
 
 @router.get("", status_code=status.HTTP_200_OK, response_model=List[PersonResponse])
 async def get_persons(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor X-Next-Cursor de la página anterior"),
+    include_total: bool = Query(False, description="Incluir X-Total-Count (hace un COUNT)"),
     current_user: Dict = Depends(is_authenticated),
     is_authorized: bool = Depends(check_rol_all),
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Lista las personas de la más reciente a la más antigua, paginadas por cursor.
+    El cursor de la página siguiente viaja en el header X-Next-Cursor.
+    """
     if not is_authorized:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,8 +56,11 @@ async def get_persons(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no autenticado"
         )
     try:
-        persons = await person_service.get_persons(db=db)
-        persons_list = list(persons)
+        page = await person_service.get_persons(
+            db=db, limit=limit, cursor=cursor, with_total=include_total
+        )
+        response.headers.update(page_headers(page))
+        persons_list = list(page.items)
 
         if not persons_list or len(persons_list) < 1:
             return []
@@ -46,6 +68,8 @@ async def get_persons(
             PersonResponse.model_validate(person) for person in persons_list
         ]
         return persons_response
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logging.error(f"Error en el servidor al obtener las personas: {e}")
         raise HTTPException(
@@ -114,12 +138,20 @@ async def search_person(
     gender: Optional[str] = Query(None, description="Género"),
     address: Optional[str] = Query(None, description="Dirección"),
     nationality: Optional[str] = Query(None, description="Nacionalidad"),
+    q: Optional[str] = Query(
+        None, description="Búsqueda libre por prefijo o aproximada (ordenada por relevancia)"
+    ),
+    limit: int = Query(100, ge=1, le=100, description="Máximo de resultados"),
+    name_match: Literal["exact", "prefix", "contains"] = Query(
+        NAME_MATCH_CONTAINS,
+        description="Nombres y apellidos: exact, prefix o contains (primero prefijo)",
+    ),
     current_user: Dict = Depends(is_authenticated),
     is_authorized: bool = Depends(check_rol_all_or_viewer),
     db_session: AsyncSession = Depends(get_db),
 ):
     """
-    Busca personas basado en criterios específicos.
+    Busca personas basado en criterios específicos y/o texto libre (`q`).
     Requiere autenticación y rol autorizado (ADMIN, MODERATE, USERS, VIEW).
     """
 
@@ -136,6 +168,9 @@ async def search_person(
             identification=identification,
             address=address,
             country=nationality,
+            q=q,
+            limit=limit,
+            name_match=name_match,
         )
         if not persons:
             return []
@@ -286,6 +321,24 @@ async def load_persons_from_csv(
         )
 
 
+@router.get("/load-csv/status", status_code=status.HTTP_200_OK)
+async def load_persons_status(
+    current_user: Dict = Depends(is_authenticated),
+    is_authorized: bool = Depends(check_rol_admin),
+    db_session: AsyncSession = Depends(get_db),
+):
+    if not is_authorized:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tienes permiso para ver la carga de personas",
+        )
+    # Última carga registrada; el detalle de cada carga está en /jobs/{job_id}
+    job = await person_service.get_load_status(db_session)
+    if not job:
+        return {"status": "idle"}
+    return JobResponse.model_validate(job)
+
+
 @router.delete("/delete/{id}", status_code=status.HTTP_200_OK)
 async def delete_person(
     id: str,
@@ -526,6 +579,113 @@ async def get_linked_persons(
         )
 
 
+def _parse_person_ids(*person_ids: str) -> List[uuid.UUID]:
+    try:
+        return [uuid.UUID(person_id) for person_id in person_ids]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="ID de persona inválido"
+        )
+
+
+def _require_connection_index():
+    if not connection_index.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El índice de vínculos todavía no está cargado",
+        )
+
+
+@router.get("/{person_id}/graph", status_code=status.HTTP_200_OK)
+async def get_person_graph(
+    person_id: str,
+    depth: int = Query(2, ge=1, le=GRAPH_MAX_DEPTH, description="Saltos desde la persona"),
+    max_nodes: int = Query(200, ge=1, le=GRAPH_MAX_NODES, description="Máximo de personas"),
+    current_user: Dict = Depends(is_authenticated),
+    is_authorized: bool = Depends(check_rol_all_or_viewer),
+    db_session: AsyncSession = Depends(get_db),
+):
+    """
+    Grafo de vínculos a `depth` saltos: personas (nodes) y vínculos entre
+    ellas (edges), en una sola consulta recursiva.
+    """
+    if not is_authorized:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tienes permiso para ver las conexiones de personas",
+        )
+    (person_uuid,) = _parse_person_ids(person_id)
+    try:
+        graph = await person_graph.get_graph(db_session, person_uuid, depth, max_nodes)
+    except Exception as e:
+        print(f"Error al obtener el grafo de vínculos: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno en el servidor al obtener el grafo de vínculos",
+        )
+    if graph is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="La persona no existe!"
+        )
+    return graph
+
+
+@router.get("/{person_id}/nearby", status_code=status.HTTP_200_OK)
+async def get_nearby_persons(
+    person_id: str,
+    hops: int = Query(3, ge=1, le=GRAPH_MAX_DEPTH, description="Saltos desde la persona"),
+    max_nodes: int = Query(200, ge=1, le=GRAPH_MAX_NODES, description="Máximo de personas"),
+    current_user: Dict = Depends(is_authenticated),
+    is_authorized: bool = Depends(check_rol_all_or_viewer),
+    db_session: AsyncSession = Depends(get_db),
+):
+    """
+    Personas a `hops` saltos o menos, con su distancia, desde el índice de
+    vínculos en memoria.
+    """
+    if not is_authorized:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tienes permiso para ver las conexiones de personas",
+        )
+    (person_uuid,) = _parse_person_ids(person_id)
+    _require_connection_index()
+    nearby = await person_graph.get_nearby(db_session, person_uuid, hops, max_nodes)
+    if nearby is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="La persona no existe!"
+        )
+    return nearby
+
+
+@router.get("/{person_id}/path/{target_id}", status_code=status.HTTP_200_OK)
+async def get_persons_path(
+    person_id: str,
+    target_id: str,
+    max_hops: int = Query(6, ge=1, le=PATH_MAX_HOPS, description="Saltos máximos"),
+    current_user: Dict = Depends(is_authenticated),
+    is_authorized: bool = Depends(check_rol_all_or_viewer),
+    db_session: AsyncSession = Depends(get_db),
+):
+    """
+    Camino mínimo de vínculos entre dos personas, desde el índice de vínculos
+    en memoria (`path` vacío si no están conectadas).
+    """
+    if not is_authorized:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No tienes permiso para ver las conexiones de personas",
+        )
+    source, target = _parse_person_ids(person_id, target_id)
+    _require_connection_index()
+    path = await person_graph.get_path(db_session, source, target, max_hops)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="La persona no existe!"
+        )
+    return path
+
+
 @router.get("/{person_id}/records", status_code=status.HTTP_200_OK)
 async def get_person_records(
     person_id: str,
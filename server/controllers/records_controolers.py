@@ -4,11 +4,13 @@ from services.records_services import RecordService
 from database.db import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from models.schemas.record_schema import RecordSchema
-from typing import Dict
+from typing import Dict, Optional
 from dependencies.is_auth import is_authenticated
 from dependencies.checked_role import check_rol_all, check_rol_all_or_viewer
 import uuid
 from utils.json_encoder import CustomJSONResponse
+from utils.text_search import RECORD_SEARCH_FIELDS, highlight_snippets, parse_search_query
+from utils.pagination import InvalidCursorError, page_headers
 from services.logs_services import logs_service
 import traceback
 
@@ -18,25 +20,36 @@ record_service = RecordService()
 
 @router.get("", status_code=status.HTTP_200_OK)
 async def get_records(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Cursor X-Next-Cursor de la página anterior"),
+    include_total: bool = Query(False, description="Incluir X-Total-Count (hace un COUNT)"),
     current_user: Dict = Depends(is_authenticated),
     is_authorized: bool = Depends(check_rol_all_or_viewer),
     db_session=Depends(get_db),
 ):
+    """
+    Lista los antecedentes del más reciente al más antiguo, paginados por cursor.
+    El cursor de la página siguiente viaja en el header X-Next-Cursor.
+    """
     if not is_authorized:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="No tienes permiso para listar registros",
         )
     try:
-        records = await record_service.get_records(db=db_session)
-        records_list = list(records)
-        if len(records_list) == 0:
+        page = await record_service.get_records(
+            db=db_session, limit=limit, cursor=cursor, with_total=include_total
+        )
+        records_list = list(page.items)
+        if len(records_list) == 0 and not cursor:
             return JSONResponse(
                 content="Aun no se han cargado antecedentes",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
-        return CustomJSONResponse(content=records_list)
+        return CustomJSONResponse(content=records_list, headers=page_headers(page))
 
+    except InvalidCursorError as e:
+        return JSONResponse(content=str(e), status_code=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return JSONResponse(
             content=f"Error interno en el servidor al obtener los antecedentes, {e}",
@@ -56,10 +69,18 @@ async def search_records(
     person_name: str = Query(
         None, description="Buscar por nombre de persona relacionada"
     ),
+    limit: int = Query(50, ge=1, le=200, description="Resultados por página"),
+    cursor: Optional[str] = Query(None, description="Cursor X-Next-Cursor de la página anterior"),
     current_user: Dict = Depends(is_authenticated),
     is_authorized: bool = Depends(check_rol_all_or_viewer),
     db_session=Depends(get_db),
 ):
+    """
+    Busca antecedentes y devuelve resúmenes (columnas del antecedente,
+    `person_count` y `file_count`), paginados por cursor. Con `query`, los
+    resultados van por relevancia (como mucho 500 en total) con `score` y
+    `snippets`. El detalle completo se obtiene con GET /records/{id}.
+    """
     if not is_authorized:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -82,10 +103,19 @@ async def search_records(
             filters["date_to"] = date_to
         if person_name:
             filters["person_name"] = person_name
-        records = await record_service.search_records(
-            db=db_session, search_term=query, **filters
+        page = await record_service.search_records(
+            db=db_session, search_term=query, limit=limit, cursor=cursor, **filters
         )
-        records_list = list(records) if records else []
+        records_list = page.items
+        if query and query.strip():
+            # Fragmentos con las coincidencias resaltadas
+            words, phrases = parse_search_query(query)
+            for record in records_list:
+                record["snippets"] = highlight_snippets(
+                    {field: record[field] for field in RECORD_SEARCH_FIELDS},
+                    words,
+                    phrases,
+                )
 
         try:
             search_desc = query or ", ".join(
@@ -102,7 +132,9 @@ async def search_records(
         except Exception as log_error:
             print(f"Error al registrar log de búsqueda: {log_error}")
 
-        return CustomJSONResponse(content=records_list)
+        return CustomJSONResponse(content=records_list, headers=page_headers(page))
+    except InvalidCursorError as e:
+        return JSONResponse(content=str(e), status_code=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(
@@ -355,9 +387,11 @@ async def delete_report(
         if record_to_delete and not isinstance(record_to_delete, list):
             record_title = record_to_delete.title
 
-        record = record_service.delete_record(record_id=id, db=db_session)
+        record = await record_service.delete_record(record_id=id, db=db_session)
         if not record:
-            return HTTPException(status_code=404, detail="El antecedente no existe!")
+            return JSONResponse(
+                content="El antecedente no existe!", status_code=status.HTTP_404_NOT_FOUND
+            )
 
         # Registrar log de eliminación de antecedente
         try:
@@ -0,0 +1,220 @@
+"""
+Migraciones de esquema versionadas.
+
+`init_database` solo crea las tablas que no existen (create_all no altera
+tablas ya creadas). Los cambios sobre tablas existentes se registran acá como
+migraciones numeradas, que se aplican una sola vez y quedan anotadas en la
+tabla `schema_migrations`. Cada migración es idempotente: en una base nueva
+create_all ya creó la columna o índice y la migración solo se marca aplicada.
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database.db import engine
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """ALTER TABLE ... ADD COLUMN si la columna todavía no existe"""
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _has_index(conn: Connection, table: str, name: str) -> bool:
+    return any(index["name"] == name for index in inspect(conn).get_indexes(table))
+
+
+def _create_index(conn: Connection, table: str, name: str, columns: List[str]) -> None:
+    """CREATE INDEX si el índice todavía no existe"""
+    if not _has_index(conn, table, name):
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+
+def _drop_index(conn: Connection, table: str, name: str) -> None:
+    """DROP INDEX si el índice existe"""
+    if _has_index(conn, table, name):
+        if _is_mysql(conn):
+            conn.execute(text(f"DROP INDEX {name} ON {table}"))
+        else:
+            conn.execute(text(f"DROP INDEX {name}"))
+
+
+def _is_mysql(conn: Connection) -> bool:
+    return conn.dialect.name in ("mysql", "mariadb")
+
+
+def _add_files_content_sha256(conn: Connection) -> None:
+    _add_column(conn, "files", "content_sha256", "VARCHAR(64) NULL")
+
+
+def _add_import_checkpoint_counters(conn: Connection) -> None:
+    for column in ("rows_inserted", "rows_updated", "rows_skipped"):
+        _add_column(conn, "import_checkpoints", column, "INTEGER NULL DEFAULT 0")
+
+
+def _add_persons_search_columns(conn: Connection) -> None:
+    _add_column(conn, "persons", "search_text", "TEXT NULL")
+    _add_column(conn, "persons", "search_trigrams", "TEXT NULL")
+    # FULLTEXT solo existe en MariaDB/MySQL; en otros motores el buscador usa LIKE
+    if _is_mysql(conn):
+        if not _has_index(conn, "persons", "ft_persons_search_text"):
+            conn.execute(text("CREATE FULLTEXT INDEX ft_persons_search_text ON persons (search_text)"))
+        if not _has_index(conn, "persons", "ft_persons_search_trigrams"):
+            conn.execute(
+                text("CREATE FULLTEXT INDEX ft_persons_search_trigrams ON persons (search_trigrams)")
+            )
+
+
+def _add_persons_normalized_names(conn: Connection) -> None:
+    for column in ("names_normalized", "lastnames_normalized"):
+        _add_column(conn, "persons", column, "VARCHAR(100) NULL")
+        _create_index(conn, "persons", f"ix_persons_{column}", [column])
+
+
+def _add_pagination_indexes(conn: Connection) -> None:
+    _create_index(conn, "persons", "ix_persons_updated_at_id", ["updated_at", "person_id"])
+    _create_index(conn, "records", "ix_records_updated_at_id", ["updated_at", "record_id"])
+    _create_index(conn, "logs", "ix_logs_created_at_id", ["created_at", "log_id"])
+    _create_index(conn, "files", "ix_files_created_at_id", ["created_at", "file_id"])
+    _create_index(
+        conn, "files", "ix_files_person_created_at_id", ["person_id", "created_at", "file_id"]
+    )
+    _create_index(
+        conn, "files", "ix_files_record_created_at_id", ["record_id", "created_at", "file_id"]
+    )
+
+
+def _add_records_search_text(conn: Connection) -> None:
+    _add_column(conn, "records", "search_text", "TEXT NULL")
+    if _is_mysql(conn) and not _has_index(conn, "records", "ft_records_search_text"):
+        conn.execute(text("CREATE FULLTEXT INDEX ft_records_search_text ON records (search_text)"))
+
+
+def _add_foreign_key_and_filter_indexes(conn: Connection) -> None:
+    # Los listados de archivos filtran por is_active: los índices nuevos
+    # reemplazan a los de la migración 5 (primero se crean, para que MariaDB
+    # siga teniendo un índice para las claves foráneas al borrar los viejos)
+    _create_index(
+        conn, "files", "ix_files_person_active_created_at",
+        ["person_id", "is_active", "created_at", "file_id"],
+    )
+    _create_index(
+        conn, "files", "ix_files_record_active_created_at",
+        ["record_id", "is_active", "created_at", "file_id"],
+    )
+    _drop_index(conn, "files", "ix_files_person_created_at_id")
+    _drop_index(conn, "files", "ix_files_record_created_at_id")
+
+    _create_index(
+        conn, "records_persons", "ix_records_persons_person_record", ["person_id", "record_id"]
+    )
+    _create_index(
+        conn, "records_persons", "ix_records_persons_record_person", ["record_id", "person_id"]
+    )
+    _create_index(
+        conn, "connection_type", "ix_connection_type_person_connection", ["person_id", "connection"]
+    )
+    _create_index(
+        conn, "connection_type", "ix_connection_type_connection_person", ["connection", "person_id"]
+    )
+    _create_index(conn, "logs", "ix_logs_user_created_at_id", ["user_id", "created_at", "log_id"])
+    _create_index(conn, "logs", "ix_logs_action_created_at_id", ["action", "created_at", "log_id"])
+    _create_index(
+        conn, "logs", "ix_logs_entity_type_created_at_id", ["entity_type", "created_at", "log_id"]
+    )
+    _create_index(conn, "records", "ix_records_date", ["date"])
+
+
+def _make_pagination_keys_not_null(conn: Connection) -> None:
+    # La paginación por cursor compara con la columna de orden: las filas
+    # con NULL no entrarían en ninguna página después de la primera
+    for table, column, fallback in (
+        ("persons", "updated_at", "created_at"),
+        ("records", "updated_at", "create_at"),
+        ("files", "created_at", "updated_at"),
+    ):
+        conn.execute(
+            text(
+                f"UPDATE {table} SET {column} = COALESCE({fallback}, CURRENT_TIMESTAMP) "
+                f"WHERE {column} IS NULL"
+            )
+        )
+        # SQLite no permite cambiar la nulabilidad; en bases nuevas create_all
+        # ya crea la columna NOT NULL
+        if _is_mysql(conn):
+            conn.execute(text(f"ALTER TABLE {table} MODIFY COLUMN {column} DATETIME NOT NULL"))
+
+
+def _partition_logs_by_month(conn: Connection) -> None:
+    # Solo MariaDB/MySQL; en otros motores la retención borra en lotes
+    from services.logs_retention import partition_logs_table
+
+    partition_logs_table(conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "files.content_sha256", _add_files_content_sha256),
+    Migration(2, "import_checkpoints counters", _add_import_checkpoint_counters),
+    Migration(3, "persons search columns", _add_persons_search_columns),
+    Migration(4, "persons normalized names", _add_persons_normalized_names),
+    Migration(5, "pagination indexes", _add_pagination_indexes),
+    Migration(6, "logs monthly partitions", _partition_logs_by_month),
+    Migration(7, "records search text", _add_records_search_text),
+    Migration(8, "foreign key and filter indexes", _add_foreign_key_and_filter_indexes),
+    Migration(9, "pagination keys not null", _make_pagination_keys_not_null),
+]
+
+
+def _apply_pending(conn: Connection) -> List[str]:
+    _metadata.create_all(conn, checkfirst=True)
+    applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    names = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        migration.apply(conn)
+        conn.execute(
+            schema_migrations.insert().values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.now(timezone.utc),
+            )
+        )
+        names.append(migration.name)
+    return names
+
+
+async def run_migrations(target: AsyncEngine = engine) -> List[str]:
+    """
+    Aplica las migraciones pendientes (llamar después de init_database).
+
+    Returns:
+        List[str]: Nombres de las migraciones aplicadas en esta ejecución
+    """
+    async with target.begin() as conn:
+        return await conn.run_sync(_apply_pending)
@@ -1,12 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from typing import Annotated
+from typing import Annotated, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 from utils.jwt import decode_access_token
 from services.users_services import UserService
 from database.db import get_db
 from models.schemas.user_schema import UserResponses
 from services.logs_services import LogsService
+from utils.role_cache import role_cache
 import uuid
 import traceback
 
@@ -20,10 +21,15 @@ async def get_role(token: str, db_session: AsyncSession) -> str:
     Helper function to decode a token, retrieve user data, and return the user's role.
     This function should not be used as a FastAPI dependency directly.
     """
-    try:
-        # Decodificar el token
-        token_decode = decode_access_token(token=token)
+    token_decode = decode_access_token(token=token)
+    return await _resolve_role(token_decode=token_decode, db_session=db_session)
+
 
+async def _resolve_role(token_decode, db_session: AsyncSession) -> str:
+    """
+    Resuelve el rol del usuario a partir del payload ya decodificado del token.
+    """
+    try:
         if not token_decode or "user_id" not in token_decode:
             await logs_sevice.create_log(
                 db=db_session,
@@ -48,10 +54,18 @@ async def get_role(token: str, db_session: AsyncSession) -> str:
                 status_code=status.HTTP_401_UNAUTHORIZED,
             )
 
+        # Consultar primero la cache de roles para evitar el SELECT users + roles
+        cached = role_cache.get(user_id_obj)
+        if cached is not None and cached.active:
+            return cached.role_name
+
         # Obtener los datos del usuario usando el objeto UUID
-        user_data = await user_service.get_user(id=user_id_obj, db=db_session)
+        user_data = None
+        if cached is None:
+            user_data = await user_service.get_user(id=user_id_obj, db=db_session)
 
         if user_data is None:
+            role_cache.set(user_id_obj, role_name=None, active=False)
             await logs_sevice.create_log(
                 db=db_session,
                 user_id=user_id_obj,
@@ -71,6 +85,7 @@ async def get_role(token: str, db_session: AsyncSession) -> str:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        role_cache.set(user_id_obj, role_name=user_data.role_name, active=True)
         return user_data.role_name
     except HTTPException as http_ex:
         # Re-lanzar las excepciones HTTP tal como están
@@ -84,152 +99,71 @@ async def get_role(token: str, db_session: AsyncSession) -> str:
         )
 
 
-async def check_rol_admin(
+async def get_current_principal(
     token: Annotated[str, Depends(oauth_scheme)],
     db_session: AsyncSession = Depends(get_db),
-):
-    try:
-        role = await get_role(token=token, db_session=db_session)
-        if role == "ADMIN":
-            return True
-        return False
-    except HTTPException as http_ex:
-        await logs_sevice.create_log(
-            db=db_session,
-            user_id=None,
-            action="Error al verificar rol de admin",
-            entity_type="AUTHORIZATION",
-            description=f"Error HTTP al verificar rol de admin: {http_ex.detail}",
-            entity_id=None,
-            ip_address=None,
-        )
-        raise http_ex
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al verificar el rol de administrador: {str(e)}",
-        )
+) -> Dict:
+    """
+    Dependencia de FastAPI: decodifica el token y resuelve el rol una sola vez.
 
+    FastAPI cachea el resultado de una dependencia dentro del mismo request, por lo
+    que is_authenticated y todos los check_rol_* comparten este mismo principal.
 
-async def check_rol_moderate_or_admin(
-    token: Annotated[str, Depends(oauth_scheme)], db_session: AsyncSession = Depends(get_db)
-):
+    Retorna {"username", "user_id", "role_name"} o lanza HTTPException 401.
+    """
     try:
-        role = await get_role(token=token, db_session=db_session)
-        if role == "ADMIN" or role == "MODERATE":
-            return True
-        return False
+        token_decode = decode_access_token(token=token)
+        role = await _resolve_role(token_decode=token_decode, db_session=db_session)
+        return {
+            "username": token_decode["username"],
+            "user_id": token_decode["user_id"],
+            "role_name": role,
+        }
     except HTTPException as http_ex:
         await logs_sevice.create_log(
             db=db_session,
             user_id=None,
-            action="Error al verificar rol de moderador o admin",
+            action="Error al verificar rol",
             entity_type="AUTHORIZATION",
-            description=f"Error HTTP al verificar rol de moderador o admin: {http_ex.detail}",
+            description=f"Error HTTP al verificar el rol del usuario: {http_ex.detail}",
             entity_id=None,
             ip_address=None,
         )
         raise http_ex
-    except Exception as e:
-        print(f"Error en check_rol_moderate_or_admin: {e}, tipo: {type(e)}")
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al verificar el rol de moderador o administrador: {str(e)}",
-        )
 
 
-async def check_rol_all(
-    token: Annotated[str, Depends(oauth_scheme)],
-    db_session: AsyncSession = Depends(get_db),
-):
-    try:
-        role = await get_role(token=token, db_session=db_session)
-        if role in ["ADMIN", "MODERATE", "USERS", "USER"]:
-            return True
-        return False
-    except HTTPException as http_ex:
-        await logs_sevice.create_log(
-            db=db_session,
-            user_id=None,
-            action="Error al verificar rol de todos los usuarios",
-            entity_type="AUTHORIZATION",
-            description=f"Error HTTP al verificar rol de todos los usuarios: {http_ex.detail}",
-        )
-        raise http_ex
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al verificar el rol de usuario: {str(e)}",
-        )
+async def check_rol_admin(principal: Dict = Depends(get_current_principal)):
+    return principal["role_name"] == "ADMIN"
 
 
-async def check_rol_viewer(
-    token: Annotated[str, Depends(oauth_scheme)],
-    db_session: AsyncSession = Depends(get_db),
-):
-    try:
-        role = await get_role(token=token, db_session=db_session)
-        if role == "VIEW":
-            return True
-        return False
-    except HTTPException as http_ex:
-        await logs_sevice.create_log(
-            db=db_session,
-            user_id=None,
-            action="Error al verificar rol de viewer",
-            entity_type="AUTHORIZATION",
-            description=f"Error HTTP al verificar rol de viewer: {http_ex.detail}",
-        )
-        raise http_ex
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al verificar el rol de viewer: {str(e)}",
-        )
+async def check_rol_moderate_or_admin(principal: Dict = Depends(get_current_principal)):
+    return principal["role_name"] in ["ADMIN", "MODERATE"]
+
+
+async def check_rol_all(principal: Dict = Depends(get_current_principal)):
+    return principal["role_name"] in ["ADMIN", "MODERATE", "USERS", "USER"]
+
+
+async def check_rol_viewer(principal: Dict = Depends(get_current_principal)):
+    return principal["role_name"] == "VIEW"
 
 
 async def check_rol_all_or_viewer(
-    token: Annotated[str, Depends(oauth_scheme)],
+    principal: Dict = Depends(get_current_principal),
     db_session: AsyncSession = Depends(get_db),
 ):
     """
     Permite acceso a ADMIN, MODERATE, USERS y VIEW (visualizador)
     """
-    try:
-        role = await get_role(token=token, db_session=db_session)
-        if role in ["ADMIN", "MODERATE", "USERS", "VIEW"]:
-            return True
-        await logs_sevice.create_log(
-            db=db_session,
-            user_id=None,
-            action="Acceso denegado",
-            entity_type="AUTHORIZATION",
-            description=f"El rol '{role}' no tiene permisos suficientes.",
-        )
-
-        return False
-    except HTTPException as http_ex:
-        await logs_sevice.create_log(
-            db=db_session,
-            user_id=None,
-            action="Error al verificar rol de todos o viewer",
-            entity_type="AUTHORIZATION",
-            description=f"Error HTTP al verificar rol de todos o viewer: {http_ex.detail}",
-        )
-        raise http_ex
-    except Exception as e:
-        await logs_sevice.create_log(
-            db=db_session,
-            user_id=None,
-            action="Error al verificar rol de todos o viewer",
-            entity_type="AUTHORIZATION",
-            description=f"Error al verificar rol de todos o viewer: {str(e)}",
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al verificar los roles: {str(e)}",
-        )
+    role = principal["role_name"]
+    if role in ["ADMIN", "MODERATE", "USERS", "VIEW"]:
+        return True
+    await logs_sevice.create_log(
+        db=db_session,
+        user_id=None,
+        action="Acceso denegado",
+        entity_type="AUTHORIZATION",
+        description=f"El rol '{role}' no tiene permisos suficientes.",
+    )
+
+    return False
@@ -1,21 +1,15 @@
-from fastapi import Depends, HTTPException
-from fastapi.security import OAuth2PasswordBearer
-from typing import Annotated
-from utils.jwt import decode_access_token
+from fastapi import Depends
+from typing import Dict
+from dependencies.checked_role import get_current_principal
 
-oatth_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def is_authenticated(token: Annotated[str, Depends(oatth_scheme)]) -> dict:
+def is_authenticated(principal: Dict = Depends(get_current_principal)) -> dict:
     """
     Dependencia de FastAPI: Verifica la validez del token y decodifica su payload.
-    
+
+    Reutiliza el principal del request (el token se decodifica una sola vez aunque
+    la ruta también dependa de un check_rol_*).
+
     Retorna el payload del token o lanza HTTPException 401.
     """
-    try:
-        return decode_access_token(token=token)
-    except HTTPException as http_ex:
-        return False
-    except Exception as e:
-        print("Error en is_authenticated:", e)
-        return False
-    
\ No newline at end of file
+    return principal
@@ -12,11 +12,24 @@ from controllers.persons_controllers import router as person_router
 from controllers.records_controolers import router as record_router
 from controllers.files_controllers import router as files_router
 from controllers.logs_controllers import router as logs_router
+from controllers.metrics_controllers import router as metrics_router
+from controllers.jobs_controllers import router as jobs_router
 
 # Importación de utilidades de BD
 from utils.create_admin import create_admin
 from utils.create_roles import create_roles
 from database.db import init_database
+from database.migrations import run_migrations
+from services.logs_writer import log_writer
+from services.jobs_services import jobs_service
+from services.persons_search import ensure_search_backfill
+from services.records_search import ensure_records_search_backfill
+from services.logs_rollup import ensure_rollup_backfill
+from services.logs_retention import ensure_partitions
+from services.persons_graph import connection_index
+from utils.executors import shutdown_executors
+from utils.file_encryption import FileValidator
+from middlewares.upload_limit import UploadSizeLimitMiddleware
 
 
 # --- 1. CONFIGURACIÓN DE CICLO DE VIDA  ---
@@ -39,6 +52,9 @@ async def lifespan(app: FastAPI):
 
     try:
         await init_database()
+        applied = await run_migrations()
+        if applied:
+            print(f"✅ Migraciones aplicadas: {', '.join(applied)}")
         await create_roles()  # Aseguramos await aquí
 
         # Crear admin solo si no existe
@@ -52,10 +68,51 @@ async def lifespan(app: FastAPI):
         print(f"❌ Error crítico iniciando base de datos: {e}")
         raise e
 
+    # C. Escritor de auditoría en segundo plano
+    await log_writer.start()
+    print("✅ Escritor de logs iniciado.")
+
+    # D. Tareas cuyo worker murió sin cerrarlas (lease vencido)
+    expired = await jobs_service.expire_stale_jobs()
+    if expired:
+        print(f"ℹ️ {expired} tareas con lease vencido marcadas como fallidas.")
+
+    # E. Columnas de búsqueda de personas y antecedentes cargados antes del buscador
+    backfill_job = await ensure_search_backfill()
+    if backfill_job:
+        print(f"ℹ️ Completando columnas de búsqueda de personas (tarea {backfill_job}).")
+    records_job = await ensure_records_search_backfill()
+    if records_job:
+        print(f"ℹ️ Completando el texto de búsqueda de antecedentes (tarea {records_job}).")
+
+    # F. Rollup diario de auditoría en una base con logs previos
+    rollup_job = await ensure_rollup_backfill()
+    if rollup_job:
+        print(f"ℹ️ Reconstruyendo el rollup diario de logs (tarea {rollup_job}).")
+
+    # G. Particiones mensuales de logs para los próximos meses
+    created = await ensure_partitions()
+    if created:
+        print(f"✅ Particiones de logs creadas: {', '.join(created)}")
+
+    # H. Índice en memoria de vínculos entre personas
+    await connection_index.start()
+    print(f"✅ Índice de vínculos cargado: {connection_index.size}")
+
     yield
 
     print("🛑 Aplicación deteniéndose. Limpiando recursos...")
 
+    # Interrumpir las tareas de este worker (quedan como canceladas)
+    await jobs_service.shutdown()
+    await connection_index.stop()
+
+    # Vaciar la cola de logs antes de cerrar
+    await log_writer.stop()
+    print("✅ Logs pendientes escritos.")
+
+    shutdown_executors()
+
 
 # --- 2. DEFINICIÓN DE LA APP CON METADATOS ---
 app = FastAPI(
@@ -66,6 +123,15 @@ app = FastAPI(
 )
 
 # --- 3. SEGURIDAD CORS (IMPORTANTE) ---
+# Cortar subidas que superan el máximo sin esperar a recibir todo el cuerpo
+# (margen de 1MB para los demás campos y delimitadores del multipart)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=FileValidator.MAX_FILE_SIZE + 1024 * 1024,
+    paths=["/files/upload"],
+)
+
+# CORS se agrega después para que envuelva también las respuestas 413
 origins = os.getenv("ALLOWED_ORIGINS", "*")
 
 app.add_middleware(
@@ -74,6 +140,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["*"],
+    # Paginación por cursor (utils/pagination.py)
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # --- 4. RUTAS ---
@@ -84,6 +152,8 @@ app.include_router(person_router)
 app.include_router(record_router)
 app.include_router(files_router)
 app.include_router(logs_router)
+app.include_router(metrics_router)
+app.include_router(jobs_router)
 
 
 @app.get("/health")
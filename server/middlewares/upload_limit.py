@@ -0,0 +1,76 @@
+import json
+from typing import Iterable
+
+from fastapi import HTTPException, status
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Middleware ASGI que corta los cuerpos de subida demasiado grandes.
+
+    FastAPI parsea el multipart completo antes de llamar al endpoint, así que
+    la validación de tamaño del endpoint llega tarde. Este middleware responde
+    413 apenas el Content-Length declarado o los bytes recibidos superan
+    `max_body_size`, sin esperar al resto del cuerpo. En el segundo caso lanza
+    HTTPException desde `receive`, que FastAPI propaga tal cual durante el
+    parseo del cuerpo.
+    """
+
+    def __init__(self, app, max_body_size: int, paths: Iterable[str]):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].rstrip("/").endswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > self.max_body_size:
+                    await self._reject(send)
+                    return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=self._detail(),
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _detail(self) -> str:
+        max_size_mb = self.max_body_size / (1024 * 1024)
+        return f"Cuerpo de la petición demasiado grande. Máximo: {max_size_mb:.0f}MB"
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": self._detail()}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
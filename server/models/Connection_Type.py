@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from sqlalchemy.types import UUID
 from sqlalchemy.orm import relationship
 from database.db import Base
@@ -6,6 +6,11 @@ import uuid
 
 class ConnectionType(Base):
     __tablename__ = "connection_type"
+    # Vínculos en ambas direcciones (personas vinculadas, grafo de vínculos)
+    __table_args__ = (
+        Index("ix_connection_type_person_connection", "person_id", "connection"),
+        Index("ix_connection_type_connection_person", "connection", "person_id"),
+    )
     connection_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     person_id = Column(UUID(as_uuid=True), ForeignKey("persons.person_id"), nullable=True)
     connection = Column(UUID(as_uuid=True), ForeignKey("persons.person_id"), nullable=True)
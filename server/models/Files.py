@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Integer, Boolean, Index
 from sqlalchemy.types import UUID
 from sqlalchemy.orm import relationship
 from database.db import Base
@@ -12,6 +12,13 @@ class FileType(str, Enum):
 
 class Files(Base):
     __tablename__ = "files"
+    # Paginación por cursor de los listados (utils/pagination.py); los de
+    # persona y antecedente filtran también por is_active
+    __table_args__ = (
+        Index("ix_files_created_at_id", "created_at", "file_id"),
+        Index("ix_files_person_active_created_at", "person_id", "is_active", "created_at", "file_id"),
+        Index("ix_files_record_active_created_at", "record_id", "is_active", "created_at", "file_id"),
+    )
     
     # Identificador único del archivo
     file_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
@@ -22,6 +29,7 @@ class Files(Base):
     file_type = Column(String(10), nullable=False, comment="Tipo de archivo: pdf, image")
     file_size = Column(Integer, nullable=False, comment="Tamaño del archivo en bytes")
     mime_type = Column(String(100), nullable=False, comment="Tipo MIME del archivo")
+    content_sha256 = Column(String(64), nullable=True, comment="SHA-256 del contenido en claro almacenado")
     
     # Metadatos de encriptación
     encryption_key_hash = Column(String(255), nullable=False, comment="Hash de la clave de encriptación")
@@ -40,7 +48,8 @@ class Files(Base):
     # Auditoría
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False,
                         comment="Usuario que subió el archivo")
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Clave de la paginación por cursor: no puede ser nula (migración 9)
+    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), 
                        onupdate=lambda: datetime.now(timezone.utc))
     
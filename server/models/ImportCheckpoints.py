@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime, Integer, Boolean
+from database.db import Base
+from datetime import datetime, timezone
+
+
+class ImportCheckpoints(Base):
+    """
+    Punto de reanudación de una importación por lotes (p. ej. el padrón).
+    Se actualiza en la misma transacción que cada lote insertado.
+    """
+
+    __tablename__ = "import_checkpoints"
+
+    source = Column(String(255), primary_key=True, comment="Identificador del origen (ruta del CSV)")
+    file_signature = Column(String(64), nullable=False, comment="Tamaño y fecha de modificación del archivo")
+    rows_committed = Column(Integer, nullable=False, default=0, comment="Filas de datos ya confirmadas")
+    rows_inserted = Column(Integer, nullable=True, default=0)
+    rows_updated = Column(Integer, nullable=True, default=0)
+    rows_skipped = Column(Integer, nullable=True, default=0)
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
@@ -0,0 +1,39 @@
+import uuid
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Float, JSON
+from sqlalchemy.types import UUID
+from database.db import Base
+from datetime import datetime
+
+
+class Jobs(Base):
+    """
+    Registro persistente de tareas en segundo plano (carga del padrón,
+    mantenimiento, etc.), compartido por todos los workers.
+    """
+
+    __tablename__ = "jobs"
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    job_type = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="running")  # running, completed, failed, cancelled
+    # Vale job_type mientras la tarea está activa y NULL al terminar: el índice
+    # único impide que dos workers ejecuten a la vez una tarea del mismo tipo
+    active_key = Column(String(50), nullable=True, unique=True)
+    progress = Column(Float, nullable=False, default=0)
+    stats = Column(JSON, nullable=True)
+    message = Column(Text, nullable=True)
+    params = Column(JSON, nullable=True)
+
+    # Lease: el worker dueño lo renueva con cada heartbeat; si vence, la tarea se da por perdida
+    owner = Column(String(100), nullable=True, comment="host:pid del worker que ejecuta la tarea")
+    heartbeat_at = Column(DateTime, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job(job_id={self.job_id}, type='{self.job_type}', status='{self.status}')>"
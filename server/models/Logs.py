@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.types import UUID
 from database.db import Base
@@ -7,6 +7,14 @@ from datetime import datetime
 
 class Logs(Base):
     __tablename__ = "logs"
+    # Paginación por cursor de los listados (utils/pagination.py) y filtros
+    # del listado de auditoría (usuario, acción, tipo de entidad)
+    __table_args__ = (
+        Index("ix_logs_created_at_id", "created_at", "log_id"),
+        Index("ix_logs_user_created_at_id", "user_id", "created_at", "log_id"),
+        Index("ix_logs_action_created_at_id", "action", "created_at", "log_id"),
+        Index("ix_logs_entity_type_created_at_id", "entity_type", "created_at", "log_id"),
+    )
     
     log_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
@@ -0,0 +1,25 @@
+import uuid
+from sqlalchemy import Column, String, Date, Integer
+from sqlalchemy.types import UUID
+from database.db import Base
+
+# user_id de los logs sin usuario (la clave primaria no admite NULL). Es el
+# "Max UUID": el UUID nulo (todo ceros) SQLite lo guardaría como el entero 0
+ANONYMOUS_USER_ID = uuid.UUID("ffffffff-ffff-ffff-ffff-ffffffffffff")
+
+
+class LogsDailyRollup(Base):
+    """
+    Cantidad de logs por día, acción, entidad y usuario. La mantiene el escritor
+    de auditoría en la misma transacción que inserta cada lote de logs, y se
+    reconstruye desde `logs` con la tarea de backfill (services/logs_rollup.py).
+    Sobrevive a la retención de `logs`: sirve para tendencias de meses.
+    """
+
+    __tablename__ = "logs_daily_rollup"
+
+    day = Column(Date, primary_key=True)
+    action = Column(String(50), primary_key=True)
+    entity_type = Column(String(50), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True, comment="ANONYMOUS_USER_ID si el log no tiene usuario")
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from database.db import Base
 from sqlalchemy.types import UUID
 from sqlalchemy.orm import relationship
@@ -8,6 +8,8 @@ from datetime import datetime, timezone
 
 class Persons(Base):
     __tablename__ = "persons"
+    # Paginación por cursor de los listados (utils/pagination.py)
+    __table_args__ = (Index("ix_persons_updated_at_id", "updated_at", "person_id"),)
     person_id = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
     )
@@ -19,10 +21,20 @@ class Persons(Base):
     province = Column(String(255), nullable=False)
     country = Column(String(255), nullable=False)
     observations = Column(Text, nullable=True)
+    # Columnas derivadas para el buscador (utils/text_search.person_search_columns);
+    # en MariaDB/MySQL tienen índices FULLTEXT creados por database/migrations.py
+    search_text = Column(Text, nullable=True)
+    search_trigrams = Column(Text, nullable=True)
+    # Nombres y apellidos sin acentos, en mayúsculas y con espacios colapsados,
+    # indexados para búsquedas exactas y por prefijo
+    names_normalized = Column(String(100), nullable=True, index=True)
+    lastnames_normalized = Column(String(100), nullable=True, index=True)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Clave de la paginación por cursor: no puede ser nula (migración 9)
     updated_at = Column(
         DateTime,
+        nullable=False,
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
@@ -1,13 +1,18 @@
 import uuid
-from sqlalchemy import String, Column, Date, Text, DateTime
+from sqlalchemy import String, Column, Date, Text, DateTime, Index
 from database.db import Base
 from sqlalchemy.types import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime, timezone
 
 
 class Records(Base):
     __tablename__ = "records"
+    # Paginación por cursor de los listados (utils/pagination.py) y filtro por fecha
+    __table_args__ = (
+        Index("ix_records_updated_at_id", "updated_at", "record_id"),
+        Index("ix_records_date", "date"),
+    )
     record_id = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True
     )
@@ -16,8 +21,12 @@ class Records(Base):
     type_record = Column(String(500), nullable=False)
     content = Column(Text, nullable=False)
     observations = Column(Text, nullable=True)
+    # Palabras normalizadas de los campos buscables (FULLTEXT, ver
+    # utils/text_search.record_search_text). Diferida y fuera del JSON.
+    search_text = deferred(Column(Text, nullable=True, info={"hidden": True}))
     create_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Clave de la paginación por cursor: no puede ser nula (migración 9)
+    updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
 
     person_relationships = relationship(
         "RecordsPersons", back_populates="record", cascade="all, delete-orphan"
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import ForeignKey, String, Column
+from sqlalchemy import ForeignKey, String, Column, Index
 from sqlalchemy.types import UUID
 from sqlalchemy.orm import relationship
 from database.db import Base
@@ -7,6 +7,11 @@ import uuid
 
 class RecordsPersons(Base):
     __tablename__ = "records_persons"
+    # Vínculos desde cada lado (antecedentes de una persona, personas de un antecedente)
+    __table_args__ = (
+        Index("ix_records_persons_person_record", "person_id", "record_id"),
+        Index("ix_records_persons_record_person", "record_id", "person_id"),
+    )
     id = Column(UUID(as_uuid= True), primary_key= True, default=uuid.uuid4, index= True)
     person_id = Column(UUID(as_uuid= True), ForeignKey("persons.person_id"), nullable=False)
     record_id = Column(UUID(as_uuid= True), ForeignKey("records.record_id"), nullable=False)
@@ -7,6 +7,9 @@ from .Connection_Type import ConnectionType
 from .Recortds_Persons import RecordsPersons
 from .Files import Files
 from .Logs import Logs
+from .ImportCheckpoints import ImportCheckpoints
+from .Jobs import Jobs
+from .LogsDailyRollup import LogsDailyRollup
 
 # Hacer que los modelos estén disponibles cuando se importe el paquete models
 __all__ = [
@@ -17,5 +20,8 @@ __all__ = [
     "ConnectionType",
     "RecordsPersons",
     "Files",
-    "Logs"
+    "Logs",
+    "ImportCheckpoints",
+    "Jobs",
+    "LogsDailyRollup",
 ]
\ No newline at end of file
@@ -39,6 +39,7 @@ class FileResponse(BaseModel):
     file_type: FileTypeEnum
     file_size: int
     mime_type: str
+    content_sha256: Optional[str] = None
     description: Optional[str] = None
     is_active: bool
     person_id: UUID
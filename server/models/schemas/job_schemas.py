@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+
+class JobResponse(BaseModel):
+    job_id: UUID
+    job_type: str
+    status: str
+    progress: float
+    stats: Optional[Dict[str, Any]] = None
+    message: Optional[str] = None
+    params: Optional[Dict[str, Any]] = None
+    owner: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    lease_expires_at: Optional[datetime] = None
+    cancel_requested: bool
+    created_by: Optional[UUID] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
@@ -24,8 +24,12 @@ class LogFilterParams(BaseModel):
 
 
 class PaginatedLogResponse(BaseModel):
-    total: int
-    page: int
+    # total y pages solo se calculan si se piden (include_total) o con `page`
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    # Cómo se obtuvo el total: exact, estimated (aproximado) o cached
+    total_mode: Optional[str] = None
     data: List[LogResponse]
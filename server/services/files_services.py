@@ -5,16 +5,39 @@ from models.Files import Files
 from models.Persons import Persons
 from models.Record import Records
 from models.Users import Users
-from utils.file_encryption import FileEncryption, FileValidator
-from utils.image_resize import resize_image_stream
+from utils.file_encryption import (
+    FileEncryption,
+    FileValidator,
+    EncryptedFileReader,
+    EncryptedFileWriter,
+)
+from utils.metrics import download_metrics
+from utils.http_range import parse_range_header, RangeNotSatisfiableError
+from utils.image_resize import resize_image_file
+from utils.executors import cpu_executor, io_executor
+from utils.pagination import Page, paginate
 from config.file_storage import FileStorageConfig
-from typing import List, Optional, BinaryIO, Tuple
+from fastapi import UploadFile
+from typing import List, Optional, BinaryIO, AsyncIterator, Iterator, NamedTuple, Tuple
 
 import uuid
 import os
+import time
 
 from datetime import datetime, timezone
 
+# Tamaño de lectura del cuerpo subido (varios segmentos de cifrado por vez)
+UPLOAD_READ_SIZE = 1024 * 1024
+
+
+class FileDownload(NamedTuple):
+    chunks: AsyncIterator[bytes]
+    original_filename: str
+    mime_type: str
+    content_length: int
+    total_size: int
+    byte_range: Optional[Tuple[int, int]] = None
+
 
 class FilesService:
     """
@@ -52,42 +75,122 @@ class FilesService:
         # Si no es un formato válido, retornar tal cual y dejar que uuid.UUID lance el error
         return uuid_str
 
+    async def _receive_upload(
+        self, upload: UploadFile, file_type: str, temp_dir: str
+    ) -> Tuple[EncryptedFileWriter, str]:
+        """
+        Lee el archivo subido por bloques y lo deja encriptado en `temp_dir`.
+
+        El tamaño se controla a medida que llegan los datos y el tipo real se
+        detecta con los primeros bytes. Los PDF se encriptan al vuelo; las
+        imágenes se vuelcan a un temporal, se redimensionan desde la ruta en el
+        pool de procesos y recién después se encriptan.
+
+        Returns:
+            Tuple[EncryptedFileWriter, str]: (escritor finalizado, MIME detectado)
+        """
+        head = await upload.read(FileValidator.SNIFF_SIZE)
+        if not head:
+            raise ValueError("El archivo está vacío")
+        mime_type = FileValidator.validate_content(file_type, head)
+
+        staging_id = uuid.uuid4().hex
+        encrypted_path = os.path.join(temp_dir, f"{staging_id}.enc.tmp")
+
+        if file_type != "image":
+            writer = await io_executor.run(EncryptedFileWriter, encrypted_path)
+            try:
+                await self._drain_upload(upload, head, writer.write)
+                await io_executor.run(writer.finish)
+            except BaseException:
+                writer.abort()
+                raise
+            return writer, mime_type
+
+        source_path = os.path.join(temp_dir, f"{staging_id}.upload.tmp")
+        resized_path = os.path.join(temp_dir, f"{staging_id}.resized.tmp")
+        try:
+            with open(source_path, "wb") as spool:
+                await self._drain_upload(upload, head, spool.write)
+
+            try:
+                await cpu_executor.run(
+                    resize_image_file, source_path, resized_path, mime_type
+                )
+            except Exception as e:
+                print(f"Error al redimensionar imagen: {e}")
+                # Si falla el redimensionado, lanzamos error para no guardar basura
+                raise ValueError(f"Error al procesar la imagen: {str(e)}")
+
+            return await io_executor.run(
+                self._encrypt_path, resized_path, encrypted_path
+            ), mime_type
+        finally:
+            for path in (source_path, resized_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    async def _drain_upload(upload: UploadFile, head: bytes, sink) -> int:
+        """
+        Pasa el contenido de `upload` a `sink` por bloques (en el pool de hilos),
+        cortando apenas se supera el tamaño máximo.
+        """
+        received = 0
+        data = head
+        while data:
+            received += len(data)
+            FileValidator.validate_file_size(received)
+            await io_executor.run(sink, data)
+            data = await upload.read(UPLOAD_READ_SIZE)
+        return received
+
+    @staticmethod
+    def _encrypt_path(source_path: str, target_path: str) -> EncryptedFileWriter:
+        with open(source_path, "rb") as source, EncryptedFileWriter(target_path) as writer:
+            writer.write_stream(source)
+        return writer
+
     async def upload_file(
         self,
-        file_stream: BinaryIO,
+        upload: UploadFile,
         original_filename: str,
-        file_size: int,
         mime_type: str,
         person_id: str,
         uploaded_by: str,
         db: AsyncSession,
         record_id: Optional[str] = None,
         description: Optional[str] = None,
+        file_size: Optional[int] = None,
     ) -> Files:
         """
-        Sube y encripta un archivo
+        Sube y encripta un archivo sin cargarlo completo en memoria
 
         Args:
-            file_stream: Stream del archivo a subir
+            upload: Archivo subido (se lee por bloques)
             original_filename: Nombre original del archivo
-            file_size: Tamaño del archivo en bytes
-            mime_type: Tipo MIME del archivo
+            mime_type: Tipo MIME declarado del archivo
             person_id: ID de la persona propietaria
             uploaded_by: ID del usuario que sube el archivo
             record_id: ID del record asociado (opcional)
             description: Descripción del archivo (opcional)
+            file_size: Tamaño declarado en bytes, si se conoce (se rechaza antes de leer)
             db: Sesión de base de datos
 
         Returns:
             Files: Instancia del archivo creado
 
         Raises:
+            FileTooLargeError: Si el archivo supera el tamaño máximo
             ValueError: Si la validación falla
             Exception: Si hay error en el procesamiento
         """
+        temp_path = None
+        final_path = None
         try:
-            # Validar tamaño del archivo
-            FileValidator.validate_file_size(file_size)
+            # Validar tamaño declarado antes de leer nada
+            if file_size is not None:
+                FileValidator.validate_file_size(file_size)
 
             # Validar tipo de archivo
             file_type = FileValidator.validate_file_type(original_filename, mime_type)
@@ -126,32 +229,17 @@ class FilesService:
                 if not record:
                     raise ValueError("El record especificado no existe")
 
-            # Redimensionar si es imagen
-            if file_type == "image":
-                try:
-                    # El resize devuelve un nuevo stream (BytesIO)
-                    file_stream = resize_image_stream(file_stream, mime_type)
-
-                    # Actualizar tamaño del archivo después del resize
-                    file_stream.seek(0, 2)  # Ir al final
-                    file_size = file_stream.tell()
-                    file_stream.seek(0)  # Volver al inicio
-
-                    print(
-                        f"DEBUG: Imagen redimensionada. Nuevo tamaño: {file_size} bytes"
-                    )
-
-                except Exception as e:
-                    print(f"Error al redimensionar imagen: {e}")
-                    # Si falla el redimensionado, lanzamos error para no guardar basura
-                    raise ValueError(f"Error al procesar la imagen: {str(e)}")
-
-            # Obtener directorio de almacenamiento
-            storage_path = FileStorageConfig.get_storage_path(file_type)
+            # Leer, validar y encriptar por bloques hacia el directorio temporal
+            writer, mime_type = await self._receive_upload(
+                upload, file_type, FileStorageConfig.get_storage_path("temp")
+            )
+            temp_path = writer.file_path
 
-            # Encriptar y guardar archivo
-            encrypted_filename, salt, key_hash = FileEncryption.encrypt_file_stream(
-                file_stream, storage_path, original_filename
+            encrypted_filename = FileEncryption.generate_unique_filename(
+                original_filename
+            )
+            final_path = FileStorageConfig.get_full_file_path(
+                file_type, encrypted_filename
             )
 
             # Crear registro en base de datos
@@ -159,10 +247,11 @@ class FilesService:
                 original_filename=original_filename,
                 encrypted_filename=encrypted_filename,
                 file_type=file_type,
-                file_size=file_size,
+                file_size=writer.plaintext_size,
                 mime_type=mime_type,
-                encryption_key_hash=key_hash,
-                encryption_salt=salt,
+                content_sha256=writer.content_sha256,
+                encryption_key_hash=writer.key_hash,
+                encryption_salt=writer.salt,
                 description=description,
                 person_id=person_uuid,
                 record_id=record_uuid,
@@ -170,7 +259,14 @@ class FilesService:
             )
 
             db.add(new_file)
+            await db.flush()
+
+            # Mover el archivo a su lugar (rename atómico, mismo filesystem) y confirmar
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(temp_path, final_path)
+            temp_path = None
             await db.commit()
+            final_path = None
             await db.refresh(new_file)
 
             print("DEBUG upload_file: Archivo subido exitosamente")
@@ -181,17 +277,14 @@ class FilesService:
             return new_file
 
         except Exception as e:
-            db.rollback()
-            # Si hubo error, intentar limpiar archivo si se creó
-            if "encrypted_filename" in locals():
-                try:
-                    file_path = FileStorageConfig.get_full_file_path(
-                        file_type, encrypted_filename
-                    )
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                except:
-                    pass
+            await db.rollback()
+            # Si hubo error, limpiar el temporal o el archivo ya movido sin commit
+            for path in (temp_path, final_path):
+                if path and os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
             raise e
 
     async def get_file_by_id(self, file_id: str, db: AsyncSession) -> Optional[Files]:
@@ -249,110 +342,174 @@ class FilesService:
             print(f"Error al convertir file_id a UUID: {file_id}, error: {str(e)}")
             return None
 
+    def _active_files(self):
+        return select(self.fileModel).filter(self.fileModel.is_active)
+
+    async def _paginate_files(
+        self, db: AsyncSession, stm, limit: int, cursor: Optional[str], with_total: bool
+    ) -> Page:
+        """Página de archivos del más reciente al más antiguo (created_at, file_id)"""
+        return await paginate(
+            db,
+            stm,
+            [self.fileModel.created_at, self.fileModel.file_id],
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+        )
+
     async def get_files_by_person(
-        self, person_id: str, db: AsyncSession
-    ) -> List[Files]:
+        self,
+        person_id: str,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Page:
         """
-        Obtiene todos los archivos de una persona
+        Obtiene los archivos de una persona, paginados por cursor
         """
         try:
             person_uuid = uuid.UUID(person_id)
-            stm = (
-                select(self.fileModel)
-                .options(joinedload(self.fileModel.record))
-                .filter(
-                    self.fileModel.person_id == person_uuid,
-                    self.fileModel.is_active,
-                )
-                .order_by(self.fileModel.created_at.desc())
-            )
-            result = await db.execute(stm)
-            return result.scalars().all()
         except ValueError:
-            return []
+            return Page([], None, 0 if with_total else None)
+
+        stm = (
+            self._active_files()
+            .options(joinedload(self.fileModel.record))
+            .filter(self.fileModel.person_id == person_uuid)
+        )
+        return await self._paginate_files(db, stm, limit, cursor, with_total)
 
     async def get_files_by_record(
-        self, record_id: str, db: AsyncSession
-    ) -> List[Files]:
+        self,
+        record_id: str,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Page:
         """
-        Obtiene todos los archivos asociados a un record
+        Obtiene los archivos asociados a un record, paginados por cursor
         """
         try:
             record_uuid = uuid.UUID(record_id)
-            # TEMPORALMENTE SIN JOINEDLOAD
-            stm = (
-                select(self.fileModel)
-                .filter(
-                    self.fileModel.record_id == record_uuid,
-                    self.fileModel.is_active,
-                )
-                .order_by(self.fileModel.created_at.desc())
-            )
-            result = await db.execute(stm)
-            return result.scalars().all()
         except ValueError:
-            return []
+            return Page([], None, 0 if with_total else None)
+
+        stm = self._active_files().filter(self.fileModel.record_id == record_uuid)
+        return await self._paginate_files(db, stm, limit, cursor, with_total)
+
+    async def list_files(
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        file_type: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Page:
+        """
+        Lista todos los archivos activos del sistema, paginados por cursor
+        """
+        stm = self._active_files()
+        if file_type:
+            stm = stm.filter(self.fileModel.file_type == file_type)
+        return await self._paginate_files(db, stm, limit, cursor, with_total)
 
     async def download_file(
-        self, file_id: str, db: AsyncSession
-    ) -> Tuple[bytes, str, str]:
+        self, file_id: str, db: AsyncSession, range_header: Optional[str] = None
+    ) -> FileDownload:
         """
-        Descarga y desencripta un archivo
+        Prepara la descarga de un archivo desencriptándolo en streaming
+
+        Args:
+            file_id: ID del archivo
+            db: Sesión de base de datos
+            range_header: Valor del header HTTP Range (opcional). Si es válido
+                solo se desencriptan los segmentos que cubren el rango.
 
         Returns:
-            Tuple[bytes, str, str]: (datos_archivo, nombre_original, mime_type)
+            FileDownload: segmentos desencriptados y metadatos de la respuesta
 
         Raises:
             FileNotFoundError: Si el archivo no existe
+            RangeNotSatisfiableError: Si el rango pedido queda fuera del archivo
             ValueError: Si hay error en la desencriptación
         """
-        print(
-            f"DEBUG download_file: file_id recibido = {file_id}, tipo = {type(file_id)}"
-        )
+        started_at = time.perf_counter()
 
         # Obtener información del archivo
         file_record = await self.get_file_by_id(file_id, db)
 
         if not file_record:
-            print(f"DEBUG: get_file_by_id retornó None para file_id {file_id}")
-
-            # Hacer una búsqueda manual para verificar qué archivos existen
-            normalized_id = self._normalize_uuid(file_id)
-            print(f"DEBUG: ID normalizado: {normalized_id}")
-
-            stm_all = select(self.fileModel).filter(self.fileModel.is_active)
-            result_all = await db.execute(stm_all)
-            all_files = result_all.scalars().all()
-            print(f"DEBUG: Total de archivos activos en BD: {len(all_files)}")
-            for f in all_files:
-                print(f"  - file_id en BD: {f.file_id} (tipo: {type(f.file_id)})")
-
             raise FileNotFoundError("Archivo no encontrado")
 
-        print(
-            f"DEBUG: Archivo encontrado - file_id: {file_record.file_id}, encrypted_filename: {file_record.encrypted_filename}"
-        )
-
         # Construir ruta del archivo encriptado
         file_path = FileStorageConfig.get_full_file_path(
             str(file_record.file_type), str(file_record.encrypted_filename)
         )
 
-        print(f"DEBUG: Buscando archivo en ruta: {file_path}")
-
-        # Desencriptar archivo
-        decrypted_data = FileEncryption.decrypt_file_from_disk(
+        # Abrir el archivo (verifica la clave y la cabecera antes de responder)
+        reader = await io_executor.run(
+            EncryptedFileReader,
             file_path,
             str(file_record.encryption_salt),
             str(file_record.encryption_key_hash),
         )
 
-        return (
-            decrypted_data,
-            str(file_record.original_filename),
-            str(file_record.mime_type),
+        try:
+            byte_range = parse_range_header(range_header, reader.plaintext_size)
+        except RangeNotSatisfiableError:
+            reader.close()
+            raise
+
+        if byte_range:
+            chunks = reader.iter_range(*byte_range)
+            content_length = byte_range[1] - byte_range[0] + 1
+        else:
+            chunks = reader.iter_chunks()
+            content_length = reader.plaintext_size
+
+        return FileDownload(
+            chunks=self._stream_decrypted(reader, chunks, started_at),
+            original_filename=str(file_record.original_filename),
+            mime_type=str(file_record.mime_type),
+            content_length=content_length,
+            total_size=reader.plaintext_size,
+            byte_range=byte_range,
         )
 
+    @staticmethod
+    async def _stream_decrypted(
+        reader: EncryptedFileReader, chunks: Iterator[bytes], started_at: float
+    ) -> AsyncIterator[bytes]:
+        """
+        Entrega los segmentos desencriptados a medida que están listos,
+        registrando el tiempo al primer byte (desde que se pidió la descarga)
+        y los bytes en vuelo.
+        """
+        first_chunk = True
+        completed = False
+        download_metrics.started()
+        try:
+            while True:
+                # Lectura y desencriptado de cada segmento en el pool de hilos
+                chunk = await io_executor.run(next, chunks, None)
+                if chunk is None:
+                    break
+                if first_chunk:
+                    download_metrics.ttfb.observe(time.perf_counter() - started_at)
+                    first_chunk = False
+                download_metrics.chunk_ready(len(chunk))
+                try:
+                    yield chunk
+                finally:
+                    download_metrics.chunk_sent(len(chunk))
+            completed = True
+        finally:
+            reader.close()
+            download_metrics.finished(completed)
+
     async def update_file_metadata(
         self, file_id: str, db: AsyncSession, description: Optional[str] = None
     ) -> Optional[Files]:
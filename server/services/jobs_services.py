@@ -0,0 +1,314 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.Jobs import Jobs
+from database.db import SessionLocal
+from config.config import job_lease_seconds, job_heartbeat_interval
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """La tarea se detuvo porque se pidió su cancelación o perdió el lease"""
+
+
+class JobConflictError(Exception):
+    """Ya hay una tarea activa del mismo tipo (en este u otro worker)"""
+
+    def __init__(self, active_job: Optional[Jobs]):
+        self.active_job = active_job
+        super().__init__("Ya hay una tarea del mismo tipo en ejecución")
+
+
+class JobContext:
+    """
+    Estado en memoria de una tarea en ejecución. El runner informa su avance
+    con `report`; el heartbeat lo persiste periódicamente y trae de vuelta el
+    pedido de cancelación.
+    """
+
+    def __init__(self, job_id: uuid.UUID):
+        self.job_id = job_id
+        self.progress = 0.0
+        self.stats: Dict[str, Any] = {}
+        self.message: Optional[str] = None
+        self.cancelled = False
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled("Tarea cancelada")
+
+    def report(self, stats: Dict[str, Any], progress: Optional[float] = None, message: Optional[str] = None):
+        """Actualiza el avance; si se pidió cancelar, lanza JobCancelled"""
+        self.stats = stats
+        if progress is None:
+            progress = stats.get("progress")
+        if progress is not None:
+            self.progress = float(progress)
+        if message is not None:
+            self.message = message
+        self.raise_if_cancelled()
+
+
+JobRunner = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobsService:
+    """
+    Registro de tareas en segundo plano respaldado por la tabla `jobs`.
+
+    - Exclusión entre workers: una tarea activa ocupa `active_key` (índice
+      único), así que solo un worker puede ejecutar un tipo de tarea a la vez.
+    - Lease y heartbeat: el worker dueño renueva `lease_expires_at` cada
+      `heartbeat_interval` segundos. Si el worker muere, el lease vence y la
+      tarea se marca como fallida al intentar lanzar otra del mismo tipo (o al
+      arrancar la aplicación).
+    - Cancelación: `request_cancel` marca `cancel_requested`; el dueño lo ve
+      en el siguiente heartbeat y la tarea se corta en su próximo `report`.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        lease_seconds: float = 60,
+        heartbeat_interval: float = 10,
+    ):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: Dict[uuid.UUID, asyncio.Task] = {}
+        self._contexts: Dict[uuid.UUID, JobContext] = {}
+
+    def _lease_until(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.lease_seconds)
+
+    @staticmethod
+    def _expire_stale(now: datetime):
+        return (
+            update(Jobs)
+            .where(Jobs.active_key.isnot(None), Jobs.lease_expires_at < now)
+            .values(
+                status="failed",
+                active_key=None,
+                finished_at=now,
+                message="Lease vencido: el worker dejó de responder",
+            )
+        )
+
+    async def expire_stale_jobs(self) -> int:
+        """Marca como fallidas las tareas cuyo lease venció (llamar al arrancar)"""
+        async with self.session_factory() as db:
+            result = await db.execute(self._expire_stale(datetime.utcnow()))
+            await db.commit()
+            return result.rowcount or 0
+
+    async def start_job(
+        self,
+        job_type: str,
+        runner: JobRunner,
+        user_id: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Jobs:
+        """
+        Registra la tarea y la ejecuta en segundo plano en este worker.
+
+        Raises:
+            JobConflictError: Si ya hay una tarea activa del mismo tipo
+        """
+        now = datetime.utcnow()
+        job = Jobs(
+            job_type=job_type,
+            status="running",
+            active_key=job_type,
+            params=params,
+            owner=self.owner,
+            heartbeat_at=now,
+            lease_expires_at=self._lease_until(now),
+            created_by=uuid.UUID(user_id) if user_id else None,
+            created_at=now,
+            started_at=now,
+        )
+        async with self.session_factory() as db:
+            # Liberar una tarea del mismo tipo cuyo worker dejó de responder
+            await db.execute(self._expire_stale(now).where(Jobs.active_key == job_type))
+            db.add(job)
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                result = await db.execute(select(Jobs).where(Jobs.active_key == job_type))
+                raise JobConflictError(result.scalars().first())
+
+        context = JobContext(job.job_id)
+        self._contexts[job.job_id] = context
+        task = asyncio.create_task(self._execute(context, runner))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._forget(job.job_id))
+        return job
+
+    def _forget(self, job_id: uuid.UUID):
+        self._tasks.pop(job_id, None)
+        self._contexts.pop(job_id, None)
+
+    async def _execute(self, context: JobContext, runner: JobRunner):
+        heartbeat = asyncio.create_task(self._heartbeat_loop(context))
+        status = "completed"
+        interrupted = False
+        try:
+            await runner(context)
+        except JobCancelled as e:
+            status = "cancelled"
+            context.message = context.message or str(e)
+        except asyncio.CancelledError:
+            status = "cancelled"
+            context.message = "Interrumpida al detener la aplicación"
+            interrupted = True
+        except Exception as e:
+            logger.error(f"Error en tarea {context.job_id}: {e}")
+            status = "failed"
+            context.message = str(e)
+        finally:
+            heartbeat.cancel()
+
+        try:
+            await self._finish(context, status)
+        except Exception as e:
+            logger.error(f"Error al cerrar la tarea {context.job_id}: {e}")
+        if interrupted:
+            raise asyncio.CancelledError()
+
+    async def _heartbeat_loop(self, context: JobContext):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self._heartbeat(context)
+            except Exception as e:
+                logger.error(f"Error en heartbeat de la tarea {context.job_id}: {e}")
+
+    async def _heartbeat(self, context: JobContext):
+        """Persiste el avance, renueva el lease y lee el pedido de cancelación"""
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Jobs)
+                .where(
+                    Jobs.job_id == context.job_id,
+                    Jobs.owner == self.owner,
+                    Jobs.active_key.isnot(None),
+                )
+                .values(
+                    heartbeat_at=now,
+                    lease_expires_at=self._lease_until(now),
+                    progress=context.progress,
+                    stats=context.stats,
+                    message=context.message,
+                )
+            )
+            cancel_requested = (
+                await db.execute(
+                    select(Jobs.cancel_requested).where(Jobs.job_id == context.job_id)
+                )
+            ).scalar()
+            await db.commit()
+
+        if result.rowcount == 0:
+            # Otro worker dio la tarea por perdida: dejar de escribir
+            context.message = "Lease perdido"
+            context.cancelled = True
+        elif cancel_requested:
+            context.cancelled = True
+
+    async def _finish(self, context: JobContext, status: str):
+        now = datetime.utcnow()
+        values = {
+            "status": status,
+            "active_key": None,
+            "finished_at": now,
+            "heartbeat_at": now,
+            "lease_expires_at": None,
+            "stats": context.stats,
+            "message": context.message,
+        }
+        if status == "completed":
+            values["progress"] = 100.0
+        else:
+            values["progress"] = context.progress
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Jobs)
+                .where(
+                    Jobs.job_id == context.job_id,
+                    Jobs.owner == self.owner,
+                    Jobs.active_key.isnot(None),
+                )
+                .values(**values)
+            )
+            if result.rowcount == 0:
+                # Ya se dio por perdida (lease vencido): no pisar su estado final
+                await db.rollback()
+                logger.warning(
+                    f"Tarea {context.job_id} ya cerrada al terminar (lease vencido); "
+                    f"no se registra como {status}"
+                )
+                return
+            await db.commit()
+
+    async def get_job(self, job_id: str, db: AsyncSession) -> Optional[Jobs]:
+        result = await db.execute(select(Jobs).where(Jobs.job_id == uuid.UUID(job_id)))
+        return result.scalars().first()
+
+    async def get_latest_job(self, job_type: str, db: AsyncSession) -> Optional[Jobs]:
+        result = await db.execute(
+            select(Jobs)
+            .where(Jobs.job_type == job_type)
+            .order_by(Jobs.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def list_jobs(
+        self, db: AsyncSession, job_type: Optional[str] = None, limit: int = 50
+    ) -> List[Jobs]:
+        stmt = select(Jobs).order_by(Jobs.created_at.desc()).limit(limit)
+        if job_type:
+            stmt = stmt.where(Jobs.job_type == job_type)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def request_cancel(self, job_id: str, db: AsyncSession) -> Optional[Jobs]:
+        """Pide la cancelación de una tarea activa (la ve el worker que la ejecuta)"""
+        job_uuid = uuid.UUID(job_id)
+        await db.execute(
+            update(Jobs)
+            .where(Jobs.job_id == job_uuid, Jobs.active_key.isnot(None))
+            .values(cancel_requested=True)
+        )
+        await db.commit()
+
+        # Si la tarea corre en este worker no hace falta esperar al heartbeat
+        context = self._contexts.get(job_uuid)
+        if context is not None:
+            context.cancelled = True
+        return await self.get_job(job_id, db)
+
+    async def shutdown(self):
+        """Interrumpe las tareas de este worker y las marca como canceladas"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+jobs_service = JobsService(
+    lease_seconds=job_lease_seconds, heartbeat_interval=job_heartbeat_interval
+)
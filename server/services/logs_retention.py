@@ -0,0 +1,393 @@
+"""
+Retención de la auditoría por meses.
+
+En MariaDB/MySQL la tabla `logs` está particionada por mes
+(`PARTITION BY RANGE (TO_DAYS(created_at))`, particiones `pAAAAMM` más `pmax`
+para lo que quede por delante; ver migración 6). Aplicar la retención a un mes
+es exportarlo a `LOGS_ARCHIVE_DIR/logs-AAAA-MM.jsonl.gz` y descartar su
+partición con `ALTER TABLE ... DROP PARTITION`, que no depende de la cantidad
+de filas. En otros motores (SQLite en desarrollo) el mes se borra en lotes
+acotados por clave primaria.
+
+El rollup diario (`logs_daily_rollup`) no se toca: los resúmenes y tendencias
+de meses archivados siguen disponibles.
+
+Se lanza como tarea en segundo plano (POST /logs/retention) o desde la línea
+de comandos:
+
+    python -m services.logs_retention [--months N] [--no-archive]
+"""
+
+from sqlalchemy import select, delete, func, inspect, text
+from sqlalchemy.engine import Connection
+from models.Logs import Logs
+from database.db import SessionLocal, engine
+from services.jobs_services import jobs_service, JobContext
+from utils.executors import io_executor
+from config.config import (
+    logs_retention_months,
+    logs_archive_dir,
+    logs_partitions_ahead,
+    logs_retention_batch_size,
+)
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+RETENTION_JOB_TYPE = "logs_retention"
+
+# Partición final que recibe todo lo posterior a los meses creados
+MAXVALUE_PARTITION = "pmax"
+
+_EXPORTED_COLUMNS = [
+    "log_id",
+    "user_id",
+    "action",
+    "entity_type",
+    "entity_id",
+    "description",
+    "created_at",
+    "ip_address",
+]
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def partition_clauses(first_month: date, last_month: date) -> List[str]:
+    """Definiciones `PARTITION pAAAAMM VALUES LESS THAN (...)` de un rango de meses"""
+    clauses = []
+    month = month_start(first_month)
+    while month <= last_month:
+        upper = add_months(month, 1).isoformat()
+        clauses.append(
+            f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{upper}'))"
+        )
+        month = add_months(month, 1)
+    return clauses
+
+
+def retention_cutoff(months: int, today: Optional[date] = None) -> date:
+    """Primer mes que se conserva con una retención de `months` meses completos"""
+    return add_months(month_start(today or datetime.utcnow().date()), -months)
+
+
+def _is_mysql(dialect_name: str) -> bool:
+    return dialect_name in ("mysql", "mariadb")
+
+
+def logs_partitions(conn: Connection) -> Dict[str, Optional[int]]:
+    """Particiones de `logs` y su cota (TO_DAYS), vacío si no está particionada"""
+    if not _is_mysql(conn.dialect.name):
+        return {}
+    result = conn.execute(
+        text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'logs' "
+            "AND PARTITION_NAME IS NOT NULL"
+        )
+    )
+    return {
+        name: None if description == "MAXVALUE" else int(description)
+        for name, description in result.all()
+    }
+
+
+def partition_logs_table(conn: Connection, months_ahead: int = logs_partitions_ahead) -> None:
+    """
+    Particiona `logs` por mes (migración 6, solo MariaDB/MySQL).
+
+    Una tabla particionada no admite claves foráneas y toda clave única debe
+    incluir la columna de partición: se quita la FK a `users` (el ORM sigue
+    anulando `user_id` al borrar un usuario) y la clave primaria pasa a ser
+    (log_id, created_at). Reescribe la tabla una sola vez.
+    """
+    if not _is_mysql(conn.dialect.name) or logs_partitions(conn):
+        return
+
+    for foreign_key in inspect(conn).get_foreign_keys("logs"):
+        conn.execute(text(f"ALTER TABLE logs DROP FOREIGN KEY {foreign_key['name']}"))
+    conn.execute(text("ALTER TABLE logs DROP PRIMARY KEY, ADD PRIMARY KEY (log_id, created_at)"))
+
+    current = month_start(datetime.utcnow())
+    oldest = conn.execute(select(func.min(Logs.created_at))).scalar()
+    first = month_start(oldest) if oldest else current
+    clauses = partition_clauses(min(first, current), add_months(current, months_ahead))
+    clauses.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE")
+    conn.execute(
+        text(f"ALTER TABLE logs PARTITION BY RANGE (TO_DAYS(created_at)) ({', '.join(clauses)})")
+    )
+
+
+def _month_partitions(partitions: Dict[str, Optional[int]]) -> List[date]:
+    months = []
+    for name in partitions:
+        if name != MAXVALUE_PARTITION and len(name) == 7 and name[1:].isdigit():
+            months.append(date(int(name[1:5]), int(name[5:7]), 1))
+    return sorted(months)
+
+
+def _extend_partitions(conn: Connection, months_ahead: int) -> List[str]:
+    partitions = logs_partitions(conn)
+    months = _month_partitions(partitions)
+    if MAXVALUE_PARTITION not in partitions or not months:
+        return []
+
+    target = add_months(month_start(datetime.utcnow()), months_ahead)
+    if months[-1] >= target:
+        return []
+    clauses = partition_clauses(add_months(months[-1], 1), target)
+    clauses.append(f"PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE")
+    conn.execute(
+        text(f"ALTER TABLE logs REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO ({', '.join(clauses)})")
+    )
+    return [clause.split()[1] for clause in clauses[:-1]]
+
+
+async def ensure_partitions(months_ahead: int = logs_partitions_ahead) -> List[str]:
+    """
+    Crea las particiones mensuales de los próximos `months_ahead` meses
+    partiendo `pmax` (llamar al arrancar y en cada retención). Así `pmax`
+    queda vacía y el REORGANIZE no mueve filas.
+
+    Returns:
+        List[str]: Particiones creadas
+    """
+    async with engine.begin() as conn:
+        if not _is_mysql(conn.dialect.name):
+            return []
+        return await conn.run_sync(_extend_partitions, months_ahead)
+
+
+def _archive_path(month: date) -> str:
+    return os.path.join(logs_archive_dir, f"logs-{month.year:04d}-{month.month:02d}.jsonl.gz")
+
+
+def _open_archive(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return gzip.open(f"{path}.tmp", "wt", encoding="utf-8")
+
+
+def _write_lines(archive, lines: List[str]) -> None:
+    archive.write("".join(lines))
+
+
+def _close_archive(archive, path: str, complete: bool) -> None:
+    archive.close()
+    if complete:
+        os.replace(f"{path}.tmp", path)
+    else:
+        os.remove(f"{path}.tmp")
+
+
+def _log_line(row) -> str:
+    values = {}
+    for column, value in zip(_EXPORTED_COLUMNS, row):
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif value is not None and column in ("log_id", "user_id"):
+            value = str(value)
+        values[column] = value
+    return json.dumps(values, ensure_ascii=False) + "\n"
+
+
+async def export_month(month: date, batch_size: int = logs_retention_batch_size) -> Tuple[str, int]:
+    """
+    Exporta los logs de un mes a JSONL comprimido (un objeto por línea, en
+    orden de created_at). Se escribe a un `.tmp` y se renombra al terminar:
+    un archivo `logs-AAAA-MM.jsonl.gz` siempre está completo.
+
+    Returns:
+        Tuple[str, int]: Ruta del archivo y cantidad de logs exportados
+    """
+    start = datetime.combine(month, datetime.min.time())
+    end = datetime.combine(add_months(month, 1), datetime.min.time())
+    columns = [getattr(Logs, column) for column in _EXPORTED_COLUMNS]
+    path = _archive_path(month)
+
+    archive = await io_executor.run(_open_archive, path)
+    exported = 0
+    complete = False
+    try:
+        last: Optional[Tuple[datetime, object]] = None
+        while True:
+            stmt = select(*columns).where(Logs.created_at >= start, Logs.created_at < end)
+            if last is not None:
+                stmt = stmt.where(
+                    (Logs.created_at > last[0])
+                    | ((Logs.created_at == last[0]) & (Logs.log_id > last[1]))
+                )
+            stmt = stmt.order_by(Logs.created_at, Logs.log_id).limit(batch_size)
+            async with SessionLocal() as db:
+                rows = (await db.execute(stmt)).all()
+            if not rows:
+                break
+            await io_executor.run(_write_lines, archive, [_log_line(row) for row in rows])
+            exported += len(rows)
+            last = (rows[-1].created_at, rows[-1].log_id)
+        complete = True
+    finally:
+        await io_executor.run(_close_archive, archive, path, complete)
+    return path, exported
+
+
+async def delete_range(start: Optional[datetime], end: datetime, batch_size: int = logs_retention_batch_size) -> int:
+    """
+    Borra los logs con created_at en [start, end) en lotes de `batch_size`
+    filas, un lote por transacción (sin bloquear la tabla entera).
+    """
+    deleted = 0
+    while True:
+        async with SessionLocal() as db:
+            stmt = select(Logs.log_id).where(Logs.created_at < end)
+            if start is not None:
+                stmt = stmt.where(Logs.created_at >= start)
+            ids = list((await db.execute(stmt.limit(batch_size))).scalars().all())
+            if not ids:
+                return deleted
+            await db.execute(delete(Logs).where(Logs.log_id.in_(ids)))
+            await db.commit()
+        deleted += len(ids)
+
+
+async def drop_month(month: date, batch_size: int = logs_retention_batch_size) -> int:
+    """
+    Descarta los logs de un mes: DROP PARTITION si la tabla está particionada,
+    si no, borrado en lotes.
+
+    Returns:
+        int: Logs descartados
+    """
+    start = datetime.combine(month, datetime.min.time())
+    end = datetime.combine(add_months(month, 1), datetime.min.time())
+
+    async with engine.begin() as conn:
+        partitions = await conn.run_sync(logs_partitions)
+        name = partition_name(month)
+        if name in partitions:
+            count = (
+                await conn.execute(
+                    select(func.count()).where(Logs.created_at >= start, Logs.created_at < end)
+                )
+            ).scalar() or 0
+            await conn.execute(text(f"ALTER TABLE logs DROP PARTITION {name}"))
+            return count
+    return await delete_range(start, end, batch_size)
+
+
+async def _oldest_month() -> Optional[date]:
+    async with SessionLocal() as db:
+        oldest = (await db.execute(select(func.min(Logs.created_at)))).scalar()
+    return month_start(oldest) if oldest else None
+
+
+async def purge_before(
+    cutoff: date,
+    archive: bool = True,
+    context: Optional[JobContext] = None,
+    batch_size: int = logs_retention_batch_size,
+) -> Dict:
+    """
+    Archiva (opcional) y descarta, mes por mes, los logs de los meses
+    completos anteriores a `cutoff` (primer día del primer mes que se conserva).
+    """
+    from services.logs_services import logs_service
+
+    cutoff = month_start(cutoff)
+    oldest = await _oldest_month()
+    months = []
+    month = oldest
+    while month is not None and month < cutoff:
+        months.append(month)
+        month = add_months(month, 1)
+
+    stats = {
+        "cutoff": cutoff.isoformat(),
+        "months": len(months),
+        "processed_months": 0,
+        "exported": 0,
+        "deleted": 0,
+        "files": [],
+    }
+    for index, month in enumerate(months, start=1):
+        if archive:
+            path, exported = await export_month(month, batch_size)
+            if exported:
+                stats["files"].append(path)
+                stats["exported"] += exported
+        stats["deleted"] += await drop_month(month, batch_size)
+        stats["processed_months"] = index
+        if context is not None:
+            context.report(dict(stats), progress=round(index * 100 / len(months), 2))
+
+    if months:
+        logs_service.count_cache.clear()
+    return stats
+
+
+async def apply_retention(
+    months: int = logs_retention_months,
+    archive: bool = True,
+    context: Optional[JobContext] = None,
+) -> Dict:
+    """Crea las particiones que falten y conserva solo los últimos `months` meses"""
+    await ensure_partitions()
+    return await purge_before(retention_cutoff(months), archive=archive, context=context)
+
+
+async def start_retention(
+    months: int = logs_retention_months,
+    archive: bool = True,
+    user_id: Optional[str] = None,
+):
+    """
+    Lanza la retención como tarea en segundo plano.
+
+    Raises:
+        JobConflictError: Si ya hay una retención en curso
+    """
+
+    async def run(context: JobContext):
+        await apply_retention(months, archive, context=context)
+
+    params = {"months": months, "archive": archive}
+    return await jobs_service.start_job(RETENTION_JOB_TYPE, run, user_id, params)
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Archiva y descarta los meses viejos de logs")
+    parser.add_argument("--months", type=int, default=logs_retention_months)
+    parser.add_argument("--no-archive", dest="archive", action="store_false")
+    args = parser.parse_args()
+
+    async def run():
+        import models  # noqa: F401 (registra todos los mappers)
+
+        try:
+            result = await apply_retention(args.months, args.archive)
+            print(f"Retención aplicada: {result}")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    _main()
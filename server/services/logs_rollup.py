@@ -0,0 +1,232 @@
+"""
+Rollup diario de auditoría (`logs_daily_rollup`).
+
+- Incremental: el escritor de logs suma cada lote con un upsert
+  (`count = count + n`) en la misma transacción que el INSERT de los logs.
+- Backfill: recalcula días completos desde `logs` (DELETE + INSERT ... SELECT
+  con GROUP BY, un día por transacción). Se lanza como tarea en segundo plano
+  (POST /logs/rollup/backfill, o al arrancar si el rollup está vacío) o desde
+  la línea de comandos:
+
+      python -m services.logs_rollup [--from AAAA-MM-DD] [--to AAAA-MM-DD]
+"""
+
+from sqlalchemy import select, insert, delete, func, literal, Date
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.Logs import Logs
+from models.LogsDailyRollup import LogsDailyRollup, ANONYMOUS_USER_ID
+from database.db import SessionLocal
+from services.jobs_services import jobs_service, JobContext, JobConflictError
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_BACKFILL_JOB_TYPE = "logs_rollup_backfill"
+
+_ROLLUP_KEY = ["day", "action", "entity_type", "user_id"]
+
+
+def rollup_increments(rows: Iterable[Dict]) -> List[Dict]:
+    """Agrupa filas de logs en incrementos del rollup, ordenados por clave"""
+    counts: Dict[Tuple, int] = {}
+    for row in rows:
+        created_at = row.get("created_at") or datetime.utcnow()
+        key = (
+            created_at.date(),
+            row["action"],
+            row["entity_type"],
+            row.get("user_id") or ANONYMOUS_USER_ID,
+        )
+        counts[key] = counts.get(key, 0) + 1
+    # Orden estable de claves: dos workers que suman lotes a la vez bloquean
+    # las mismas filas en el mismo orden (sin deadlocks)
+    return [
+        dict(zip(_ROLLUP_KEY, key), count=count)
+        for key, count in sorted(counts.items(), key=lambda item: tuple(map(str, item[0])))
+    ]
+
+
+def _increment_statement(dialect_name: str, increments: List[Dict]):
+    table = LogsDailyRollup.__table__
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table).values(increments)
+        return stmt.on_duplicate_key_update(count=table.c["count"] + stmt.inserted["count"])
+
+    if dialect_name in ("postgresql", "sqlite"):
+        dialect_module = postgresql if dialect_name == "postgresql" else sqlite
+        stmt = dialect_module.insert(table).values(increments)
+        return stmt.on_conflict_do_update(
+            index_elements=_ROLLUP_KEY,
+            set_={"count": table.c["count"] + stmt.excluded["count"]},
+        )
+    return None
+
+
+async def add_to_rollup(db: AsyncSession, rows: List[Dict]) -> None:
+    """Suma las filas de logs al rollup (sin commit: va en la transacción del lote)"""
+    increments = rollup_increments(rows)
+    if not increments:
+        return
+
+    stmt = _increment_statement(db.bind.dialect.name, increments)
+    if stmt is not None:
+        await db.execute(stmt)
+        return
+
+    # Motores sin upsert: leer y escribir fila por fila
+    for increment in increments:
+        current = await db.get(
+            LogsDailyRollup, tuple(increment[column] for column in _ROLLUP_KEY)
+        )
+        if current is None:
+            db.add(LogsDailyRollup(**increment))
+        else:
+            current.count += increment["count"]
+
+
+async def rebuild_day(db: AsyncSession, day: date) -> int:
+    """
+    Recalcula el rollup de un día desde `logs` (sin commit).
+
+    Returns:
+        int: Cantidad de logs del día
+    """
+    start = datetime.combine(day, time.min)
+    end = start + timedelta(days=1)
+    user_id = func.coalesce(Logs.user_id, literal(ANONYMOUS_USER_ID, Logs.user_id.type))
+
+    await db.execute(delete(LogsDailyRollup).where(LogsDailyRollup.day == day))
+    grouped = (
+        select(
+            literal(day, Date).label("day"),
+            Logs.action,
+            Logs.entity_type,
+            user_id.label("user_id"),
+            func.count().label("count"),
+        )
+        .where(Logs.created_at >= start, Logs.created_at < end)
+        .group_by(Logs.action, Logs.entity_type, user_id)
+    )
+    await db.execute(insert(LogsDailyRollup).from_select(_ROLLUP_KEY + ["count"], grouped))
+
+    total = await db.execute(
+        select(func.coalesce(func.sum(LogsDailyRollup.count), 0)).where(
+            LogsDailyRollup.day == day
+        )
+    )
+    return int(total.scalar() or 0)
+
+
+async def _logs_date_range(session_factory=SessionLocal) -> Optional[Tuple[date, date]]:
+    async with session_factory() as db:
+        first, last = (
+            await db.execute(select(func.min(Logs.created_at), func.max(Logs.created_at)))
+        ).one()
+    if first is None:
+        return None
+    return first.date(), last.date()
+
+
+async def backfill_rollup(
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+    context: Optional[JobContext] = None,
+    session_factory=SessionLocal,
+) -> Dict:
+    """
+    Reconstruye el rollup para los días [start_day, end_day] (por defecto,
+    todo el rango de `logs`), un día por transacción.
+    """
+    bounds = await _logs_date_range(session_factory)
+    if bounds is None:
+        return {"days": 0, "processed_days": 0, "logs": 0}
+
+    start_day = start_day or bounds[0]
+    end_day = end_day or bounds[1]
+    total_days = max(0, (end_day - start_day).days + 1)
+
+    processed = 0
+    logs = 0
+    day = start_day
+    while day <= end_day:
+        async with session_factory() as db:
+            logs += await rebuild_day(db, day)
+            await db.commit()
+        processed += 1
+        day += timedelta(days=1)
+
+        stats = {"days": total_days, "processed_days": processed, "logs": logs}
+        if context is not None:
+            context.report(stats, progress=round(processed * 100 / total_days, 2))
+    return {"days": total_days, "processed_days": processed, "logs": logs}
+
+
+async def start_rollup_backfill(
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+    user_id: Optional[str] = None,
+):
+    """
+    Lanza el backfill como tarea en segundo plano.
+
+    Raises:
+        JobConflictError: Si ya hay un backfill en curso
+    """
+
+    async def run(context: JobContext):
+        await backfill_rollup(start_day, end_day, context=context)
+
+    params = {
+        "from": start_day.isoformat() if start_day else None,
+        "to": end_day.isoformat() if end_day else None,
+    }
+    return await jobs_service.start_job(ROLLUP_BACKFILL_JOB_TYPE, run, user_id, params)
+
+
+async def ensure_rollup_backfill() -> Optional[str]:
+    """
+    Lanza el backfill si hay logs pero el rollup está vacío (primer arranque
+    con el rollup). Llamar al arrancar, después de las migraciones.
+
+    Returns:
+        Optional[str]: ID de la tarea lanzada, o None si no hacía falta
+    """
+    async with SessionLocal() as db:
+        has_rollup = (await db.execute(select(LogsDailyRollup.day).limit(1))).first()
+        has_logs = (await db.execute(select(Logs.log_id).limit(1))).first()
+    if has_rollup is not None or has_logs is None:
+        return None
+
+    try:
+        job = await start_rollup_backfill()
+    except JobConflictError:
+        return None
+    return str(job.job_id)
+
+
+def _main():
+    parser = argparse.ArgumentParser(description="Reconstruye logs_daily_rollup desde logs")
+    parser.add_argument("--from", dest="start_day", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="end_day", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    async def run():
+        import models  # noqa: F401 (registra todos los mappers)
+        from database.db import engine
+
+        try:
+            result = await backfill_rollup(args.start_day, args.end_day)
+            print(f"Rollup reconstruido: {result}")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    _main()
@@ -1,15 +1,83 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from models.Logs import Logs
-from datetime import datetime
-from typing import Dict, Optional, List
-from uuid import UUID
-from sqlalchemy import select, delete, func
+from models.Users import Users
+from models.LogsDailyRollup import LogsDailyRollup, ANONYMOUS_USER_ID
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, Optional, List, NamedTuple
+from uuid import UUID, uuid4
+from collections import OrderedDict
+from sqlalchemy import select, delete, func, text
 from sqlalchemy.orm import joinedload
+from services.logs_writer import log_writer
+from services.logs_retention import delete_range, month_start, purge_before
+from utils.pagination import Page, paginate
+from config.config import logs_count_cache_ttl_seconds, logs_count_cache_max_size
+import threading
+import time
+
+# Modos de conteo del listado de logs
+COUNT_EXACT = "exact"  # COUNT(*) en cada pedido
+COUNT_ESTIMATED = "estimated"  # Estadísticas de la tabla (sin filtros) o cache
+COUNT_CACHED = "cached"  # COUNT(*) memorizado por filtros durante un TTL
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_CACHED)
+# Total sumado desde logs_daily_rollup (exacto, con filtros alineados a días)
+COUNT_ROLLUP = "rollup"
+
+
+class LogCount(NamedTuple):
+    total: int
+    mode: str  # Modo con el que se obtuvo realmente el total
+
+
+class LogCountCache:
+    """
+    Cache LRU con expiración de los totales de logs por combinación de filtros.
+    El listado de auditoría crece de a poco y un total con unos segundos de
+    atraso es aceptable en pantalla; así el COUNT se paga una vez por TTL.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(filters: Optional[Dict]) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in (filters or {}).items() if v))
+
+    def get(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            total, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return total
+
+    def set(self, key: tuple, total: int) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (total, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 class LogsService:
     def __init__(self):
         self.model = Logs
+        self.count_cache = LogCountCache(
+            max_size=logs_count_cache_max_size, ttl_seconds=logs_count_cache_ttl_seconds
+        )
 
     async def create_log(
         self,
@@ -20,9 +88,14 @@ class LogsService:
         entity_id: str = "Desconocido",
         description: str = "Sin descripción",
         ip_address: str = "Desconocido",
-    ) -> Logs:
+        durable: bool = False,
+    ) -> None:
         """
-        Crea un nuevo registro de log en la base de datos
+        Registra un log de auditoría a través del escritor en segundo plano.
+
+        Por defecto es fire-and-forget: el log se encola y se inserta en lote
+        fuera del request (la sesión `db` del request no se toca). Con
+        `durable=True` espera a que la fila esté persistida.
         """
 
         # Convertir user_id a UUID si es string
@@ -33,20 +106,19 @@ class LogsService:
                 print(f"Error: user_id {user_id} no es un UUID válido")
                 user_id = None
 
-        log = self.model(
-            # log_id se genera automáticamente por el valor default
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,  # Puede ser string
-            description=description,
-            ip_address=ip_address,
-            created_at=datetime.utcnow(),
-        )
-        db.add(log)
-        await db.commit()
-        await db.refresh(log)
-        return log
+        row = {
+            "log_id": uuid4(),
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": str(entity_id) if entity_id is not None else None,
+            "description": description,
+            "ip_address": ip_address,
+            "created_at": datetime.utcnow(),
+        }
+        future = await log_writer.submit(row, durable=durable)
+        if future is not None:
+            await future
 
     async def get_logs(
         self,
@@ -80,6 +152,32 @@ class LogsService:
             print(f"Error al obtener logs: {e}")  # Usa tu logger mejor
             return []
 
+    async def get_logs_page(
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        with_total: bool = False,
+    ) -> Page:
+        """
+        Obtiene una página de logs (del más reciente al más antiguo) paginada
+        por cursor sobre (created_at, log_id), sin OFFSET.
+
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        stmt = select(self.model).options(joinedload(self.model.user))
+        stmt = self._apply_filters(stmt, filters)
+        return await paginate(
+            db,
+            stmt,
+            [self.model.created_at, self.model.log_id],
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+        )
+
     async def get_log_by_id(self, db: AsyncSession, log_id: str) -> Optional[Logs]:
         """
         Obtiene un log por su ID
@@ -92,11 +190,19 @@ class LogsService:
         """
         Elimina logs más antiguos que la fecha especificada
         Retorna el número de logs eliminados
+
+        Los meses completos anteriores se descartan por partición (ver
+        services/logs_retention.py) y el resto del último mes en lotes, sin
+        un DELETE único sobre toda la tabla. No archiva: para exportar antes
+        de borrar usar la retención (POST /logs/retention).
         """
-        stm = delete(self.model).where(self.model.created_at < date)
-        result = await db.execute(stm)
-        await db.commit()
-        return result.rowcount if hasattr(result, "rowcount") else None
+        cutoff = month_start(date)
+        stats = await purge_before(cutoff, archive=False)
+        deleted = stats["deleted"] + await delete_range(
+            datetime.combine(cutoff, dtime.min), date
+        )
+        self.count_cache.clear()
+        return deleted
 
     async def count_logs(self, db: AsyncSession, filters: Optional[Dict] = None) -> int:
         """
@@ -107,6 +213,239 @@ class LogsService:
         result = await db.execute(stmt)
         return result.scalar() or 0
 
+    @staticmethod
+    def _day_key(value) -> str:
+        # func.date devuelve date en MySQL/PostgreSQL y texto en SQLite
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)[:10]
+
+    async def _summary_groups_from_logs(
+        self, db: AsyncSession, start_date: datetime, end_date: Optional[datetime]
+    ) -> List[tuple]:
+        """GROUP BY (día, acción, entidad, usuario) sobre `logs`, exacto al segundo"""
+        day = func.date(self.model.created_at)
+        stmt = select(
+            day,
+            self.model.action,
+            self.model.entity_type,
+            self.model.user_id,
+            func.count(),
+        ).where(self.model.created_at >= start_date)
+        if end_date is not None:
+            stmt = stmt.where(self.model.created_at <= end_date)
+        stmt = stmt.group_by(day, self.model.action, self.model.entity_type, self.model.user_id)
+        return list((await db.execute(stmt)).all())
+
+    async def _summary_groups_from_rollup(
+        self, db: AsyncSession, start_date: datetime, end_date: Optional[datetime]
+    ) -> List[tuple]:
+        """Las mismas filas leídas de logs_daily_rollup (días completos)"""
+        rollup = LogsDailyRollup
+        stmt = select(
+            rollup.day, rollup.action, rollup.entity_type, rollup.user_id, rollup.count
+        ).where(rollup.day >= start_date.date())
+        if end_date is not None:
+            stmt = stmt.where(rollup.day <= end_date.date())
+        return [
+            (day, action, entity_type, None if user_id == ANONYMOUS_USER_ID else user_id, count)
+            for day, action, entity_type, user_id, count in (await db.execute(stmt)).all()
+        ]
+
+    async def get_summary(
+        self,
+        db: AsyncSession,
+        start_date: datetime,
+        end_date: Optional[datetime] = None,
+        source: str = "rollup",
+    ) -> Dict:
+        """
+        Resumen de actividad del período por acción, entidad, usuario y día.
+
+        Con `source="rollup"` (por defecto) se lee logs_daily_rollup: pocas
+        filas por día, pero cuenta días completos (UTC). Con `source="logs"` se
+        agrupa en la base sobre `logs`, exacto al segundo.
+        """
+        if source == "logs":
+            groups = await self._summary_groups_from_logs(db, start_date, end_date)
+        else:
+            groups = await self._summary_groups_from_rollup(db, start_date, end_date)
+
+        user_ids = {user_id for _, _, _, user_id, _ in groups if user_id is not None}
+        usernames = {}
+        if user_ids:
+            result = await db.execute(
+                select(Users.id, Users.username).where(Users.id.in_(user_ids))
+            )
+            usernames = dict(result.all())
+
+        total = 0
+        actions_count: Dict[str, int] = {}
+        entities_count: Dict[str, int] = {}
+        users_count: Dict[str, Dict] = {}
+        daily_activity: Dict[str, int] = {}
+        for day_value, action, entity_type, user_id, count in groups:
+            total += count
+            actions_count[action] = actions_count.get(action, 0) + count
+            entities_count[entity_type] = entities_count.get(entity_type, 0) + count
+
+            user_key = str(user_id) if user_id is not None else "anonymous"
+            if user_key not in users_count:
+                users_count[user_key] = {
+                    "count": 0,
+                    "username": usernames.get(user_id, "Anónimo"),
+                }
+            users_count[user_key]["count"] += count
+
+            day_key = self._day_key(day_value)
+            daily_activity[day_key] = daily_activity.get(day_key, 0) + count
+
+        return {
+            "total_logs": total,
+            "actions": actions_count,
+            "entities": entities_count,
+            "users": users_count,
+            "daily_activity": dict(sorted(daily_activity.items())),
+        }
+
+    async def get_trends(
+        self,
+        db: AsyncSession,
+        start_day: date,
+        end_day: date,
+        granularity: str = "day",
+        action: Optional[str] = None,
+        entity_type: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Serie de actividad (logs por día o por mes) leída de logs_daily_rollup.
+        """
+        rollup = LogsDailyRollup
+        stmt = (
+            select(rollup.day, func.sum(rollup.count))
+            .where(rollup.day >= start_day, rollup.day <= end_day)
+            .group_by(rollup.day)
+            .order_by(rollup.day)
+        )
+        if action:
+            stmt = stmt.where(rollup.action == action)
+        if entity_type:
+            stmt = stmt.where(rollup.entity_type == entity_type)
+
+        series: Dict[str, int] = {}
+        for day, count in (await db.execute(stmt)).all():
+            period = self._day_key(day)
+            if granularity == "month":
+                period = period[:7]
+            series[period] = series.get(period, 0) + int(count)
+        return [{"period": period, "count": count} for period, count in series.items()]
+
+    async def _count_from_rollup(self, db: AsyncSession, filters: Optional[Dict]) -> Optional[int]:
+        """
+        Total exacto con el rollup si los filtros caben en su grano (ambas
+        fechas, alineadas a días completos, o ninguna). None si no se puede.
+
+        El rollup conserva días cuyos logs ya borró la retención: se suma desde
+        el día siguiente al log más antiguo y ese primer día (quizá borrado a
+        medias) se cuenta sobre `logs`.
+        """
+        filters = filters or {}
+        start_date = filters.get("start_date")
+        end_date = filters.get("end_date")
+        if bool(start_date) != bool(end_date):
+            # _apply_filters ignora una sola fecha: el total no debe acotarla
+            return None
+        if start_date and end_date:
+            if start_date.time() != dtime.min or end_date.time().replace(microsecond=0) != dtime(23, 59, 59):
+                return None
+
+        rollup = LogsDailyRollup
+        stmt = select(func.coalesce(func.sum(rollup.count), 0))
+        if filters.get("action"):
+            stmt = stmt.where(rollup.action == filters["action"])
+        if filters.get("entity_type"):
+            stmt = stmt.where(rollup.entity_type == filters["entity_type"])
+        if filters.get("user_id"):
+            try:
+                stmt = stmt.where(rollup.user_id == UUID(str(filters["user_id"])))
+            except ValueError:
+                return None
+
+        oldest = (await db.execute(select(func.min(self.model.created_at)))).scalar()
+        if oldest is None:
+            return 0
+        first_day = oldest.date()
+        start_day = start_date.date() if start_date is not None else first_day
+        end_day = end_date.date() if end_date is not None else None
+
+        head = 0
+        if start_day <= first_day:
+            # Primer día con logs: contarlo sobre la tabla
+            if end_day is None or end_day >= first_day:
+                head_start = datetime.combine(first_day, dtime.min)
+                head = await self.count_logs(
+                    db,
+                    {**filters, "start_date": head_start, "end_date": datetime.combine(first_day, dtime.max)},
+                )
+            start_day = first_day + timedelta(days=1)
+
+        stmt = stmt.where(rollup.day >= start_day)
+        if end_day is not None:
+            stmt = stmt.where(rollup.day <= end_day)
+        return head + int((await db.execute(stmt)).scalar() or 0)
+
+    async def _estimate_table_rows(self, db: AsyncSession) -> Optional[int]:
+        """
+        Cantidad aproximada de filas de `logs` según las estadísticas del motor
+        (no recorre la tabla). None si el motor no las expone.
+        """
+        dialect = db.bind.dialect.name
+        if dialect in ("mysql", "mariadb"):
+            stmt = text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+            )
+        elif dialect == "postgresql":
+            stmt = text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table")
+        else:
+            return None
+
+        value = (await db.execute(stmt, {"table": self.model.__tablename__})).scalar()
+        if value is None or value < 0:
+            return None
+        return int(value)
+
+    async def count_logs_with_mode(
+        self, db: AsyncSession, filters: Optional[Dict] = None, mode: str = COUNT_ESTIMATED
+    ) -> LogCount:
+        """
+        Total de logs para el listado según `mode`:
+
+        - exact: COUNT(*) sobre los logs filtrados.
+        - estimated: sin filtros, la cantidad de filas de las estadísticas de
+          la tabla (tiempo constante, aproximada); con filtros alineados a días,
+          la suma de logs_daily_rollup (exacta); si no, como `cached`.
+        - cached: COUNT(*) exacto memorizado por filtros durante el TTL.
+        """
+        key = self.count_cache.key(filters)
+        if mode == COUNT_EXACT:
+            total = await self.count_logs(db, filters)
+            self.count_cache.set(key, total)
+            return LogCount(total, COUNT_EXACT)
+
+        if mode == COUNT_ESTIMATED and not key:
+            estimate = await self._estimate_table_rows(db)
+            if estimate is not None:
+                return LogCount(estimate, COUNT_ESTIMATED)
+        if mode == COUNT_ESTIMATED and key:
+            total = await self._count_from_rollup(db, filters)
+            if total is not None:
+                return LogCount(total, COUNT_ROLLUP)
+
+        total = self.count_cache.get(key)
+        if total is None:
+            total = await self.count_logs(db, filters)
+            self.count_cache.set(key, total)
+        return LogCount(total, COUNT_CACHED)
+
     def _apply_filters(self, stmt, filters: Optional[Dict]):
         """
         Aplica los filtros comunes al statement
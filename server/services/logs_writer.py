@@ -0,0 +1,212 @@
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from models.Logs import Logs
+from database.db import SessionLocal
+from services.logs_rollup import add_to_rollup
+from config.config import (
+    log_writer_queue_size,
+    log_writer_batch_size,
+    log_writer_flush_interval,
+)
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LogWriter:
+    """
+    Escritor de auditoría en segundo plano.
+
+    Los logs se encolan en una asyncio.Queue acotada (si se llena, el productor
+    espera: backpressure) y una tarea los inserta en bloque con un INSERT
+    multi-fila cuando se alcanza `batch_size` o pasa `flush_interval` segundos.
+    Cada lote usa su propia sesión, así los requests no pagan el commit del log.
+    En la misma transacción se suma el lote a `logs_daily_rollup`.
+
+    Si el INSERT del lote falla, las filas se reintentan de a una para que
+    una fila inválida no descarte al resto. Una fila que viola una restricción
+    (p. ej. `user_id` de un usuario inexistente) se guarda sin usuario, y solo
+    se cuentan como fallidas las filas que tampoco así se pudieron escribir.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._closing
+
+    async def start(self):
+        """Arranca la tarea de escritura (llamar desde el lifespan de la app)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Deja de aceptar logs, vacía la cola y espera la última escritura."""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, row: Dict, durable: bool = False) -> Optional[asyncio.Future]:
+        """
+        Encola una fila de log.
+
+        Returns:
+            Un Future que se resuelve cuando la fila está persistida si
+            `durable` es True; None en caso contrario (fire-and-forget).
+        """
+        if not self.is_running:
+            error = (await self._write_each([row]))[0]
+            if error is not None:
+                raise error
+            return None
+
+        future = asyncio.get_running_loop().create_future() if durable else None
+        await self._queue.put((row, future))
+        self.enqueued += 1
+        return future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch: List[Tuple[Dict, Optional[asyncio.Future]]] = [item]
+            deadline = loop.time() + self.flush_interval
+            stop = False
+            # Un log durable fuerza la escritura inmediata del lote
+            while len(batch) < self.batch_size and batch[-1][1] is None:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stop:
+                break
+
+        # Drenar lo que haya quedado encolado durante el cierre
+        pending = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                pending.append(item)
+        for start in range(0, len(pending), self.batch_size):
+            await self._flush(pending[start : start + self.batch_size])
+
+    async def _flush(self, batch: List[Tuple[Dict, Optional[asyncio.Future]]]):
+        try:
+            await self._write([row for row, _ in batch])
+            errors: List[Optional[Exception]] = [None] * len(batch)
+        except Exception as e:
+            logger.warning(
+                f"Error al escribir lote de logs ({len(batch)} filas), "
+                f"se reintenta fila por fila: {e}"
+            )
+            errors = await self._write_each([row for row, _ in batch])
+
+        for (_, future), error in zip(batch, errors):
+            if future is None or future.done():
+                continue
+            if error is None:
+                future.set_result(True)
+            else:
+                future.set_exception(error)
+
+    async def _write_each(self, rows: List[Dict]) -> List[Optional[Exception]]:
+        """
+        Escribe las filas de a una (cada una en su transacción).
+
+        Returns:
+            List[Optional[Exception]]: Error de cada fila, o None si se escribió
+        """
+        errors: List[Optional[Exception]] = []
+        for row in rows:
+            error = await self._write_row(row)
+            if error is not None:
+                self.failed += 1
+                logger.error(
+                    f"Error al escribir log {row.get('action')} {row.get('entity_type')}: {error}"
+                )
+            errors.append(error)
+        return errors
+
+    async def _write_row(self, row: Dict) -> Optional[Exception]:
+        try:
+            await self._write([row])
+            return None
+        except IntegrityError as e:
+            if row.get("user_id") is None:
+                return e
+        except Exception as e:
+            return e
+
+        # Usuario inexistente (clave foránea): conservar el log sin usuario
+        try:
+            await self._write([{**row, "user_id": None}])
+        except Exception as e:
+            return e
+        logger.warning(
+            f"Log {row.get('action')} {row.get('entity_type')} guardado sin usuario "
+            f"(user_id {row['user_id']} inválido)"
+        )
+        return None
+
+    async def _write(self, rows: List[Dict]):
+        async with self.session_factory() as db:
+            await db.execute(insert(Logs).values(rows))
+            await add_to_rollup(db, rows)
+            await db.commit()
+        self.written += len(rows)
+        self.batches += 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.is_running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+log_writer = LogWriter(
+    max_queue=log_writer_queue_size,
+    batch_size=log_writer_batch_size,
+    flush_interval=log_writer_flush_interval,
+)
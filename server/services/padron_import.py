@@ -0,0 +1,345 @@
+from sqlalchemy import insert, select, update, func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from models.Persons import Persons
+from models.ImportCheckpoints import ImportCheckpoints
+from database.db import SessionLocal
+from utils.executors import io_executor
+from utils.text_search import PERSON_SEARCH_COLUMNS, person_search_columns
+from config.config import padron_csv_path, padron_import_batch_size
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import os
+import time
+import uuid
+import logging
+import pandas
+
+logger = logging.getLogger(__name__)
+
+# Columnas esperadas en el CSV del padrón
+PADRON_COLUMNS = ["identification", "names", "lastnames", "address", "province"]
+
+# Columnas que el padrón actualiza en personas ya existentes
+PADRON_UPDATABLE = ["names", "lastnames", "address", "province"]
+
+
+class ImportResult(NamedTuple):
+    rows_committed: int
+    inserted: int
+    updated: int
+    skipped: int
+    batches: int
+    resumed_from: int
+
+
+class ImportProgress:
+    """Contadores y velocidad de una importación en curso"""
+
+    def __init__(self, total_rows: int, processed: int, inserted: int, updated: int, skipped: int):
+        self.total_rows = total_rows
+        self.processed = processed
+        self.inserted = inserted
+        self.updated = updated
+        self.skipped = skipped
+        self._started_at = time.monotonic()
+        self._start_processed = processed
+
+    def add(self, inserted: int, updated: int, skipped: int):
+        self.inserted += inserted
+        self.updated += updated
+        self.skipped += skipped
+        self.processed += inserted + updated + skipped
+
+    def snapshot(self) -> Dict:
+        elapsed = time.monotonic() - self._started_at
+        done_now = self.processed - self._start_processed
+        rows_per_second = done_now / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.total_rows - self.processed)
+        return {
+            "total_rows": self.total_rows,
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "progress": round(self.processed * 100 / self.total_rows, 2) if self.total_rows else 0,
+            "rows_per_second": round(rows_per_second, 1),
+            "eta_seconds": round(remaining / rows_per_second, 1) if rows_per_second else None,
+            "elapsed_seconds": round(elapsed, 1),
+        }
+
+
+def _upsert_statement(dialect_name: str, rows: List[Dict]):
+    """
+    INSERT multi-fila que actualiza las columnas del padrón si la
+    identificación ya existe (ON DUPLICATE KEY UPDATE / ON CONFLICT).
+    """
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql.insert(Persons).values(rows)
+        return stmt.on_duplicate_key_update(
+            **{column: stmt.inserted[column] for column in PADRON_UPDATABLE + PERSON_SEARCH_COLUMNS},
+            updated_at=func.now(),
+        )
+
+    if dialect_name in ("postgresql", "sqlite"):
+        dialect_module = postgresql if dialect_name == "postgresql" else sqlite
+        stmt = dialect_module.insert(Persons).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[Persons.identification],
+            set_={
+                **{column: stmt.excluded[column] for column in PADRON_UPDATABLE + PERSON_SEARCH_COLUMNS},
+                "updated_at": func.now(),
+            },
+        )
+
+    return insert(Persons).values(rows)
+
+
+class PadronImporter:
+    """
+    Importador del padrón en streaming, con semántica de upsert.
+
+    Lee el CSV por bloques de `batch_size` filas (memoria acotada) y sincroniza
+    cada bloque contra `persons` por número de identificación: las personas
+    nuevas se insertan, las existentes con datos distintos se actualizan y las
+    que no cambiaron (o no tienen identificación) se saltean sin escribir. Así
+    un padrón nuevo se puede re-sincronizar sobre una tabla ya poblada.
+
+    Cada lote se confirma junto con `import_checkpoints`, así una importación
+    interrumpida se reanuda desde la última fila confirmada. Si el archivo
+    cambia (tamaño o fecha de modificación) la importación empieza de cero.
+    """
+
+    def __init__(
+        self,
+        csv_path: str = padron_csv_path,
+        batch_size: int = padron_import_batch_size,
+        session_factory=SessionLocal,
+    ):
+        self.csv_path = csv_path
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+
+    def _file_signature(self) -> str:
+        stat = os.stat(self.csv_path)
+        return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+    def _count_rows(self) -> int:
+        """Cuenta las filas de datos (líneas menos la cabecera) para estimar el ETA"""
+        lines = 0
+        last = b"\n"
+        with open(self.csv_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                lines += block.count(b"\n")
+                last = block[-1:]
+        if last != b"\n":
+            lines += 1
+        return max(0, lines - 1)
+
+    def _open_reader(self, skip_rows: int):
+        return pandas.read_csv(
+            self.csv_path,
+            encoding="latin-1",
+            usecols=PADRON_COLUMNS,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=self.batch_size,
+            skiprows=range(1, skip_rows + 1) if skip_rows else None,
+        )
+
+    async def _load_checkpoint(self, signature: str) -> ImportCheckpoints:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(ImportCheckpoints).filter(ImportCheckpoints.source == self.csv_path)
+            )
+            checkpoint = result.scalars().first()
+            if checkpoint is None:
+                checkpoint = ImportCheckpoints(
+                    source=self.csv_path,
+                    file_signature=signature,
+                    rows_committed=0,
+                    rows_inserted=0,
+                    rows_updated=0,
+                    rows_skipped=0,
+                )
+                db.add(checkpoint)
+            elif checkpoint.file_signature != signature:
+                logger.info("Padrón modificado: la importación empieza de cero")
+                checkpoint.file_signature = signature
+                checkpoint.rows_committed = 0
+                checkpoint.rows_inserted = 0
+                checkpoint.rows_updated = 0
+                checkpoint.rows_skipped = 0
+                checkpoint.completed = False
+            await db.commit()
+            return checkpoint
+
+    @staticmethod
+    def _to_rows(chunk: pandas.DataFrame) -> Tuple[Dict[str, Dict], int]:
+        """
+        Normaliza el bloque y lo indexa por identificación.
+
+        Returns:
+            Tuple[Dict[str, Dict], int]: (filas por identificación, filas descartadas)
+        """
+        rows = {}
+        discarded = 0
+        for identification, names, lastnames, address, province in chunk[
+            PADRON_COLUMNS
+        ].itertuples(index=False, name=None):
+            identification = identification.strip()
+            if not identification or identification in rows:
+                discarded += 1
+                continue
+            rows[identification] = {
+                "identification": identification,
+                "names": names,
+                "lastnames": lastnames,
+                "address": address,
+                "province": province,
+            }
+        return rows, discarded
+
+    async def _sync_batch(
+        self, db, rows: Dict[str, Dict], created_by: uuid.UUID
+    ) -> Tuple[int, int, int]:
+        """
+        Escribe solo lo que cambió y retorna (insertadas, actualizadas, sin cambios).
+        """
+        if not rows:
+            return 0, 0, 0
+
+        result = await db.execute(
+            select(
+                Persons.identification,
+                Persons.country,
+                *[getattr(Persons, column) for column in PADRON_UPDATABLE],
+            ).where(Persons.identification.in_(list(rows)))
+        )
+        existing = {row[0]: (row[1], tuple(row[2:])) for row in result.all()}
+
+        to_write = []
+        inserted = updated = unchanged = 0
+        for identification, row in rows.items():
+            country = "ARGENTINA"
+            if identification not in existing:
+                inserted += 1
+            else:
+                # El upsert no toca `country`: las columnas de búsqueda se
+                # calculan con el país guardado
+                country, current = existing[identification]
+                if current == tuple(row[column] for column in PADRON_UPDATABLE):
+                    unchanged += 1
+                    continue
+                updated += 1
+            # En las filas que ya existen el upsert ignora person_id/created_by,
+            # pero el INSERT necesita todas las columnas obligatorias
+            to_write.append(
+                {
+                    **row,
+                    "person_id": uuid.uuid4(),
+                    "identification_type": "DNI",
+                    "country": country,
+                    "created_by": created_by,
+                    **person_search_columns(
+                        identification, row["names"], row["lastnames"], row["address"], country
+                    ),
+                }
+            )
+
+        if to_write:
+            await db.execute(_upsert_statement(db.bind.dialect.name, to_write))
+        return inserted, updated, unchanged
+
+    async def _commit_batch(
+        self, rows: Dict[str, Dict], discarded: int, created_by: uuid.UUID, progress: ImportProgress
+    ):
+        async with self.session_factory() as db:
+            inserted, updated, unchanged = await self._sync_batch(db, rows, created_by)
+            skipped = unchanged + discarded
+            await db.execute(
+                update(ImportCheckpoints)
+                .where(ImportCheckpoints.source == self.csv_path)
+                .values(
+                    rows_committed=progress.processed + inserted + updated + skipped,
+                    rows_inserted=progress.inserted + inserted,
+                    rows_updated=progress.updated + updated,
+                    rows_skipped=progress.skipped + skipped,
+                )
+            )
+            await db.commit()
+        progress.add(inserted, updated, skipped)
+
+    async def _mark_completed(self):
+        async with self.session_factory() as db:
+            await db.execute(
+                update(ImportCheckpoints)
+                .where(ImportCheckpoints.source == self.csv_path)
+                .values(completed=True)
+            )
+            await db.commit()
+
+    async def run(
+        self,
+        user_id: str,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+    ) -> ImportResult:
+        """
+        Ejecuta (o reanuda) la importación.
+
+        Args:
+            user_id: Usuario que figura como creador de las personas nuevas
+            on_progress: Callback opcional con ImportProgress.snapshot() tras cada lote
+
+        Returns:
+            ImportResult: Totales de la importación, lotes de esta ejecución y offset inicial
+        """
+        if not os.path.exists(self.csv_path):
+            raise FileNotFoundError(f"No se encontró el padrón: {self.csv_path}")
+
+        checkpoint = await self._load_checkpoint(self._file_signature())
+        progress = ImportProgress(
+            total_rows=await io_executor.run(self._count_rows),
+            processed=checkpoint.rows_committed,
+            inserted=checkpoint.rows_inserted or 0,
+            updated=checkpoint.rows_updated or 0,
+            skipped=checkpoint.rows_skipped or 0,
+        )
+        resumed_from = checkpoint.rows_committed
+        if checkpoint.completed:
+            return ImportResult(
+                resumed_from, progress.inserted, progress.updated, progress.skipped, 0, resumed_from
+            )
+
+        if resumed_from:
+            logger.info(f"Reanudando importación del padrón desde la fila {resumed_from}")
+        if on_progress is not None:
+            on_progress(progress.snapshot())
+
+        created_by = uuid.UUID(user_id)
+        batches = 0
+        reader = await io_executor.run(self._open_reader, resumed_from)
+        try:
+            while True:
+                # pandas parsea el bloque fuera del event loop
+                chunk = await io_executor.run(next, reader, None)
+                if chunk is None:
+                    break
+                if chunk.empty:
+                    continue
+
+                rows, discarded = self._to_rows(chunk)
+                await self._commit_batch(rows, discarded, created_by, progress)
+                batches += 1
+                if on_progress is not None:
+                    on_progress(progress.snapshot())
+        finally:
+            reader.close()
+
+        await self._mark_completed()
+        return ImportResult(
+            progress.processed,
+            progress.inserted,
+            progress.updated,
+            progress.skipped,
+            batches,
+            resumed_from,
+        )
@@ -0,0 +1,464 @@
+from sqlalchemy import select, union_all, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.Persons import Persons
+from models.Connection_Type import ConnectionType
+from database.db import SessionLocal
+from utils.executors import io_executor
+from config.config import connection_index_refresh_seconds
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Límites del grafo de vínculos (GET /persons/{id}/graph, /nearby y /path)
+GRAPH_MAX_DEPTH = 5
+GRAPH_MAX_NODES = 1000
+PATH_MAX_HOPS = 10
+
+
+class PersonGraphService:
+    """
+    Grafo de vínculos entre personas (`connection_type`) a varios saltos.
+
+    Recorrido en anchura desde la base: una consulta por salto con la
+    frontera en un IN (...), en dos ramas sobre columnas indexadas (vínculos
+    salientes por `person_id`, entrantes por `connection`). Cada persona se
+    expande una sola vez y el recorrido se corta apenas se juntan
+    `max_nodes` personas, así que el trabajo queda acotado por `max_nodes`
+    aunque la componente sea densa o tenga ciclos.
+    """
+
+    # Tamaño máximo de cada IN (...) de la frontera
+    FRONTIER_BATCH_SIZE = 500
+
+    async def _neighbors(self, db: AsyncSession, frontier: List[uuid.UUID]) -> Set[uuid.UUID]:
+        """Personas del otro extremo de los vínculos de `frontier`, en ambas direcciones"""
+        neighbors: Set[uuid.UUID] = set()
+        for start in range(0, len(frontier), self.FRONTIER_BATCH_SIZE):
+            batch = frontier[start : start + self.FRONTIER_BATCH_SIZE]
+            stmt = union_all(
+                select(ConnectionType.connection.label("person_id")).where(
+                    ConnectionType.person_id.in_(batch),
+                    ConnectionType.connection.is_not(None),
+                ),
+                select(ConnectionType.person_id.label("person_id")).where(
+                    ConnectionType.connection.in_(batch),
+                    ConnectionType.person_id.is_not(None),
+                ),
+            )
+            neighbors.update((await db.execute(stmt)).scalars().all())
+        return neighbors
+
+    async def _nearest(
+        self, db: AsyncSession, person_id: uuid.UUID, depth: int, max_nodes: int
+    ) -> Tuple[Dict[uuid.UUID, int], bool]:
+        """
+        Distancia de las `max_nodes` personas más cercanas (a igual distancia,
+        por ID) y si quedaron personas alcanzables afuera.
+        """
+        depths = {person_id: 0}
+        frontier = [person_id]
+        for level in range(1, depth + 1):
+            found = sorted((await self._neighbors(db, frontier)).difference(depths))
+            if not found:
+                return depths, False
+
+            room = max_nodes - len(depths)
+            for person in found[:room]:
+                depths[person] = level
+            if len(found) > room:
+                return depths, True
+
+            frontier = found
+            if len(depths) >= max_nodes:
+                # Lleno justo: hay más si el próximo salto suma alguien nuevo
+                more = level < depth and bool(
+                    (await self._neighbors(db, frontier)).difference(depths)
+                )
+                return depths, more
+        return depths, False
+
+    async def get_graph(
+        self,
+        db: AsyncSession,
+        person_id: uuid.UUID,
+        depth: int = 2,
+        max_nodes: int = 200,
+    ) -> Optional[Dict]:
+        """
+        Personas a `depth` saltos o menos y los vínculos entre ellas.
+
+        Se conservan las `max_nodes` personas más cercanas (la raíz incluida);
+        si hay más, `truncated` es True. Formato compacto:
+
+            {"root", "depth", "truncated",
+             "nodes": [{"id", "identification", "names", "lastnames", "depth"}],
+             "edges": [{"id", "source", "target", "type"}]}
+
+        Returns:
+            None si la persona no existe
+        """
+        if person_id not in await self._describe(db, [person_id]):
+            return None
+
+        depths, truncated = await self._nearest(db, person_id, depth, max_nodes)
+        persons = await self._describe(db, list(depths))
+        node_ids = sorted(persons, key=lambda person: (depths[person], person))
+
+        result = await db.execute(
+            select(
+                ConnectionType.connection_id,
+                ConnectionType.person_id,
+                ConnectionType.connection,
+                ConnectionType.connection_type,
+            )
+            .where(
+                and_(
+                    ConnectionType.person_id.in_(node_ids),
+                    ConnectionType.connection.in_(node_ids),
+                )
+            )
+            .order_by(ConnectionType.connection_id)
+        )
+        edges: List[Dict] = [
+            {
+                "id": str(row.connection_id),
+                "source": str(row.person_id),
+                "target": str(row.connection),
+                "type": row.connection_type,
+            }
+            for row in result.all()
+        ]
+
+        return {
+            "root": str(person_id),
+            "depth": depth,
+            "truncated": truncated,
+            "nodes": [{**persons[person], "depth": depths[person]} for person in node_ids],
+            "edges": edges,
+        }
+
+    @staticmethod
+    async def _describe(db: AsyncSession, person_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Dict]:
+        result = await db.execute(
+            select(
+                Persons.person_id,
+                Persons.identification,
+                Persons.names,
+                Persons.lastnames,
+            ).where(Persons.person_id.in_(person_ids))
+        )
+        return {
+            row.person_id: {
+                "id": str(row.person_id),
+                "identification": row.identification,
+                "names": row.names,
+                "lastnames": row.lastnames,
+            }
+            for row in result.all()
+        }
+
+    async def get_nearby(
+        self, db: AsyncSession, person_id: uuid.UUID, hops: int = 3, max_nodes: int = 200
+    ) -> Optional[Dict]:
+        """
+        Personas a `hops` saltos o menos según el índice en memoria, con su
+        distancia (las `max_nodes` más cercanas).
+
+        Returns:
+            None si la persona no existe
+        """
+        distances = connection_index.within_hops(person_id, hops, limit=max_nodes + 1)
+        ordered = sorted(distances.items(), key=lambda item: item[1])
+        truncated = len(ordered) > max_nodes
+        ordered = ordered[:max_nodes]
+
+        persons = await self._describe(db, [person for person, _ in ordered])
+        if person_id not in persons:
+            return None
+        return {
+            "root": str(person_id),
+            "hops": hops,
+            "truncated": truncated,
+            "nodes": [
+                {**persons[person], "depth": depth}
+                for person, depth in ordered
+                if person in persons
+            ],
+        }
+
+    async def get_path(
+        self, db: AsyncSession, source: uuid.UUID, target: uuid.UUID, max_hops: int = 6
+    ) -> Optional[Dict]:
+        """
+        Camino mínimo de vínculos entre dos personas según el índice en memoria
+        (`path` vacío si no hay uno de `max_hops` saltos o menos).
+
+        Returns:
+            None si alguna de las dos personas no existe
+        """
+        path = connection_index.shortest_path(source, target, max_hops)
+        persons = await self._describe(db, path or [source, target])
+        if source not in persons or target not in persons:
+            return None
+        return {
+            "source": str(source),
+            "target": str(target),
+            "hops": len(path) - 1 if path else None,
+            "path": [persons[person] for person in path if person in persons] if path else [],
+        }
+
+
+class ConnectionIndex:
+    """
+    Índice en memoria de los vínculos entre personas, para caminos mínimos y
+    vecindarios a k saltos sin consultar `connection_type`.
+
+    Cada persona con vínculos recibe un entero; los vecinos (en ambas
+    direcciones) se guardan en formato CSR: `targets[offsets[i]:offsets[i + 1]]`
+    son los vecinos de la persona i, en dos `array("i")` contiguos.
+
+    El CSR se arma al arrancar y se recarga desde la base cada
+    `refresh_interval` segundos. Entre recargas, los vínculos que se crean o
+    borran en este worker se anotan en `_added` / `_removed` y se aplican al
+    recorrer; lo que cambian otros workers se ve en la próxima recarga.
+    """
+
+    def __init__(self, session_factory=SessionLocal, refresh_interval: float = 300):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._ids: Dict[uuid.UUID, int] = {}
+        self._uuids: List[uuid.UUID] = []
+        self._offsets = array("i", [0])
+        self._targets = array("i")
+        self._added: Dict[int, Set[int]] = {}
+        self._removed: Dict[int, Set[int]] = {}
+        # Cambios durante una recarga, para reaplicarlos sobre el CSR nuevo
+        self._journal: Optional[List[Tuple[str, uuid.UUID, uuid.UUID]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    @property
+    def size(self) -> Dict[str, int]:
+        return {"persons": len(self._uuids), "links": len(self._targets) // 2}
+
+    async def start(self):
+        """Carga el índice y arranca la recarga periódica (lifespan de la app)"""
+        try:
+            await self.load()
+        except Exception as e:
+            logger.error(f"No se pudo cargar el índice de vínculos: {e}")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"No se pudo recargar el índice de vínculos: {e}")
+
+    async def load(self):
+        """Arma el CSR desde `connection_type` (una consulta) y lo reemplaza"""
+        self._journal = []
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(ConnectionType.person_id, ConnectionType.connection).where(
+                        ConnectionType.person_id.is_not(None),
+                        ConnectionType.connection.is_not(None),
+                    )
+                )
+                pairs = result.all()
+            ids, uuids, offsets, targets = await io_executor.run(self._build, pairs)
+
+            journal, self._journal = self._journal, None
+            self._ids, self._uuids = ids, uuids
+            self._offsets, self._targets = offsets, targets
+            self._added, self._removed = {}, {}
+            self.loaded_at = time.time()
+            for operation, person_a, person_b in journal:
+                getattr(self, operation)(person_a, person_b)
+        finally:
+            self._journal = None
+
+    @staticmethod
+    def _build(pairs: Iterable[Tuple[uuid.UUID, uuid.UUID]]):
+        ids: Dict[uuid.UUID, int] = {}
+        uuids: List[uuid.UUID] = []
+        edges = array("i")
+        for person_a, person_b in pairs:
+            for person in (person_a, person_b):
+                if person not in ids:
+                    ids[person] = len(uuids)
+                    uuids.append(person)
+            if person_a != person_b:
+                edges.append(ids[person_a])
+                edges.append(ids[person_b])
+
+        degree = [0] * (len(uuids) + 1)
+        for node in edges:
+            degree[node + 1] += 1
+        offsets = array("i", degree)
+        for i in range(1, len(offsets)):
+            offsets[i] += offsets[i - 1]
+
+        targets = array("i", bytes(4 * len(edges)))
+        position = offsets[:-1]
+        for i in range(0, len(edges), 2):
+            a, b = edges[i], edges[i + 1]
+            targets[position[a]] = b
+            position[a] += 1
+            targets[position[b]] = a
+            position[b] += 1
+        return ids, uuids, offsets, targets
+
+    def _stored(self, node: int):
+        if node + 1 >= len(self._offsets):
+            return ()
+        return self._targets[self._offsets[node] : self._offsets[node + 1]]
+
+    def _neighbors(self, node: int) -> Iterable[int]:
+        stored = self._stored(node)
+        removed = self._removed.get(node)
+        added = self._added.get(node)
+        if not removed and not added:
+            return stored
+        neighbors = [n for n in stored if not removed or n not in removed]
+        if added:
+            neighbors.extend(added)
+        return neighbors
+
+    def _intern(self, person: uuid.UUID) -> int:
+        node = self._ids.get(person)
+        if node is None:
+            node = self._ids[person] = len(self._uuids)
+            self._uuids.append(person)
+        return node
+
+    def add_link(self, person_a: uuid.UUID, person_b: uuid.UUID):
+        """Registra un vínculo creado (después del commit)"""
+        if self._journal is not None:
+            self._journal.append(("add_link", person_a, person_b))
+        if person_a == person_b:
+            return
+        a, b = self._intern(person_a), self._intern(person_b)
+        for x, y in ((a, b), (b, a)):
+            self._removed.get(x, set()).discard(y)
+            if y not in self._stored(x):
+                self._added.setdefault(x, set()).add(y)
+
+    def remove_link(self, person_a: uuid.UUID, person_b: uuid.UUID):
+        """Registra que se borraron los vínculos entre dos personas"""
+        if self._journal is not None:
+            self._journal.append(("remove_link", person_a, person_b))
+        a, b = self._ids.get(person_a), self._ids.get(person_b)
+        if a is None or b is None:
+            return
+        for x, y in ((a, b), (b, a)):
+            self._added.get(x, set()).discard(y)
+            if y in self._stored(x):
+                self._removed.setdefault(x, set()).add(y)
+
+    def remove_person(self, person: uuid.UUID):
+        """Registra que se borró una persona (sus vínculos quedan sin extremo)"""
+        node = self._ids.get(person)
+        if node is None:
+            return
+        for neighbor in list(self._neighbors(node)):
+            self.remove_link(person, self._uuids[neighbor])
+
+    def within_hops(
+        self, person: uuid.UUID, hops: int, limit: Optional[int] = None
+    ) -> Dict[uuid.UUID, int]:
+        """
+        Personas a `hops` saltos o menos (BFS), con su distancia; la persona
+        misma con distancia 0. Se corta al llegar a `limit` personas.
+        """
+        start = self._ids.get(person)
+        if start is None:
+            return {person: 0}
+        distance = {start: 0}
+        frontier = [start]
+        for depth in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self._neighbors(node):
+                    if neighbor not in distance:
+                        distance[neighbor] = depth
+                        next_frontier.append(neighbor)
+                        if limit is not None and len(distance) >= limit:
+                            return {self._uuids[n]: d for n, d in distance.items()}
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return {self._uuids[n]: d for n, d in distance.items()}
+
+    def shortest_path(
+        self, source: uuid.UUID, target: uuid.UUID, max_hops: int = 6
+    ) -> Optional[List[uuid.UUID]]:
+        """
+        Camino mínimo entre dos personas (BFS bidireccional: siempre se
+        expande el lado con la frontera más chica), o None si no hay uno de
+        `max_hops` saltos o menos.
+        """
+        if source == target:
+            return [source]
+        a, b = self._ids.get(source), self._ids.get(target)
+        if a is None or b is None:
+            return None
+
+        parents = ({a: None}, {b: None})
+        frontiers = ([a], [b])
+        for _ in range(max_hops):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            own, other = parents[side], parents[1 - side]
+            next_frontier = []
+            for node in frontiers[side]:
+                for neighbor in self._neighbors(node):
+                    if neighbor in own:
+                        continue
+                    own[neighbor] = node
+                    if neighbor in other:
+                        return self._join_path(parents, neighbor)
+                    next_frontier.append(neighbor)
+            if not next_frontier:
+                return None
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+        return None
+
+    def _join_path(self, parents, meeting: int) -> List[uuid.UUID]:
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = parents[0][node]
+        path.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            path.append(node)
+            node = parents[1][node]
+        return [self._uuids[n] for n in path]
+
+
+person_graph = PersonGraphService()
+connection_index = ConnectionIndex(refresh_interval=connection_index_refresh_seconds)
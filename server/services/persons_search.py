@@ -0,0 +1,334 @@
+from sqlalchemy import select, update, func, bindparam, or_
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.Persons import Persons
+from database.db import SessionLocal
+from services.jobs_services import jobs_service, JobContext, JobConflictError
+from utils.text_search import (
+    PERSON_SEARCH_COLUMNS,
+    fulltext_words,
+    infix_trigram_tokens,
+    normalize_text,
+    person_search_columns,
+    search_words,
+    trigram_tokens,
+    word_similarity,
+)
+from typing import Dict, List, Optional, Tuple
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SEARCH_BACKFILL_JOB_TYPE = "persons_search_backfill"
+
+# Cómo se comparan los filtros de nombres y apellidos
+NAME_MATCH_EXACT = "exact"  # Igual a la columna normalizada (índice B-tree)
+NAME_MATCH_PREFIX = "prefix"  # Comienzo de la columna normalizada (índice B-tree)
+NAME_MATCH_CONTAINS = "contains"  # Primero por prefijo, luego en cualquier posición
+NAME_MATCH_MODES = (NAME_MATCH_EXACT, NAME_MATCH_PREFIX, NAME_MATCH_CONTAINS)
+
+
+class PersonSearchEngine:
+    """
+    Buscador de personas.
+
+    En MariaDB/MySQL usa dos índices FULLTEXT sobre columnas derivadas que se
+    mantienen en cada escritura (ver utils/text_search.person_search_columns):
+
+    - Prefijo: `search_text` en modo booleano (`+JUAN* +PER*`), ordenado por
+      relevancia. Los filtros de dirección y país también se acotan con este
+      índice.
+    - Difusa: `search_trigrams` en lenguaje natural con los trigramas de la
+      búsqueda; los candidatos se reordenan por similitud de trigramas y se
+      descartan los que no llegan a `fuzzy_threshold`.
+
+    Los filtros de nombres y apellidos se comparan con las columnas
+    normalizadas según `name_match`: `exact` y `prefix` son búsquedas sobre
+    sus índices B-tree. `contains` (por defecto) hace primero la búsqueda por
+    prefijo y, si no alcanza `limit`, completa con las personas que tienen el
+    texto en otra posición ("maría" encuentra "Ana María"). Esa segunda etapa
+    se acota en MariaDB/MySQL con `search_trigrams` en modo booleano,
+    exigiendo los trigramas interiores del texto; los textos sin trigramas
+    (palabras de menos de 3 letras) se quedan solo con el prefijo.
+
+    En otros motores (SQLite en desarrollo) se usa LIKE sobre `search_text`,
+    sin la etapa difusa.
+    """
+
+    def __init__(self, candidate_factor: int = 5, fuzzy_threshold: float = 0.4):
+        self.candidate_factor = candidate_factor
+        self.fuzzy_threshold = fuzzy_threshold
+
+    @staticmethod
+    def _supports_fulltext(db: AsyncSession) -> bool:
+        return db.bind.dialect.name in ("mysql", "mariadb")
+
+    @staticmethod
+    def _field_filters(
+        names: Optional[str],
+        lastname: Optional[str],
+        identification: Optional[str],
+        address: Optional[str],
+        country: Optional[str],
+        name_match: str = NAME_MATCH_PREFIX,
+    ) -> Tuple[list, List[str], List[str]]:
+        """
+        Filtros por campo, las palabras normalizadas a acotar con FULLTEXT y
+        los tokens de trigramas a exigir en `search_trigrams` (solo con
+        `name_match` contains)
+        """
+        filters = []
+        words = []
+        trigrams = []
+        if identification and identification.strip():
+            filters.append(
+                Persons.identification.startswith(identification.strip(), autoescape=True)
+            )
+
+        # Sobre la columna normalizada: "per" y "PÉR" encuentran "Pérez"
+        for value, column in (
+            (names, Persons.names_normalized),
+            (lastname, Persons.lastnames_normalized),
+        ):
+            normalized = normalize_text(value)
+            if not normalized:
+                continue
+            if name_match == NAME_MATCH_EXACT:
+                filters.append(column == normalized)
+            elif name_match == NAME_MATCH_PREFIX:
+                filters.append(column.startswith(normalized, autoescape=True))
+            else:
+                filters.append(column.contains(normalized, autoescape=True))
+                trigrams += infix_trigram_tokens(search_words(normalized))
+
+        for value, column in (
+            (address, Persons.address),
+            (country, Persons.country),
+        ):
+            if value and value.strip():
+                filters.append(column.ilike(f"%{value.strip()}%"))
+                words += search_words(value)
+        return filters, words, trigrams
+
+    async def search_ids(
+        self,
+        db: AsyncSession,
+        q: Optional[str] = None,
+        names: Optional[str] = None,
+        lastname: Optional[str] = None,
+        identification: Optional[str] = None,
+        address: Optional[str] = None,
+        country: Optional[str] = None,
+        limit: int = 100,
+        name_match: str = NAME_MATCH_CONTAINS,
+    ) -> List[uuid.UUID]:
+        """
+        Retorna los IDs de las personas encontradas, ordenados por relevancia
+        (con `name_match` contains, primero las que coinciden por prefijo).
+        """
+        stages = [name_match]
+        if name_match == NAME_MATCH_CONTAINS and (
+            normalize_text(names) or normalize_text(lastname)
+        ):
+            stages = [NAME_MATCH_PREFIX, NAME_MATCH_CONTAINS]
+
+        person_ids: List[uuid.UUID] = []
+        for index, stage in enumerate(stages):
+            filters, field_words, field_trigrams = self._field_filters(
+                names, lastname, identification, address, country, stage
+            )
+            if index > 0:
+                if not field_trigrams:
+                    # Sin trigramas que la acoten, la etapa sería un recorrido completo
+                    break
+                if person_ids:
+                    filters.append(Persons.person_id.not_in(person_ids))
+            person_ids += await self._search_ids(
+                db, q, filters, field_words, field_trigrams, limit - len(person_ids)
+            )
+            if len(person_ids) >= limit:
+                break
+        return person_ids
+
+    async def _search_ids(
+        self,
+        db: AsyncSession,
+        q: Optional[str],
+        filters: list,
+        field_words: List[str],
+        field_trigrams: List[str],
+        limit: int,
+    ) -> List[uuid.UUID]:
+        query_words = search_words(q)
+        if not query_words and not filters:
+            return []
+
+        fulltext = self._supports_fulltext(db)
+        if fulltext:
+            narrowing = fulltext_words(field_words)
+            if narrowing:
+                filters.append(
+                    Persons.search_text.match(" ".join(f"+{w}*" for w in narrowing))
+                )
+            if field_trigrams:
+                filters.append(
+                    Persons.search_trigrams.match(" ".join(f"+{t}" for t in field_trigrams))
+                )
+
+        if not query_words:
+            stmt = select(Persons.person_id).where(*filters).limit(limit)
+            if fulltext and field_words:
+                stmt = stmt.order_by(Persons.search_text.match(" ".join(field_words)).desc())
+            result = await db.execute(stmt)
+            return list(result.scalars().all())
+
+        candidates = limit * self.candidate_factor
+        prefix_ids, rows = await self._prefix_candidates(
+            db, query_words, filters, candidates, fulltext
+        )
+        if fulltext and len(prefix_ids) < limit:
+            rows.update(await self._fuzzy_candidates(db, query_words, filters, candidates))
+
+        ranked = []
+        for person_id, (search_text, score) in rows.items():
+            similarity = word_similarity(query_words, (search_text or "").split())
+            is_prefix = person_id in prefix_ids
+            if is_prefix or similarity >= self.fuzzy_threshold:
+                ranked.append((is_prefix, similarity, score, person_id))
+        ranked.sort(key=lambda item: (item[0], item[1], item[2]), reverse=True)
+        return [person_id for _, _, _, person_id in ranked[:limit]]
+
+    async def _prefix_candidates(
+        self, db: AsyncSession, words: List[str], filters: list, candidates: int, fulltext: bool
+    ) -> Tuple[set, Dict[uuid.UUID, Tuple[str, float]]]:
+        prefix_words = fulltext_words(words) if fulltext else []
+        if prefix_words:
+            score = Persons.search_text.match(" ".join(f"+{w}*" for w in prefix_words))
+            stmt = (
+                select(Persons.person_id, Persons.search_text, score)
+                .where(score > 0, *filters)
+                .order_by(score.desc())
+                .limit(candidates)
+            )
+        else:
+            stmt = (
+                select(Persons.person_id, Persons.search_text)
+                .where(*[Persons.search_text.like(f"%{w}%") for w in words], *filters)
+                .limit(candidates)
+            )
+
+        result = await db.execute(stmt)
+        rows = {}
+        for row in result.all():
+            rows[row[0]] = (row[1], float(row[2]) if len(row) > 2 else 0.0)
+        return set(rows), rows
+
+    async def _fuzzy_candidates(
+        self, db: AsyncSession, words: List[str], filters: list, candidates: int
+    ) -> Dict[uuid.UUID, Tuple[str, float]]:
+        score = mysql_match(
+            Persons.search_trigrams, against=" ".join(trigram_tokens(words))
+        ).in_natural_language_mode()
+        result = await db.execute(
+            select(Persons.person_id, Persons.search_text, score)
+            .where(score > 0, *filters)
+            .order_by(score.desc())
+            .limit(candidates)
+        )
+        return {row[0]: (row[1], float(row[2])) for row in result.all()}
+
+
+def _missing_search_columns():
+    """Personas cargadas antes de alguna de las columnas derivadas"""
+    table = Persons.__table__
+    return or_(table.c.search_text.is_(None), table.c.names_normalized.is_(None))
+
+
+async def backfill_search_columns(context: JobContext, batch_size: int = 2000):
+    """
+    Calcula las columnas de búsqueda de las personas que aún no las tienen
+    (filas anteriores al buscador). Corre como tarea en segundo plano.
+    """
+    table = Persons.__table__
+    stmt_update = (
+        update(table)
+        .where(table.c.person_id == bindparam("b_person_id"))
+        .values(
+            **{column: bindparam(f"b_{column}") for column in PERSON_SEARCH_COLUMNS},
+            # Conservar updated_at: no es una edición de la persona
+            updated_at=table.c.updated_at,
+        )
+    )
+
+    async with SessionLocal() as db:
+        total = (
+            await db.execute(
+                select(func.count()).select_from(table).where(_missing_search_columns())
+            )
+        ).scalar() or 0
+
+    processed = 0
+    while True:
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(
+                    table.c.person_id,
+                    table.c.identification,
+                    table.c.names,
+                    table.c.lastnames,
+                    table.c.address,
+                    table.c.country,
+                )
+                .where(_missing_search_columns())
+                .order_by(table.c.person_id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            params = []
+            for person_id, identification, names, lastnames, address, country in rows:
+                columns = person_search_columns(identification, names, lastnames, address, country)
+                params.append(
+                    {
+                        "b_person_id": person_id,
+                        **{f"b_{column}": columns[column] for column in PERSON_SEARCH_COLUMNS},
+                    }
+                )
+            await db.execute(stmt_update, params)
+            await db.commit()
+
+        processed += len(rows)
+        context.report(
+            {"total_rows": total, "processed": processed},
+            progress=round(processed * 100 / total, 2) if total else 100,
+        )
+
+
+async def ensure_search_backfill() -> Optional[str]:
+    """
+    Lanza la tarea de backfill si hay personas sin columnas de búsqueda
+    (llamar al arrancar, después de las migraciones).
+
+    Returns:
+        Optional[str]: ID de la tarea lanzada, o None si no hacía falta
+    """
+    async with SessionLocal() as db:
+        pending = (
+            await db.execute(
+                select(Persons.person_id).where(_missing_search_columns()).limit(1)
+            )
+        ).first()
+    if pending is None:
+        return None
+
+    try:
+        job = await jobs_service.start_job(SEARCH_BACKFILL_JOB_TYPE, backfill_search_columns)
+    except JobConflictError:
+        return None
+    return str(job.job_id)
+
+
+person_search = PersonSearchEngine()
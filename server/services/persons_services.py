@@ -5,32 +5,26 @@ from models.Users import Users
 from models.Recortds_Persons import RecordsPersons
 from sqlalchemy.orm import joinedload, selectinload, with_loader_criteria
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import or_, and_, select, func, delete
+from sqlalchemy import or_, and_, select, func, delete, literal, union_all
 from typing import Optional
 from models.Connection_Type import ConnectionType
-from database.db import SessionLocal as async_session
-import asyncio
-import json
+from services.padron_import import PadronImporter
+from services.jobs_services import jobs_service, JobContext, JobConflictError
+from services.persons_search import person_search, NAME_MATCH_CONTAINS
+from services.persons_graph import connection_index
+from utils.text_search import person_search_columns
+from models.Jobs import Jobs
+from utils.pagination import Page, paginate
 import uuid
-import pandas
 import logging
-import threading
 from datetime import datetime
 
 # Configurar logging para que sea más visible
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-# Variable global para rastrear el estado de la carga del padrón
-_load_status = {
-    "is_loading": False,
-    "progress": 0,
-    "total": 0,
-    "message": "",
-    "start_time": None,
-    "status": "idle",  # idle, loading, completed, failed
-}
-_load_lock = threading.Lock()
+# Tipo de tarea de la carga del padrón en el registro de tareas (services/jobs_services.py)
+PADRON_JOB_TYPE = "padron_import"
 
 
 class PersonsService:
@@ -41,26 +35,34 @@ class PersonsService:
         self.user_id = None
         self.connectionType = ConnectionType
 
-    async def get_persons(self, db: AsyncSession):
-        smt = (
-            select(self.personModel)
-            .options(
-                selectinload(self.personModel.users),
-                selectinload(self.personModel.record_relationships).joinedload(
-                    RecordsPersons.record
-                ),
-                selectinload(
-                    self.personModel.files
-                ),  # Cargar archivos (puede ser lista vacía)
-            )
-            .order_by(self.personModel.updated_at.desc())
-            .limit(20)
+    async def get_persons(
+        self,
+        db: AsyncSession,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Page:
+        """
+        Lista las personas de la más recientemente modificada a la más antigua,
+        paginada por cursor sobre (updated_at, person_id).
+        """
+        smt = select(self.personModel).options(
+            selectinload(self.personModel.users),
+            selectinload(self.personModel.record_relationships).joinedload(
+                RecordsPersons.record
+            ),
+            selectinload(
+                self.personModel.files
+            ),  # Cargar archivos (puede ser lista vacía)
+        )
+        return await paginate(
+            db,
+            smt,
+            [self.personModel.updated_at, self.personModel.person_id],
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
         )
-        results = await db.execute(smt)
-        persons = results.scalars().unique().all()
-        if not persons:
-            return []
-        return persons
 
     async def get_person(self, person_id: str, db: AsyncSession):
         try:
@@ -132,6 +134,7 @@ class PersonsService:
                 country=country,
                 created_by=user.id,
                 observations=observations,
+                **person_search_columns(identification, names, lastnames, address, country),
             )
 
             db.add(new_person)
@@ -200,45 +203,54 @@ class PersonsService:
         identification: Optional[str] = None,
         address: Optional[str] = None,
         country: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: int = 100,
+        name_match: str = NAME_MATCH_CONTAINS,
     ):
         """
-        Busca personas por campos específicos de forma dinámica.
+        Busca personas por campos específicos y/o por texto libre (`q`).
+        `name_match` elige cómo se comparan nombres y apellidos (exact,
+        prefix o contains).
+
+        La búsqueda libre es por prefijo de palabra, con respaldo difuso para
+        errores de tipeo, y el resultado se ordena por relevancia
+        (ver services/persons_search.py).
         """
         try:
-            query = select(self.personModel).options(
-                selectinload(self.personModel.record_relationships).joinedload(
-                    RecordsPersons.record
-                ),
-                selectinload(self.personModel.files),
-                joinedload(self.personModel.users),
+            person_ids = await person_search.search_ids(
+                db,
+                q=q,
+                names=names,
+                lastname=lastname,
+                identification=identification,
+                address=address,
+                country=country,
+                limit=min(limit, 100),
+                name_match=name_match,
             )
-
-            filters = []
-
-            if identification and identification.strip():
-                filters.append(
-                    self.personModel.identification.like(f"{identification.strip()}%")
-                )
-            text_fields = {
-                names: self.personModel.names,
-                lastname: self.personModel.lastnames,
-                address: self.personModel.address,
-                country: self.personModel.country,
-            }
-
-            for value, column in text_fields.items():
-                if value and value.strip():
-                    filters.append(column.ilike(f"%{value.strip()}%"))
-
-            if not filters:
+            if not person_ids:
                 return []
 
-            stmt = query.filter(and_(*filters)).limit(100)
-            result = await db.execute(stmt)
+            query = (
+                select(self.personModel)
+                .options(
+                    selectinload(self.personModel.record_relationships).joinedload(
+                        RecordsPersons.record
+                    ),
+                    selectinload(self.personModel.files),
+                    joinedload(self.personModel.users),
+                )
+                .filter(self.personModel.person_id.in_(person_ids))
+            )
+            result = await db.execute(query)
 
             # .unique() es importante cuando usas joinedload para evitar duplicados en el resultado ORM
             persons = result.scalars().unique().all()
 
+            # Respetar el orden por relevancia del buscador
+            position = {person_id: index for index, person_id in enumerate(person_ids)}
+            persons = sorted(persons, key=lambda person: position[person.person_id])
+
             if persons:
                 logger.info(f"Búsqueda específica encontró {len(persons)} personas.")
 
@@ -278,6 +290,10 @@ class PersonsService:
             setattr(person, "province", province)
             setattr(person, "country", country)
             setattr(person, "observations", observations)
+            for column, value in person_search_columns(
+                identification, names, lastnames, address, country
+            ).items():
+                setattr(person, column, value)
             setattr(person, "updated_at", datetime.utcnow())
 
             await db.commit()
@@ -441,6 +457,7 @@ class PersonsService:
             db.add(connection)
             db.add(rel)
             await db.commit()
+            connection_index.add_link(person.person_id, connection.person_id)
 
             print("DEBUG: Vínculo creado y guardado exitosamente")
             return True
@@ -487,6 +504,7 @@ class PersonsService:
             for rel in relationships:
                 await db.delete(rel)
             await db.commit()
+            connection_index.remove_link(person_uuid, disconnect_uuid)
             return True
 
         except Exception as e:
@@ -506,6 +524,7 @@ class PersonsService:
                 return "La persona no existe!"
             await db.delete(person_to_delete)
             await db.commit()
+            connection_index.remove_person(person_uuid)
             return True
         except Exception as e:
             logger.error(f"Error al eliminar la persona: {e}", exc_info=True)
@@ -529,64 +548,55 @@ class PersonsService:
             if not person:
                 return "La persona no existe!"
 
-            # Obtener conexiones donde la persona es el origen (person_id)
-            outgoing_connections = select(self.connectionType).filter(
-                self.connectionType.person_id == person_uuid
-            )
+            # Conexiones en ambas direcciones junto con la persona del otro
+            # extremo, en una sola consulta (sin una consulta por conexión)
+            def linked(own_column, other_column, direction: str, order: int):
+                return (
+                    select(
+                        self.connectionType.connection_id,
+                        self.personModel.person_id,
+                        self.personModel.names,
+                        self.personModel.lastnames,
+                        self.personModel.identification,
+                        self.connectionType.connection_type,
+                        literal(direction).label("direction"),
+                        literal(order).label("direction_order"),
+                    )
+                    .join(self.personModel, self.personModel.person_id == other_column)
+                    .where(own_column == person_uuid)
+                )
 
-            # Obtener conexiones donde la persona es el destino (connection)
-            incoming_connections = select(self.connectionType).filter(
-                self.connectionType.connection == person_uuid
+            stmt = union_all(
+                # La persona es el origen
+                linked(
+                    self.connectionType.person_id,
+                    self.connectionType.connection,
+                    "outgoing",
+                    0,
+                ),
+                # La persona es el destino
+                linked(
+                    self.connectionType.connection,
+                    self.connectionType.person_id,
+                    "incoming",
+                    1,
+                ),
             )
-            result_outgoing = await db.execute(outgoing_connections)
-            result_incoming = await db.execute(incoming_connections)
-            outgoing_connections = result_outgoing.scalars().all()
-            incoming_connections = result_incoming.scalars().all()
-
-            # Combinar y formatear las conexiones
-            connections = []
-
-            # Procesar conexiones salientes
-            for conn in outgoing_connections:
-                connected_person = select(self.personModel).filter(
-                    self.personModel.person_id == conn.connection
-                )
-                result = await db.execute(connected_person)
-                connected_person = result.scalars().first()
-
-                if connected_person:
-                    connections.append(
-                        {
-                            "connection_id": str(conn.connection_id),
-                            "person_id": str(connected_person.person_id),
-                            "names": connected_person.names,
-                            "lastnames": connected_person.lastnames,
-                            "identification": connected_person.identification,
-                            "connection_type": conn.connection_type,
-                            "direction": "outgoing",  # La persona es el origen
-                        }
-                    )
+            stmt = stmt.order_by(stmt.selected_columns.direction_order)
+            result = await db.execute(stmt)
 
-            # Procesar conexiones entrantes
-            for conn in incoming_connections:
-                smt = select(self.personModel).filter(
-                    self.personModel.person_id == conn.person_id
-                )
-                result = await db.execute(smt)
-                connected_person = result.scalars().first()
-
-                if connected_person:
-                    connections.append(
-                        {
-                            "connection_id": str(conn.connection_id),
-                            "person_id": str(connected_person.person_id),
-                            "names": connected_person.names,
-                            "lastnames": connected_person.lastnames,
-                            "identification": connected_person.identification,
-                            "connection_type": conn.connection_type,
-                            "direction": "incoming",  # La persona es el destino
-                        }
-                    )
+            connections = [
+                {
+                    "connection_id": str(row.connection_id),
+                    "person_id": str(row.person_id),
+                    "names": row.names,
+                    "lastnames": row.lastnames,
+                    "identification": row.identification,
+                    "connection_type": row.connection_type,
+                    "direction": row.direction,
+                }
+                for row in result.all()
+            ]
 
             return connections
 
@@ -641,114 +651,49 @@ class PersonsService:
             logger.error(f"Error al obtener antecedentes de la persona: {e}")
             raise e
 
-    async def load_persons(self, db: AsyncSession, user_id: str):
-        global _load_status, _load_lock
-        self.user_id = user_id
-
-        try:
-            with _load_lock:
-                if _load_status["is_loading"]:
-                    return {
-                        "status": "loading",
-                        "message": "Ya hay una carga en progreso",
-                        # ...
-                    }
-
-                # CORRECCIÓN PREVIA: Count seguro
-                smt = select(func.count()).select_from(self.personModel)
-                result = await db.execute(smt)
-                count = result.scalar() or 0  # Protegemos contra None
-
-                if count >= 5:
-                    return {
-                        "status": "skipped",
-                        "message": "Ya hay suficientes personas",
-                        "is_loading": False,
-                    }
+    async def get_load_status(self, db: AsyncSession) -> Optional[Jobs]:
+        """Última carga del padrón registrada (de cualquier worker)"""
+        return await jobs_service.get_latest_job(PADRON_JOB_TYPE, db)
 
-                # Configurar estado inicial
-                _load_status["is_loading"] = True
-                _load_status["status"] = "loading"
-                _load_status["progress"] = 0
-                _load_status["start_time"] = datetime.now()
+    async def load_persons(self, db: AsyncSession, user_id: str):
+        """
+        Lanza la carga del padrón como tarea persistente. Si ya hay una en
+        curso (en este u otro worker) retorna esa en lugar de lanzar otra.
+        """
 
-            # CORRECCIÓN CRÍTICA:
-            # 1. No usamos threading.Thread
-            # 2. Usamos asyncio.create_task para que corra en el loop asíncrono
-            # 3. NO pasamos 'db', la tarea creará su propia sesión
-            asyncio.create_task(self._load_persons_background())
+        async def run_import(context: JobContext):
+            result = await PadronImporter().run(user_id, on_progress=context.report)
+            context.message = (
+                f"{result.inserted} insertadas, {result.updated} actualizadas, "
+                f"{result.skipped} sin cambios o descartadas"
+            )
+            logger.info(
+                f"Carga background finalizada exitosamente: {result.rows_committed} filas "
+                f"en {result.batches} lotes (reanudada desde la fila {result.resumed_from}), "
+                f"{result.inserted} insertadas, {result.updated} actualizadas, "
+                f"{result.skipped} salteadas"
+            )
 
+        try:
+            job = await jobs_service.start_job(
+                PADRON_JOB_TYPE, run_import, user_id=user_id
+            )
             return {
                 "status": "started",
                 "message": "Carga iniciada en segundo plano.",
                 "is_loading": True,
+                "job_id": str(job.job_id),
             }
 
+        except JobConflictError as e:
+            active = e.active_job
+            return {
+                "status": "loading",
+                "message": "Ya hay una carga en progreso",
+                "is_loading": True,
+                "job_id": str(active.job_id) if active else None,
+                "progress": active.progress if active else 0,
+            }
         except Exception as e:
-            # ... manejo de error ...
+            logger.error(f"Error al iniciar la carga del padrón: {e}")
             return {"status": "error", "message": str(e)}
-
-    async def _load_persons_background(self):
-        """
-        Esta función corre en background. Debe gestionar SU PROPIA sesión.
-        """
-        global _load_status, _load_lock
-
-        # IMPORTANTE: Creamos un nuevo scope de base de datos
-        # porque la sesión del request original ya murió.
-        async with async_session() as db:
-            try:
-                # OPTIMIZACIÓN: Pandas es bloqueante (síncrono).
-                # Leer un CSV grande bloqueará todo tu servidor FastAPI.
-                # Lo ejecutamos en un thread pool para no congelar la API.
-                loop = asyncio.get_running_loop()
-                # Ejecutamos la lectura del CSV en un hilo aparte
-                data_to_json = await loop.run_in_executor(None, self._read_csv_sync)
-
-                if not data_to_json:
-                    raise Exception("El CSV está vacío o no se pudo leer")
-
-                # Insertar en la BD (esto sí es async y rápido)
-                # Nota: bulk_save_objects es legacy, mejor usar add_all o insert core
-                # pero para este ejemplo lo mantengo si te funciona.
-                objects_to_save = [
-                    self.personModel(
-                        identification=str(item["identification"]),
-                        identification_type="DNI",
-                        names=item["names"],
-                        lastnames=item["lastnames"],
-                        address=item["address"],
-                        province=item["province"],
-                        country="ARGENTINA",
-                        created_by=uuid.UUID(self.user_id),
-                    )
-                    for item in data_to_json
-                ]
-
-                db.add_all(
-                    objects_to_save
-                )  # add_all es más moderno que bulk_save_objects en ORM
-                await db.commit()
-
-                with _load_lock:
-                    _load_status["is_loading"] = False
-                    _load_status["status"] = "completed"
-                    _load_status["progress"] = 100
-
-                logger.info("Carga background finalizada exitosamente")
-
-            except Exception as e:
-                logger.error(f"Error background: {e}")
-                with _load_lock:
-                    _load_status["is_loading"] = False
-                    _load_status["status"] = "failed"
-                    _load_status["message"] = str(e)
-
-    def _read_csv_sync(self):
-        """Helper síncrono para leer CSV con pandas sin bloquear el loop"""
-        try:
-            persons = pandas.read_csv("padron.csv", encoding="latin-1")
-            return json.loads(persons.to_json(orient="records"))
-        except Exception as e:
-            logger.error(f"Error leyendo CSV: {e}")
-            return []
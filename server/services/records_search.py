@@ -0,0 +1,212 @@
+from sqlalchemy import select, update, func, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.Record import Records
+from database.db import SessionLocal
+from services.jobs_services import jobs_service, JobContext, JobConflictError
+from utils.text_search import (
+    fulltext_words,
+    parse_search_query,
+    record_search_text,
+    search_words,
+)
+from typing import List, NamedTuple, Optional
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+RECORDS_SEARCH_BACKFILL_JOB_TYPE = "records_search_backfill"
+
+# Tope de resultados de cualquier búsqueda de antecedentes
+RECORD_SEARCH_MAX_RESULTS = 500
+
+
+class RecordHit(NamedTuple):
+    record_id: uuid.UUID
+    score: float
+
+
+class RecordSearchEngine:
+    """
+    Buscador de texto de antecedentes sobre `records.search_text` (palabras
+    normalizadas de título, tipo, contenido y observaciones, mantenida en cada
+    escritura).
+
+    En MariaDB/MySQL usa el índice FULLTEXT en modo booleano: cada palabra se
+    exige por prefijo (`+ROBO*`) y cada frase entre comillas como frase
+    (`+"CALLE FALSA"`); el orden es por relevancia. Las palabras cortas o
+    stopwords, que el índice no guarda, se exigen con LIKE.
+
+    En otros motores (SQLite en desarrollo) todo se resuelve con LIKE y la
+    relevancia se calcula en Python (coincidencias, el título pesa el doble)
+    sobre los RECORD_SEARCH_MAX_RESULTS antecedentes coincidentes más
+    recientes. Ese conjunto no depende de `limit`, así que las posiciones son
+    las mismas en todas las páginas (ver RecordService.search_records).
+    """
+
+    @staticmethod
+    def _supports_fulltext(db: AsyncSession) -> bool:
+        return db.bind.dialect.name in ("mysql", "mariadb")
+
+    async def search(
+        self,
+        db: AsyncSession,
+        q: Optional[str],
+        filters: Optional[list] = None,
+        limit: int = 100,
+    ) -> List[RecordHit]:
+        """
+        Antecedentes que contienen todas las palabras y frases de `q` y
+        cumplen `filters`, ordenados por relevancia (como mucho `limit`).
+        """
+        words, phrases = parse_search_query(q)
+        if not words and not phrases:
+            return []
+        limit = min(limit, RECORD_SEARCH_MAX_RESULTS)
+        filters = list(filters or [])
+
+        if self._supports_fulltext(db):
+            return await self._search_fulltext(db, words, phrases, filters, limit)
+        return await self._search_like(db, words, phrases, filters, limit)
+
+    async def _search_fulltext(
+        self, db: AsyncSession, words: List[str], phrases: List[List[str]], filters: list, limit: int
+    ) -> List[RecordHit]:
+        indexed_words = fulltext_words(words)
+        terms = [f"+{word}*" for word in indexed_words]
+        for phrase in phrases:
+            if fulltext_words(phrase) == phrase:
+                terms.append(f'+"{" ".join(phrase)}"')
+            else:
+                filters.append(Records.search_text.like(f"%{' '.join(phrase)}%"))
+        filters += [
+            Records.search_text.like(f"%{word}%") for word in words if word not in indexed_words
+        ]
+
+        if terms:
+            score = Records.search_text.match(" ".join(terms))
+            stmt = (
+                select(Records.record_id, score)
+                .where(score > 0, *filters)
+                .order_by(score.desc(), Records.updated_at.desc(), Records.record_id.desc())
+            )
+        else:
+            stmt = (
+                select(Records.record_id)
+                .where(*filters)
+                .order_by(Records.updated_at.desc(), Records.record_id.desc())
+            )
+        result = await db.execute(stmt.limit(limit))
+        return [
+            RecordHit(row[0], float(row[1]) if len(row) > 1 else 0.0) for row in result.all()
+        ]
+
+    async def _search_like(
+        self, db: AsyncSession, words: List[str], phrases: List[List[str]], filters: list, limit: int
+    ) -> List[RecordHit]:
+        terms = [" ".join(phrase) for phrase in phrases] + words
+        result = await db.execute(
+            select(Records.record_id, Records.search_text, Records.title)
+            .where(*[Records.search_text.like(f"%{term}%") for term in terms], *filters)
+            .order_by(Records.updated_at.desc(), Records.record_id.desc())
+            .limit(RECORD_SEARCH_MAX_RESULTS)
+        )
+
+        hits = []
+        for record_id, search_text, title in result.all():
+            title_text = " ".join(search_words(title))
+            score = sum(
+                (search_text or "").count(term) + title_text.count(term) for term in terms
+            )
+            hits.append(RecordHit(record_id, float(score)))
+        # Orden estable: a igual relevancia queda el orden por recencia
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits[:limit]
+
+
+async def backfill_records_search_text(context: JobContext, batch_size: int = 500):
+    """
+    Calcula `search_text` de los antecedentes que aún no lo tienen (filas
+    anteriores al buscador). Corre como tarea en segundo plano.
+    """
+    table = Records.__table__
+    stmt_update = (
+        update(table)
+        .where(table.c.record_id == bindparam("b_record_id"))
+        .values(search_text=bindparam("b_search_text"), updated_at=table.c.updated_at)
+    )
+
+    async with SessionLocal() as db:
+        total = (
+            await db.execute(
+                select(func.count()).select_from(table).where(table.c.search_text.is_(None))
+            )
+        ).scalar() or 0
+
+    processed = 0
+    while True:
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(
+                    table.c.record_id,
+                    table.c.title,
+                    table.c.type_record,
+                    table.c.content,
+                    table.c.observations,
+                )
+                .where(table.c.search_text.is_(None))
+                .order_by(table.c.record_id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            await db.execute(
+                stmt_update,
+                [
+                    {
+                        "b_record_id": record_id,
+                        "b_search_text": record_search_text(
+                            title, type_record, content, observations
+                        ),
+                    }
+                    for record_id, title, type_record, content, observations in rows
+                ],
+            )
+            await db.commit()
+
+        processed += len(rows)
+        context.report(
+            {"total_rows": total, "processed": processed},
+            progress=round(processed * 100 / total, 2) if total else 100,
+        )
+
+
+async def ensure_records_search_backfill() -> Optional[str]:
+    """
+    Lanza la tarea de backfill si hay antecedentes sin `search_text`
+    (llamar al arrancar, después de las migraciones).
+
+    Returns:
+        Optional[str]: ID de la tarea lanzada, o None si no hacía falta
+    """
+    async with SessionLocal() as db:
+        pending = (
+            await db.execute(
+                select(Records.record_id).where(Records.search_text.is_(None)).limit(1)
+            )
+        ).first()
+    if pending is None:
+        return None
+
+    try:
+        job = await jobs_service.start_job(
+            RECORDS_SEARCH_BACKFILL_JOB_TYPE, backfill_records_search_text
+        )
+    except JobConflictError:
+        return None
+    return str(job.job_id)
+
+
+record_search = RecordSearchEngine()
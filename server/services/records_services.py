@@ -1,37 +1,65 @@
 from models.Record import Records
 from sqlalchemy.orm import joinedload, selectinload
-from sqlalchemy import select
+from sqlalchemy import select, Integer, column
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from models.Recortds_Persons import RecordsPersons
 import uuid
 from typing import Optional
 from models.Persons import Persons
+from models.Files import Files
+from utils.pagination import Page, paginate, encode_cursor, decode_cursor, InvalidCursorError
+from utils.text_search import record_search_text
+from services.records_search import record_search, RECORD_SEARCH_MAX_RESULTS
 from sqlalchemy import func, or_
 import asyncio
 
+# Columnas del resumen de antecedentes en las búsquedas
+RECORD_SUMMARY_COLUMNS = [
+    "record_id",
+    "title",
+    "date",
+    "type_record",
+    "content",
+    "observations",
+    "create_at",
+    "updated_at",
+]
+
+# Cursor de las búsquedas por relevancia: posición en la lista ordenada
+_RANK_POSITION = column("position", Integer)
+
 
 class RecordService:
     def __init__(self) -> None:
         self.recordModel = Records
         self.personModel = Persons
 
-    async def get_records(self, db: AsyncSession):
-        records = (
-            select(self.recordModel)
-            .options(
-                selectinload(self.recordModel.person_relationships)
-                .joinedload(RecordsPersons.person)
-                .joinedload(self.personModel.users),
-                selectinload(self.recordModel.files),
-            )
-            .limit(50)
+    async def get_records(
+        self,
+        db: AsyncSession,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+    ) -> Page:
+        """
+        Lista los antecedentes del más recientemente modificado al más antiguo,
+        paginados por cursor sobre (updated_at, record_id).
+        """
+        records = select(self.recordModel).options(
+            selectinload(self.recordModel.person_relationships)
+            .joinedload(RecordsPersons.person)
+            .joinedload(self.personModel.users),
+            selectinload(self.recordModel.files),
+        )
+        return await paginate(
+            db,
+            records,
+            [self.recordModel.updated_at, self.recordModel.record_id],
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
         )
-        result = await db.execute(records)
-        records = result.scalars().unique().all()
-        if not records:
-            return []
-        return records
 
     async def get_record(self, record_id: str, db: AsyncSession):
         try:
@@ -81,6 +109,7 @@ class RecordService:
             content=content,
             observations=observations,
             type_record=type_record,
+            search_text=record_search_text(title, type_record, content, observations),
         )
         db.add(new_record)
         await db.commit()
@@ -144,13 +173,21 @@ class RecordService:
         setattr(is_exist, "observations", observations)
         if type_record:
             setattr(is_exist, "type_record", type_record)
+        is_exist.search_text = record_search_text(
+            title, is_exist.type_record, content, observations
+        )
 
         await db.commit()
         return True
 
     async def delete_record(self, record_id: str, db: AsyncSession):
+        try:
+            record_uuid = uuid.UUID(record_id)
+        except ValueError:
+            return False
+
         stm_is_exist = select(self.recordModel).filter(
-            self.recordModel.record_id == record_id
+            self.recordModel.record_id == record_uuid
         )
         result = await db.execute(stm_is_exist)
         is_exist = result.scalars().first()
@@ -158,64 +195,38 @@ class RecordService:
         if not is_exist:
             return False
 
-        db.delete(is_exist)
+        # El índice FULLTEXT se actualiza con el DELETE
+        await db.delete(is_exist)
         await db.commit()
 
         return True
 
-    async def search_records(
-        self, db: AsyncSession, search_term: Optional[str] = None, **filters
-    ):
-        # 1. Definimos la consulta BASE CON LAS RELACIONES CARGADAS
-        stmt = select(self.recordModel).options(
-            # --- Carga de la Cadena de Personas ---
-            selectinload(
-                self.recordModel.person_relationships
-            )  # 1. Lista de relaciones
-            .joinedload(RecordsPersons.person)  # 2. La Persona
-            .joinedload(
-                self.personModel.users
-            ),  # 3. El Creador de la Persona (¡Vital!)
-            # --- Carga de Archivos ---
-            selectinload(self.recordModel.files),
-        )
-
-        # 2. Si hay término de búsqueda genérico (usamos OR)
-        if search_term and search_term.strip():
-            term = f"%{search_term.strip().lower()}%"
-            stmt = stmt.filter(
-                or_(
-                    self.recordModel.title.ilike(term),
-                    self.recordModel.content.ilike(term),
-                    self.recordModel.observations.ilike(term),
-                    self.recordModel.type_record.ilike(term),
-                )
-            )
+    def _search_conditions(self, filters: dict) -> list:
+        """Condiciones de los filtros por campo, fecha y persona vinculada"""
+        conditions = []
 
-        # 3. Filtros específicos (vamos encadenando .filter)
+        # 1. Filtros específicos
         if filters.get("title"):
-            stmt = stmt.filter(self.recordModel.title.ilike(f"%{filters['title']}%"))
+            conditions.append(self.recordModel.title.ilike(f"%{filters['title']}%"))
 
         if filters.get("content"):
-            stmt = stmt.filter(
-                self.recordModel.content.ilike(f"%{filters['content']}%")
-            )
+            conditions.append(self.recordModel.content.ilike(f"%{filters['content']}%"))
 
         if filters.get("observations"):
-            stmt = stmt.filter(
+            conditions.append(
                 self.recordModel.observations.ilike(f"%{filters['observations']}%")
             )
 
         if filters.get("type_record"):
-            stmt = stmt.filter(
+            conditions.append(
                 self.recordModel.type_record.ilike(f"%{filters['type_record']}%")
             )
 
-        # 4. Filtros de Fechas
+        # 2. Filtros de Fechas
         if filters.get("date_from"):
             try:
                 date_from = datetime.fromisoformat(filters["date_from"])
-                stmt = stmt.filter(self.recordModel.date >= date_from)
+                conditions.append(self.recordModel.date >= date_from)
             except ValueError:
                 pass
 
@@ -223,21 +234,17 @@ class RecordService:
             try:
                 date_to = datetime.fromisoformat(filters["date_to"])
                 # Agregamos un día para incluir el límite superior completo
-                stmt = stmt.filter(self.recordModel.date < date_to + timedelta(days=1))
+                conditions.append(self.recordModel.date < date_to + timedelta(days=1))
             except ValueError:
                 pass
 
-        # 5. Filtro complejo: Nombre de persona relacionada
+        # 3. Filtro complejo: Nombre de persona relacionada
         if filters.get("person_name"):
             person_pattern = f"%{filters['person_name']}%"
 
             # Creamos una SUBCONSULTA (Select) para obtener los IDs de records
             subquery_ids = (
-                select(self.recordModel.record_id)
-                .join(
-                    RecordsPersons,
-                    self.recordModel.record_id == RecordsPersons.record_id,
-                )
+                select(RecordsPersons.record_id)
                 .join(Persons, RecordsPersons.person_id == Persons.person_id)
                 .filter(
                     or_(
@@ -246,17 +253,106 @@ class RecordService:
                     )
                 )
             )
+            conditions.append(self.recordModel.record_id.in_(subquery_ids))
+        return conditions
+
+    def _summary_query(self):
+        """
+        Columnas del antecedente más la cantidad de personas vinculadas y de
+        archivos activos, contadas en SQL (sin cargar las relaciones).
+        """
+        person_count = (
+            select(func.count())
+            .select_from(RecordsPersons)
+            .where(RecordsPersons.record_id == self.recordModel.record_id)
+            .correlate(self.recordModel)
+            .scalar_subquery()
+        )
+        file_count = (
+            select(func.count())
+            .select_from(Files)
+            .where(Files.record_id == self.recordModel.record_id, Files.is_active)
+            .correlate(self.recordModel)
+            .scalar_subquery()
+        )
+        return select(
+            *[getattr(self.recordModel, column) for column in RECORD_SUMMARY_COLUMNS],
+            person_count.label("person_count"),
+            file_count.label("file_count"),
+        )
 
-            # Aplicamos el filtro usando la subconsulta
-            stmt = stmt.filter(self.recordModel.record_id.in_(subquery_ids))
+    @staticmethod
+    def _summary(row, score: Optional[float] = None) -> dict:
+        summary = {column: getattr(row, column) for column in RECORD_SUMMARY_COLUMNS}
+        summary["person_count"] = row.person_count
+        summary["file_count"] = row.file_count
+        if score is not None:
+            summary["score"] = score
+        return summary
 
-        # 6. FINALMENTE Ejecutamos
-        try:
-            result = await db.execute(stmt)
-            # .unique() es OBLIGATORIO aquí porque usamos selectinload/joinedload mezclados
-            records = result.scalars().unique().all()
-            return records
-
-        except Exception as e:
-            print(f"Error en search_records: {e}")
-            return []
+    async def search_records(
+        self,
+        db: AsyncSession,
+        search_term: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> Page:
+        """
+        Busca antecedentes y devuelve una página de resúmenes (columnas del
+        antecedente, `person_count` y `file_count`); el detalle completo se
+        carga solo al abrir uno (get_record).
+
+        Con `search_term` usa el buscador de texto (services/records_search.py)
+        y ordena por relevancia (`score`); el cursor avanza sobre esa lista,
+        acotada a RECORD_SEARCH_MAX_RESULTS. Sin él, los más recientes primero,
+        con cursor sobre (updated_at, record_id).
+
+        Raises:
+            InvalidCursorError: Si el cursor no es válido
+        """
+        conditions = self._search_conditions(filters)
+        summary = self._summary_query()
+
+        if not (search_term and search_term.strip()):
+            page = await paginate(
+                db,
+                summary.where(*conditions),
+                [self.recordModel.updated_at, self.recordModel.record_id],
+                limit=limit,
+                cursor=cursor,
+                rows=True,
+            )
+            return Page([self._summary(row) for row in page.items], page.next_cursor)
+
+        # Término genérico: posiciones dentro de la lista por relevancia
+        offset = decode_cursor(cursor, [_RANK_POSITION])[0] if cursor else 0
+        if offset < 0:
+            raise InvalidCursorError("Cursor inválido")
+        hits = await record_search.search(
+            db,
+            search_term,
+            conditions,
+            min(offset + limit + 1, RECORD_SEARCH_MAX_RESULTS),
+        )
+        page_hits = hits[offset : offset + limit]
+        next_cursor = None
+        if len(hits) > offset + limit:
+            next_cursor = encode_cursor([offset + limit])
+        if not page_hits:
+            return Page([], None)
+
+        result = await db.execute(
+            summary.where(
+                self.recordModel.record_id.in_([hit.record_id for hit in page_hits])
+            )
+        )
+        rows = {row.record_id: row for row in result.all()}
+        return Page(
+            [
+                self._summary(rows[hit.record_id], hit.score)
+                for hit in page_hits
+                if hit.record_id in rows
+            ],
+            next_cursor,
+        )
@@ -9,6 +9,7 @@ from datetime import datetime
 from sqlalchemy.orm import joinedload
 from sqlalchemy import select
 from models.schemas.user_schema import UserResponses
+from utils.role_cache import role_cache
 from passlib.context import CryptContext
 
 # Instancia global (solo se crea una vez)
@@ -285,6 +286,7 @@ class UserService:
             setattr(find, "role_id", role)
             await db.commit()
             await db.refresh(find)
+            role_cache.invalidate(id)
 
             return True
         except Exception as e:
@@ -301,6 +303,7 @@ class UserService:
                 return False
             db.delete(user)
             await db.commit()
+            role_cache.invalidate(id)
             return True
         except Exception as e:
             print("Error al eliminar el usuario", e)
@@ -0,0 +1,58 @@
+"""
+Configuración común de las pruebas.
+
+Cada prueba corre sobre una base nueva con el esquema completo (create_all y
+las migraciones versionadas). Por defecto es un archivo SQLite temporal; con
+TEST_DATABASE_URL se usa otra base (p. ej. una base MariaDB vacía, solo
+para pruebas: se borran todas sus tablas al terminar).
+"""
+
+import asyncio
+import os
+import sys
+
+# database.db crea el engine de la app al importarse; en las pruebas no se usa
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("HASH_ALGORITHM", "HS256")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import models  # noqa: F401 (registra todos los mappers)
+from database.db import Base
+from database.migrations import run_migrations
+
+
+@pytest.fixture
+def run_db(tmp_path):
+    """
+    Ejecuta `test(engine, session_factory)` (una corrutina) sobre una base
+    nueva con el esquema migrado.
+    """
+
+    def run(test):
+        url = os.getenv("TEST_DATABASE_URL") or f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+
+        async def main():
+            engine = create_async_engine(url)
+            session_factory = async_sessionmaker(
+                bind=engine, class_=AsyncSession, expire_on_commit=False
+            )
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                await run_migrations(engine)
+                await test(engine, session_factory)
+            finally:
+                if os.getenv("TEST_DATABASE_URL"):
+                    async with engine.begin() as conn:
+                        await conn.run_sync(Base.metadata.drop_all)
+                        await conn.execute(text("DROP TABLE IF EXISTS schema_migrations"))
+                await engine.dispose()
+
+        asyncio.run(main())
+
+    return run
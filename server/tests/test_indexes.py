@@ -0,0 +1,152 @@
+"""
+Índices de claves foráneas y filtros (migración 8): el plan de las consultas
+de los servicios usa el índice esperado.
+"""
+
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from services.files_services import FilesService
+from services.logs_services import LogsService
+from services.persons_graph import PersonGraphService
+from services.persons_search import PersonSearchEngine
+from services.persons_services import PersonsService
+from services.records_services import RecordService
+from models.Persons import Persons
+
+PERSON_ID = uuid.uuid4()
+
+
+@contextmanager
+def _captured_statements(engine):
+    """SQL y parámetros de cada consulta ejecutada dentro del bloque"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def _plans(engine, statements) -> str:
+    """Planes (EXPLAIN QUERY PLAN en SQLite, EXPLAIN en MariaDB/MySQL) como texto"""
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    lines = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(prefix + statement, parameters)
+            lines += [" ".join(str(value) for value in row) for row in result.all()]
+    return "\n".join(lines)
+
+
+async def _seed_person(session_factory):
+    async with session_factory() as db:
+        db.add(
+            Persons(
+                person_id=PERSON_ID,
+                identification="30111222",
+                identification_type="DNI",
+                names="JUAN",
+                lastnames="PEREZ",
+                province="FORMOSA",
+                country="ARGENTINA",
+            )
+        )
+        await db.commit()
+
+
+CASES = [
+    (
+        "files_by_person",
+        lambda db: FilesService().get_files_by_person(str(PERSON_ID), db),
+        ["ix_files_person_active_created_at"],
+    ),
+    (
+        "files_by_record",
+        lambda db: FilesService().get_files_by_record(str(uuid.uuid4()), db),
+        ["ix_files_record_active_created_at"],
+    ),
+    (
+        "person_records",
+        lambda db: PersonsService().get_person_records(str(PERSON_ID), db),
+        ["ix_records_persons_person_record"],
+    ),
+    (
+        "linked_persons",
+        lambda db: PersonsService().get_linked_persons(str(PERSON_ID), db),
+        ["ix_connection_type_person_connection", "ix_connection_type_connection_person"],
+    ),
+    (
+        "person_names_exact",
+        lambda db: PersonSearchEngine().search_ids(db, names="Juan", name_match="exact"),
+        ["ix_persons_names_normalized"],
+    ),
+    (
+        "person_lastnames_prefix",
+        lambda db: PersonSearchEngine().search_ids(db, lastname="PER", name_match="prefix"),
+        ["ix_persons_lastnames_normalized"],
+    ),
+    (
+        "graph_neighbors",
+        lambda db: PersonGraphService().get_graph(db, PERSON_ID, depth=1),
+        ["ix_connection_type_person_connection", "ix_connection_type_connection_person"],
+    ),
+    (
+        "records_search_summaries",
+        lambda db: RecordService().search_records(db),
+        ["ix_records_persons_record_person", "ix_files_record_active_created_at"],
+    ),
+    (
+        "records_by_date",
+        lambda db: RecordService().search_records(
+            db, date_from="2024-01-01", date_to="2024-01-31"
+        ),
+        ["ix_records_date"],
+    ),
+    (
+        "logs_by_user",
+        lambda db: LogsService().get_logs_page(db, filters={"user_id": uuid.uuid4()}),
+        ["ix_logs_user_created_at_id"],
+    ),
+    (
+        "logs_by_action",
+        lambda db: LogsService().get_logs_page(db, filters={"action": "LOGIN"}),
+        ["ix_logs_action_created_at_id"],
+    ),
+    (
+        "logs_by_entity_type",
+        lambda db: LogsService().get_logs_page(db, filters={"entity_type": "PERSON"}),
+        ["ix_logs_entity_type_created_at_id"],
+    ),
+]
+
+
+# SQLite no usa un índice BINARY para LIKE (su LIKE ignora mayúsculas);
+# MariaDB/MySQL sí resuelven LIKE 'x%' como rango sobre el índice
+MYSQL_ONLY = {"person_lastnames_prefix"}
+
+
+@pytest.mark.parametrize(
+    "name, query, expected", CASES, ids=[case[0] for case in CASES]
+)
+def test_queries_use_indexes(run_db, name, query, expected):
+    async def test(engine, session_factory):
+        if name in MYSQL_ONLY and engine.dialect.name not in ("mysql", "mariadb"):
+            pytest.skip("LIKE por prefijo usa el índice solo en MariaDB/MySQL")
+        await _seed_person(session_factory)
+        with _captured_statements(engine) as statements:
+            async with session_factory() as db:
+                await query(db)
+        plans = await _plans(engine, statements)
+        for index in expected:
+            assert index in plans, plans
+
+    run_db(test)
@@ -0,0 +1,40 @@
+"""Registro de tareas en segundo plano (services/jobs_services.py)"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from models.Jobs import Jobs
+from services.jobs_services import JobsService
+
+
+def test_finish_does_not_overwrite_an_expired_job(run_db):
+    async def test(engine, session_factory):
+        service = JobsService(session_factory=session_factory, heartbeat_interval=60)
+        release = asyncio.Event()
+
+        async def runner(context):
+            await release.wait()
+
+        job = await service.start_job("test_job", runner)
+
+        # El lease vence mientras la tarea sigue corriendo y se da por perdida
+        async with session_factory() as db:
+            await db.execute(
+                update(Jobs)
+                .where(Jobs.job_id == job.job_id)
+                .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+            )
+            await db.commit()
+        assert await service.expire_stale_jobs() == 1
+
+        release.set()
+        await service._tasks[job.job_id]
+
+        async with session_factory() as db:
+            stored = await service.get_job(str(job.job_id), db)
+        assert stored.status == "failed"
+        assert stored.message.startswith("Lease vencido")
+
+    run_db(test)
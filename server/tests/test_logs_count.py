@@ -0,0 +1,56 @@
+"""Total del listado de logs con el rollup diario (services/logs_services.py)"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from models.Logs import Logs
+from services.logs_rollup import add_to_rollup
+from services.logs_services import COUNT_ESTIMATED, COUNT_ROLLUP, LogsService
+
+DAY = datetime(2024, 3, 1)
+
+
+async def _seed_logs(session_factory):
+    """Dos logs por día durante cinco días"""
+    rows = [
+        {
+            "action": "LOGIN",
+            "entity_type": "USER",
+            "created_at": DAY + timedelta(days=day, hours=hour),
+        }
+        for day in range(5)
+        for hour in (9, 18)
+    ]
+    async with session_factory() as db:
+        await db.execute(insert(Logs).values(rows))
+        await add_to_rollup(db, rows)
+        await db.commit()
+
+
+def test_rollup_total_matches_listed_logs(run_db):
+    async def test(engine, session_factory):
+        await _seed_logs(session_factory)
+        service = LogsService()
+        cases = [
+            {"action": "LOGIN"},
+            {
+                "start_date": DAY + timedelta(days=1),
+                "end_date": DAY + timedelta(days=3, hours=23, minutes=59, seconds=59),
+            },
+            # Una sola fecha: el listado no la aplica y el total tampoco
+            {"start_date": DAY + timedelta(days=2)},
+            {"action": "LOGIN", "end_date": DAY + timedelta(days=1)},
+        ]
+        async with session_factory() as db:
+            for filters in cases:
+                page = await service.get_logs_page(db, limit=100, filters=filters)
+                count = await service.count_logs_with_mode(db, filters, COUNT_ESTIMATED)
+                assert count.total == len(page.items), filters
+
+            one_sided = await service.count_logs_with_mode(
+                db, {"start_date": DAY + timedelta(days=2)}, COUNT_ESTIMATED
+            )
+            assert one_sided.mode != COUNT_ROLLUP
+
+    run_db(test)
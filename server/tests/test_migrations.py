@@ -0,0 +1,32 @@
+"""Migraciones de esquema con datos anteriores (database/migrations.py)"""
+
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+from database.migrations import _make_pagination_keys_not_null
+
+
+def test_pagination_keys_are_backfilled():
+    # Tablas como las creaba una versión anterior, con las claves nulas
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE persons (id INTEGER, created_at DATETIME, updated_at DATETIME)"))
+        conn.execute(text("CREATE TABLE records (id INTEGER, create_at DATETIME, updated_at DATETIME)"))
+        conn.execute(text("CREATE TABLE files (id INTEGER, created_at DATETIME, updated_at DATETIME)"))
+        conn.execute(text("INSERT INTO persons VALUES (1, '2024-01-02 00:00:00', NULL), (2, NULL, NULL)"))
+        conn.execute(text("INSERT INTO records VALUES (1, '2024-01-03 00:00:00', NULL)"))
+        conn.execute(
+            text("INSERT INTO files VALUES (1, NULL, '2024-01-04 00:00:00'), (2, '2024-01-05 00:00:00', NULL)")
+        )
+
+        _make_pagination_keys_not_null(conn)
+
+        persons = dict(conn.execute(text("SELECT id, updated_at FROM persons")).all())
+        records = dict(conn.execute(text("SELECT id, updated_at FROM records")).all())
+        files = dict(conn.execute(text("SELECT id, created_at FROM files")).all())
+
+    assert persons[1] == "2024-01-02 00:00:00"
+    assert datetime.fromisoformat(persons[2])  # sin fechas: la actual
+    assert records == {1: "2024-01-03 00:00:00"}
+    assert files == {1: "2024-01-04 00:00:00", 2: "2024-01-05 00:00:00"}
@@ -0,0 +1,59 @@
+"""Sincronización del padrón contra `persons` (services/padron_import.py)"""
+
+import uuid
+
+from sqlalchemy import select
+
+from models.Persons import Persons
+from services.padron_import import PadronImporter
+from utils.text_search import PERSON_SEARCH_COLUMNS, person_search_columns
+
+
+def _padron_row(identification, names, lastnames="GOMEZ"):
+    return {
+        "identification": identification,
+        "names": names,
+        "lastnames": lastnames,
+        "address": "AV. 9 DE JULIO 100",
+        "province": "FORMOSA",
+    }
+
+
+def test_sync_batch_keeps_search_columns_in_step_with_the_row(run_db):
+    async def test(engine, session_factory):
+        async with session_factory() as db:
+            db.add(
+                Persons(
+                    person_id=uuid.uuid4(),
+                    identification="30111222",
+                    identification_type="DNI",
+                    names="ANA",
+                    lastnames="GOMEZ",
+                    province="FORMOSA",
+                    country="PARAGUAY",
+                )
+            )
+            await db.commit()
+
+        rows = {
+            "30111222": _padron_row("30111222", "ANA MARIA"),
+            "30333444": _padron_row("30333444", "LUIS"),
+        }
+        async with session_factory() as db:
+            counts = await PadronImporter()._sync_batch(db, rows, uuid.uuid4())
+            await db.commit()
+        assert counts == (1, 1, 0)
+
+        async with session_factory() as db:
+            persons = (await db.execute(select(Persons))).scalars().all()
+        assert {person.identification: person.country for person in persons} == {
+            "30111222": "PARAGUAY",
+            "30333444": "ARGENTINA",
+        }
+        for person in persons:
+            expected = person_search_columns(
+                person.identification, person.names, person.lastnames, person.address, person.country
+            )
+            assert {column: getattr(person, column) for column in PERSON_SEARCH_COLUMNS} == expected
+
+    run_db(test)
@@ -0,0 +1,102 @@
+"""Grafo de vínculos a varios saltos (services/persons_graph.py)"""
+
+import random
+import uuid
+from collections import deque
+
+from sqlalchemy import event
+
+from models.Connection_Type import ConnectionType
+from models.Persons import Persons
+from services.persons_graph import PersonGraphService
+
+
+async def _seed_graph(session_factory, persons: int, links: int, seed: int = 7):
+    """Grafo aleatorio con ciclos; retorna los IDs y la adyacencia (sin dirección)"""
+    rng = random.Random(seed)
+    ids = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(persons)]
+    adjacency = {person: set() for person in ids}
+    async with session_factory() as db:
+        db.add_all(
+            Persons(
+                person_id=person,
+                identification=str(person.int)[:12],
+                identification_type="DNI",
+                names="NOMBRE",
+                lastnames="APELLIDO",
+                province="FORMOSA",
+                country="ARGENTINA",
+            )
+            for person in ids
+        )
+        for _ in range(links):
+            source, target = rng.sample(ids, 2)
+            adjacency[source].add(target)
+            adjacency[target].add(source)
+            db.add(ConnectionType(person_id=source, connection=target, connection_type="AMIGO"))
+        await db.commit()
+    return ids, adjacency
+
+
+def _distances(adjacency, root, depth):
+    distances = {root: 0}
+    queue = deque([root])
+    while queue:
+        person = queue.popleft()
+        if distances[person] == depth:
+            continue
+        for neighbor in adjacency[person]:
+            if neighbor not in distances:
+                distances[neighbor] = distances[person] + 1
+                queue.append(neighbor)
+    return distances
+
+
+def test_graph_matches_bfs_and_is_bounded(run_db):
+    async def test(engine, session_factory):
+        ids, adjacency = await _seed_graph(session_factory, persons=80, links=240)
+        service = PersonGraphService()
+        root = ids[0]
+
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        async with session_factory() as db:
+            for depth in (1, 2, 3, 5):
+                expected = _distances(adjacency, root, depth)
+                graph = await service.get_graph(db, root, depth=depth, max_nodes=1000)
+                assert not graph["truncated"]
+                assert {uuid.UUID(node["id"]): node["depth"] for node in graph["nodes"]} == expected
+                assert graph["nodes"][0]["id"] == str(root)
+
+            # Tope: las más cercanas primero, y `truncated` si quedaron afuera
+            expected = _distances(adjacency, root, 5)
+            for max_nodes in (1, 5, 20, len(expected) - 1, len(expected)):
+                event.listen(engine.sync_engine, "before_cursor_execute", count)
+                try:
+                    graph = await service.get_graph(db, root, depth=5, max_nodes=max_nodes)
+                finally:
+                    event.remove(engine.sync_engine, "before_cursor_execute", count)
+                # raíz + un salto por nivel (+1 para detectar el tope) + personas + vínculos
+                assert len(statements) <= 5 + 4
+                statements.clear()
+
+                nodes = {uuid.UUID(node["id"]): node["depth"] for node in graph["nodes"]}
+                assert len(nodes) == min(max_nodes, len(expected))
+                assert graph["truncated"] == (len(expected) > max_nodes)
+                assert all(expected[person] == level for person, level in nodes.items())
+                deepest = max(nodes.values())
+                assert all(
+                    person in nodes for person, level in expected.items() if level < deepest
+                )
+                node_ids = {node["id"] for node in graph["nodes"]}
+                assert all(
+                    edge["source"] in node_ids and edge["target"] in node_ids
+                    for edge in graph["edges"]
+                )
+
+            assert await service.get_graph(db, uuid.uuid4(), depth=2) is None
+
+    run_db(test)
@@ -0,0 +1,68 @@
+"""Personas vinculadas: cantidad de consultas constante (services/persons_services.py)"""
+
+import uuid
+
+from sqlalchemy import event
+
+from models.Connection_Type import ConnectionType
+from models.Persons import Persons
+from services.persons_services import PersonsService
+
+
+def _person(index: int) -> Persons:
+    person_id = uuid.uuid4()
+    return Persons(
+        person_id=person_id,
+        identification=str(person_id.int)[:12],
+        identification_type="DNI",
+        names=f"NOMBRE {index}",
+        lastnames=f"APELLIDO {index}",
+        province="FORMOSA",
+        country="ARGENTINA",
+    )
+
+
+async def _linked_with_query_count(engine, session_factory, links: int):
+    """Crea una persona con `links` vínculos (mitad salientes, mitad entrantes)"""
+    person = _person(0)
+    others = [_person(index) for index in range(1, links + 1)]
+    async with session_factory() as db:
+        db.add_all([person, *others])
+        await db.flush()
+        db.add_all(
+            ConnectionType(
+                person_id=person.person_id if index % 2 else other.person_id,
+                connection=other.person_id if index % 2 else person.person_id,
+                connection_type="FAMILIAR",
+            )
+            for index, other in enumerate(others)
+        )
+        await db.commit()
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        async with session_factory() as db:
+            linked = await PersonsService().get_linked_persons(str(person.person_id), db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return linked, len(statements)
+
+
+def test_linked_persons_query_count_is_constant(run_db):
+    async def test(engine, session_factory):
+        results = {}
+        for links in (1, 25):
+            linked, queries = await _linked_with_query_count(engine, session_factory, links)
+            assert len(linked) == links
+            assert {row["direction"] for row in linked} <= {"outgoing", "incoming"}
+            results[links] = queries
+
+        # Una consulta para verificar la persona y una para todos los vínculos
+        assert results[1] == results[25] == 2
+
+    run_db(test)
@@ -0,0 +1,83 @@
+"""Filtros por campo del buscador de personas (services/persons_search.py)"""
+
+import uuid
+
+from models.Persons import Persons
+from services.persons_search import PersonSearchEngine
+from utils.text_search import infix_trigram_tokens, person_search_columns, trigram_tokens
+
+PEOPLE = [
+    ("30111222", "Ana María", "Pérez"),
+    ("30111333", "Juan Carlos", "Gómez"),
+    ("3011_444", "José", "Martínez"),
+    ("40222555", "Mariano", "Sosa"),
+]
+
+
+async def _seed(session_factory):
+    ids = {}
+    async with session_factory() as db:
+        for identification, names, lastnames in PEOPLE:
+            person_id = uuid.uuid4()
+            ids[identification] = person_id
+            db.add(
+                Persons(
+                    person_id=person_id,
+                    identification=identification,
+                    identification_type="DNI",
+                    names=names,
+                    lastnames=lastnames,
+                    province="FORMOSA",
+                    country="ARGENTINA",
+                    **person_search_columns(identification, names, lastnames, None, "ARGENTINA"),
+                )
+            )
+        await db.commit()
+    return ids
+
+
+def test_field_filters(run_db):
+    async def test(engine, session_factory):
+        ids = await _seed(session_factory)
+        search = PersonSearchEngine()
+
+        async def found(**filters):
+            async with session_factory() as db:
+                return set(await search.search_ids(db, **filters))
+
+        # contains: en cualquier posición, sin acentos ni mayúsculas
+        assert await found(names="maria") == {ids["30111222"], ids["40222555"]}
+        assert await found(names="carl") == {ids["30111333"]}
+        assert await found(lastname="tinez") == {ids["3011_444"]}
+        assert await found(names="ana", lastname="PÉR") == {ids["30111222"]}
+        # Menos de 3 letras: sin trigramas que acoten, solo por prefijo
+        assert await found(names="an") == {ids["30111222"]}
+        assert await found(names="jo") == {ids["3011_444"]}
+
+        # prefix y exact: sobre la columna normalizada completa
+        assert await found(names="ana ma", name_match="prefix") == {ids["30111222"]}
+        assert await found(names="maria", name_match="prefix") == {ids["40222555"]}
+        assert await found(names="ana maría", name_match="exact") == {ids["30111222"]}
+        assert await found(names="ana", name_match="exact") == set()
+
+        # Identificación: prefijo, con % y _ literales
+        assert await found(identification="30111") == {ids["30111222"], ids["30111333"]}
+        assert await found(identification="3011_") == {ids["3011_444"]}
+        assert await found(identification="%222") == set()
+
+        # contains: primero las coincidencias por prefijo
+        async with session_factory() as db:
+            ordered = await search.search_ids(db, names="maria")
+        assert ordered == [ids["40222555"], ids["30111222"]]
+        async with session_factory() as db:
+            assert await search.search_ids(db, names="maria", limit=1) == [ids["40222555"]]
+
+    run_db(test)
+
+
+def test_infix_trigrams_are_a_subset_of_the_indexed_ones():
+    # Condición necesaria para acotar con search_trigrams sin perder resultados
+    indexed = set(trigram_tokens(["MARTINEZ"]))
+    for infix in ("MARTINEZ", "ARTI", "TINEZ", "INE"):
+        assert set(infix_trigram_tokens([infix])) <= indexed
+    assert infix_trigram_tokens(["AN"]) == []
@@ -0,0 +1,53 @@
+"""Búsqueda de antecedentes por relevancia, paginada (services/records_services.py)"""
+
+import uuid
+from datetime import date, datetime, timedelta
+
+from models.Record import Records
+from services.records_services import RecordService
+from utils.text_search import record_search_text
+
+
+async def _seed_records(session_factory, count: int):
+    """Los más antiguos mencionan el término más veces (más relevantes)"""
+    async with session_factory() as db:
+        for index in range(count):
+            content = " ".join(["robo"] * (1 + (count - index) // 8)) + f" expediente {index}"
+            db.add(
+                Records(
+                    record_id=uuid.uuid4(),
+                    title=f"Antecedente {index}",
+                    date=date(2024, 1, 1),
+                    type_record="ROBO",
+                    content=content,
+                    search_text=record_search_text(
+                        f"Antecedente {index}", "ROBO", content, None
+                    ),
+                    updated_at=datetime(2024, 1, 1) + timedelta(minutes=index),
+                )
+            )
+        await db.commit()
+
+
+def test_ranked_pages_do_not_repeat_or_skip(run_db):
+    async def test(engine, session_factory):
+        await _seed_records(session_factory, 40)
+        service = RecordService()
+
+        async with session_factory() as db:
+            ranked = await service.search_records(db, "robo", limit=200)
+            assert ranked.next_cursor is None
+            expected = [summary["record_id"] for summary in ranked.items]
+
+            walked, cursor = [], None
+            while True:
+                page = await service.search_records(db, "robo", limit=5, cursor=cursor)
+                walked += [summary["record_id"] for summary in page.items]
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+
+        assert len(expected) == 40
+        assert walked == expected
+
+    run_db(test)
@@ -0,0 +1,124 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, Tuple
+
+from config.config import executor_process_workers, executor_thread_workers
+from utils.metrics import LatencyStats
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> Tuple[float, Any]:
+    """Ejecuta `fn` en el worker y devuelve (instante de inicio, resultado)"""
+    started_at = time.time()
+    return started_at, fn(*args, **kwargs)
+
+
+class InstrumentedExecutor:
+    """
+    Pool de workers para sacar trabajo bloqueante del event loop.
+
+    Mide la profundidad de cola (tareas enviadas que aún no tienen worker),
+    el tiempo de espera en cola y la latencia total de cada tarea.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int):
+        self.name = name
+        self.workers = workers
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait = LatencyStats()
+        self.latency = LatencyStats()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Ejecuta `fn(*args, **kwargs)` en el pool y espera su resultado"""
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            started_at, result = await loop.run_in_executor(
+                self._get_executor(), partial(_timed_call, fn, args, kwargs)
+            )
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        finished_at = time.time()
+        self.wait.observe(max(0.0, started_at - submitted_at))
+        self.latency.observe(finished_at - submitted_at)
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self.in_flight
+            data = {
+                "workers": self.workers,
+                "in_flight": in_flight,
+                "queue_depth": max(0, in_flight - self.workers),
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+        data["queue_wait"] = self.wait.snapshot()
+        data["latency"] = self.latency.snapshot()
+        return data
+
+
+# Hilos: trabajo que libera el GIL (hashlib.pbkdf2_hmac, AES de OpenSSL, E/S de disco)
+io_executor = InstrumentedExecutor(
+    "threads",
+    lambda: ThreadPoolExecutor(
+        max_workers=executor_thread_workers, thread_name_prefix="sga-io"
+    ),
+    executor_thread_workers,
+)
+
+# Procesos: trabajo CPU que retiene el GIL (Pillow). Con 0 procesos se usa el pool de hilos.
+if executor_process_workers > 0:
+    cpu_executor = InstrumentedExecutor(
+        "processes",
+        lambda: ProcessPoolExecutor(
+            max_workers=executor_process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ),
+        executor_process_workers,
+    )
+else:
+    cpu_executor = io_executor
+
+
+def shutdown_executors() -> None:
+    """Cierra los pools (llamar desde el lifespan de la app)"""
+    cpu_executor.shutdown()
+    io_executor.shutdown()
+
+
+def executors_stats() -> dict:
+    stats = {"threads": io_executor.stats()}
+    if cpu_executor is not io_executor:
+        stats["processes"] = cpu_executor.stats()
+    return stats
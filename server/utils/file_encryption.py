@@ -1,12 +1,110 @@
 import os
 import secrets
 import hashlib
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.exceptions import InvalidTag
 import base64
-from typing import Tuple, BinaryIO
+import struct
+from typing import BinaryIO, Iterator, NamedTuple, Optional
 import uuid
+from functools import lru_cache
+from config.config import file_key_cache_size
+
+# Tamaño de segmento en claro del formato cifrado por segmentos
+CHUNK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=file_key_cache_size)
+def _derive_key_cached(password: str, salt: str) -> bytes:
+    """
+    PBKDF2-HMAC-SHA256 (100.000 iteraciones) de la clave maestra con el salt del archivo.
+    hashlib libera el GIL durante la derivación, así que puede correr en un pool de hilos.
+    """
+    derived = hashlib.pbkdf2_hmac(
+        'sha256', password.encode('utf-8'), salt.encode('utf-8'), 100000, dklen=32
+    )
+    return base64.urlsafe_b64encode(derived)
+
+
+class ChunkedLayout(NamedTuple):
+    chunk_size: int
+    chunk_count: int
+    plaintext_size: int
+    total_size: int
+
+    def encrypted_chunk_length(self, index: int) -> int:
+        if index < self.chunk_count - 1:
+            return self.chunk_size + ChunkedFormat.TAG_SIZE
+        return self.total_size - ChunkedFormat.HEADER_SIZE - index * (
+            self.chunk_size + ChunkedFormat.TAG_SIZE
+        )
+
+    def chunk_offset(self, index: int) -> int:
+        return ChunkedFormat.HEADER_SIZE + index * (self.chunk_size + ChunkedFormat.TAG_SIZE)
+
+
+class ChunkedFormat:
+    """
+    Contenedor cifrado por segmentos (versión 1).
+
+    Cabecera: MAGIC (6) | versión (1) | tamaño de segmento (4, big-endian) | prefijo de nonce (8)
+    Cuerpo:   segmentos AES-256-GCM de `chunk_size` bytes en claro + tag de 16 bytes;
+              el último puede ser más corto.
+
+    El nonce de cada segmento es prefijo + índice, y el índice y la marca de
+    "último segmento" van en los datos autenticados, de modo que no se pueden
+    reordenar ni truncar segmentos sin que falle la verificación. Como todos los
+    segmentos salvo el último tienen el mismo tamaño, el segmento que contiene un
+    byte dado se ubica sin leer el resto del archivo.
+    """
+
+    MAGIC = b"SGAENC"
+    VERSION = 1
+    NONCE_PREFIX_SIZE = 8
+    TAG_SIZE = 16
+    _HEADER = struct.Struct(">6sBI8s")
+    HEADER_SIZE = _HEADER.size
+
+    @staticmethod
+    def build_header(chunk_size: int, nonce_prefix: bytes) -> bytes:
+        return ChunkedFormat._HEADER.pack(
+            ChunkedFormat.MAGIC, ChunkedFormat.VERSION, chunk_size, nonce_prefix
+        )
+
+    @staticmethod
+    def is_chunked(header: bytes) -> bool:
+        return header.startswith(ChunkedFormat.MAGIC)
+
+    @staticmethod
+    def parse_header(header: bytes, total_size: int) -> ChunkedLayout:
+        if len(header) < ChunkedFormat.HEADER_SIZE:
+            raise ValueError("Cabecera de archivo encriptado incompleta")
+        magic, version, chunk_size, _ = ChunkedFormat._HEADER.unpack(
+            header[: ChunkedFormat.HEADER_SIZE]
+        )
+        if magic != ChunkedFormat.MAGIC or version != ChunkedFormat.VERSION:
+            raise ValueError(f"Versión de formato encriptado no soportada: {version}")
+
+        body_size = total_size - ChunkedFormat.HEADER_SIZE
+        stride = chunk_size + ChunkedFormat.TAG_SIZE
+        chunk_count = max(1, -(-body_size // stride))
+        last_length = body_size - (chunk_count - 1) * stride
+        if chunk_size <= 0 or last_length < ChunkedFormat.TAG_SIZE:
+            raise ValueError("Archivo encriptado truncado o corrupto")
+
+        plaintext_size = body_size - chunk_count * ChunkedFormat.TAG_SIZE
+        return ChunkedLayout(chunk_size, chunk_count, plaintext_size, total_size)
+
+    @staticmethod
+    def nonce(header: bytes, index: int) -> bytes:
+        prefix = header[ChunkedFormat.HEADER_SIZE - ChunkedFormat.NONCE_PREFIX_SIZE : ChunkedFormat.HEADER_SIZE]
+        return prefix + struct.pack(">I", index)
+
+    @staticmethod
+    def aad(header: bytes, index: int, is_final: bool) -> bytes:
+        return header + struct.pack(">I?", index, is_final)
+
 
 class FileEncryption:
     """
@@ -21,20 +119,24 @@ class FileEncryption:
     @staticmethod
     def generate_key_from_password(password: str, salt: str) -> bytes:
         """
-        Genera una clave de encriptación derivada de una contraseña y salt
+        Genera una clave de encriptación derivada de una contraseña y salt.
+        El resultado se cachea por (contraseña, salt): cada archivo tiene su
+        propio salt, así que solo la primera apertura paga el PBKDF2.
         """
-        salt_bytes = salt.encode('utf-8')
-        password_bytes = password.encode('utf-8')
-        
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt_bytes,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password_bytes))
-        return key
-    
+        return _derive_key_cached(password, salt)
+
+    @staticmethod
+    def key_cache_stats() -> dict:
+        info = _derive_key_cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+        }
+
     @staticmethod
     def generate_master_key() -> str:
         """
@@ -54,117 +156,217 @@ class FileEncryption:
         return f"{unique_id}{file_extension}.enc"
     
     @staticmethod
-    def encrypt_file(file_data: bytes, original_filename: str) -> Tuple[bytes, str, str, str]:
-        """
-        Encripta un archivo y retorna los datos encriptados junto con metadatos
-        
-        Returns:
-            Tuple[bytes, str, str, str]: (datos_encriptados, filename_encriptado, salt, hash_clave)
-        """
-        # Generar salt único para este archivo
-        salt = FileEncryption.generate_salt()
-        
-        # Generar clave de encriptación
+    def _derive_cipher_key(salt: str) -> bytes:
+        """Deriva la clave (base64, formato Fernet) a partir de la clave maestra y el salt"""
         master_key = FileEncryption.generate_master_key()
-        encryption_key = FileEncryption.generate_key_from_password(master_key, salt)
-        
-        # Crear cipher
-        fernet = Fernet(encryption_key)
-        
-        # Encriptar datos
-        encrypted_data = fernet.encrypt(file_data)
-        
-        # Generar nombre único para el archivo encriptado
-        encrypted_filename = FileEncryption.generate_unique_filename(original_filename)
-        
-        # Generar hash de la clave para almacenar (sin revelar la clave real)
-        key_hash = hashlib.sha256(encryption_key).hexdigest()
-        
-        return encrypted_data, encrypted_filename, salt, key_hash
-    
+        return FileEncryption.generate_key_from_password(master_key, salt)
+
     @staticmethod
-    def decrypt_file(encrypted_data: bytes, salt: str, key_hash: str) -> bytes:
-        """
-        Desencripta un archivo usando el salt y verificando el hash de la clave
-        
-        Args:
-            encrypted_data: Datos encriptados del archivo
-            salt: Salt usado en la encriptación
-            key_hash: Hash de la clave para verificación
-            
-        Returns:
-            bytes: Datos desencriptados del archivo
-            
-        Raises:
-            ValueError: Si la clave no coincide o hay error en desencriptación
-        """
-        try:
-            # Regenerar la clave usando el salt
-            master_key = FileEncryption.generate_master_key()
-            encryption_key = FileEncryption.generate_key_from_password(master_key, salt)
-            
-            # Verificar que la clave sea correcta comparando hashes
-            generated_key_hash = hashlib.sha256(encryption_key).hexdigest()
-            if generated_key_hash != key_hash:
-                raise ValueError("Clave de encriptación inválida")
-            
-            # Crear cipher y desencriptar
-            fernet = Fernet(encryption_key)
-            decrypted_data = fernet.decrypt(encrypted_data)
-            
-            return decrypted_data
-            
-        except Exception as e:
-            raise ValueError(f"Error al desencriptar archivo: {str(e)}")
-    
+    def _verified_key(salt: str, key_hash: str) -> bytes:
+        """Deriva la clave y verifica que coincida con el hash almacenado"""
+        encryption_key = FileEncryption._derive_cipher_key(salt)
+        if hashlib.sha256(encryption_key).hexdigest() != key_hash:
+            raise ValueError("Clave de encriptación inválida")
+        return encryption_key
+
     @staticmethod
-    def encrypt_file_stream(input_stream: BinaryIO, output_path: str, original_filename: str) -> Tuple[str, str, str]:
-        """
-        Encripta un archivo desde un stream y lo guarda en el sistema de archivos
-        
-        Returns:
-            Tuple[str, str, str]: (filename_encriptado, salt, hash_clave)
-        """
-        # Leer datos del stream
-        file_data = input_stream.read()
-        
-        # Encriptar
-        encrypted_data, encrypted_filename, salt, key_hash = FileEncryption.encrypt_file(
-            file_data, original_filename
+    def _read_exact(stream: BinaryIO, size: int) -> bytes:
+        """Lee hasta `size` bytes (menos solo al llegar al final del stream)"""
+        parts = []
+        remaining = size
+        while remaining > 0:
+            data = stream.read(remaining)
+            if not data:
+                break
+            parts.append(data)
+            remaining -= len(data)
+        return b"".join(parts)
+
+
+class EncryptedFileReader:
+    """
+    Lector de un archivo encriptado en disco.
+
+    Al abrirlo se verifica la clave y se lee la cabecera, de modo que los
+    errores aparecen antes de empezar a enviar datos. Después los segmentos se
+    desencriptan de a uno con `iter_chunks`. Los archivos Fernet heredados se
+    desencriptan completos al abrir (el formato no permite otra cosa).
+    """
+
+    def __init__(self, file_path: str, salt: str, key_hash: str):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Archivo encriptado no encontrado: {file_path}")
+
+        encryption_key = FileEncryption._verified_key(salt, key_hash)
+        total_size = os.path.getsize(file_path)
+        self._file = open(file_path, 'rb')
+        try:
+            self._header = FileEncryption._read_exact(self._file, ChunkedFormat.HEADER_SIZE)
+            self.is_chunked = ChunkedFormat.is_chunked(self._header)
+            if self.is_chunked:
+                self.layout = ChunkedFormat.parse_header(self._header, total_size)
+                self.plaintext_size = self.layout.plaintext_size
+                self._aesgcm = AESGCM(base64.urlsafe_b64decode(encryption_key))
+                self._legacy_data = None
+            else:
+                token = self._header + self._file.read()
+                self._legacy_data = Fernet(encryption_key).decrypt(token)
+                self.layout = None
+                self.plaintext_size = len(self._legacy_data)
+                self._file.close()
+        except InvalidToken:
+            self.close()
+            raise ValueError("Error al desencriptar archivo: token Fernet inválido")
+        except Exception:
+            self.close()
+            raise
+
+    def read_chunk(self, index: int) -> bytes:
+        """Lee y desencripta el segmento `index` (formato segmentado)"""
+        self._file.seek(self.layout.chunk_offset(index))
+        ciphertext = FileEncryption._read_exact(
+            self._file, self.layout.encrypted_chunk_length(index)
         )
-        
-        # Crear directorio si no existe
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Escribir archivo encriptado
-        full_path = os.path.join(output_path, encrypted_filename)
-        with open(full_path, 'wb') as f:
-            f.write(encrypted_data)
-        
-        return encrypted_filename, salt, key_hash
-    
-    @staticmethod
-    def decrypt_file_from_disk(file_path: str, salt: str, key_hash: str) -> bytes:
+        try:
+            return self._aesgcm.decrypt(
+                ChunkedFormat.nonce(self._header, index),
+                ciphertext,
+                ChunkedFormat.aad(self._header, index, index == self.layout.chunk_count - 1),
+            )
+        except InvalidTag:
+            raise ValueError(
+                f"Error al desencriptar archivo: segmento {index} corrupto o alterado"
+            )
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Genera el contenido en claro segmento a segmento"""
+        if not self.is_chunked:
+            for offset in range(0, self.plaintext_size, CHUNK_SIZE):
+                yield self._legacy_data[offset : offset + CHUNK_SIZE]
+            return
+
+        for index in range(self.layout.chunk_count):
+            chunk = self.read_chunk(index)
+            if chunk:
+                yield chunk
+
+    def iter_range(self, start: int, end: int) -> Iterator[bytes]:
         """
-        Desencripta un archivo desde el disco
-        
-        Args:
-            file_path: Ruta completa al archivo encriptado
-            salt: Salt usado en la encriptación
-            key_hash: Hash de la clave para verificación
-            
-        Returns:
-            bytes: Datos desencriptados del archivo
+        Genera solo los bytes [start, end] (inclusive) del contenido en claro,
+        desencriptando únicamente los segmentos que cubren ese rango.
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Archivo encriptado no encontrado: {file_path}")
-        
-        # Leer archivo encriptado
-        with open(file_path, 'rb') as f:
-            encrypted_data = f.read()
-        
-        # Desencriptar y retornar
-        return FileEncryption.decrypt_file(encrypted_data, salt, key_hash)
+        if not self.is_chunked:
+            for offset in range(start, end + 1, CHUNK_SIZE):
+                yield self._legacy_data[offset : min(offset + CHUNK_SIZE, end + 1)]
+            return
+
+        chunk_size = self.layout.chunk_size
+        for index in range(start // chunk_size, end // chunk_size + 1):
+            chunk = self.read_chunk(index)
+            chunk_start = index * chunk_size
+            piece = chunk[max(0, start - chunk_start) : end + 1 - chunk_start]
+            if piece:
+                yield piece
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        self._legacy_data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EncryptedFileWriter:
+    """
+    Escritor incremental del formato segmentado.
+
+    Recibe el contenido en claro con `write` en bloques de cualquier tamaño,
+    cifra cada segmento completo apenas se sabe que no es el último y calcula
+    el SHA-256 del contenido en el camino. `finish` escribe el segmento final y
+    sincroniza el archivo a disco; ante un error `abort` elimina el archivo.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.salt = FileEncryption.generate_salt()
+        encryption_key = FileEncryption._derive_cipher_key(self.salt)
+        self.key_hash = hashlib.sha256(encryption_key).hexdigest()
+        self.plaintext_size = 0
+        self._aesgcm = AESGCM(base64.urlsafe_b64decode(encryption_key))
+        self._header = ChunkedFormat.build_header(
+            CHUNK_SIZE, os.urandom(ChunkedFormat.NONCE_PREFIX_SIZE)
+        )
+        self._sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+        self._index = 0
+        self._finished = False
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        self._file = open(file_path, 'wb')
+        self._file.write(self._header)
+
+    @property
+    def content_sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    def _write_segment(self, plaintext: bytes, is_final: bool):
+        self._file.write(
+            self._aesgcm.encrypt(
+                ChunkedFormat.nonce(self._header, self._index),
+                plaintext,
+                ChunkedFormat.aad(self._header, self._index, is_final),
+            )
+        )
+        self._index += 1
+
+    def write(self, data: bytes):
+        self._sha256.update(data)
+        self.plaintext_size += len(data)
+        self._buffer += data
+        # Se retiene siempre un segmento: hasta ver más datos no se sabe si es el último
+        while len(self._buffer) > CHUNK_SIZE:
+            self._write_segment(bytes(self._buffer[:CHUNK_SIZE]), False)
+            del self._buffer[:CHUNK_SIZE]
+
+    def write_stream(self, stream: BinaryIO):
+        """Cifra todo el contenido restante de `stream`"""
+        for block in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            self.write(block)
+
+    def finish(self) -> str:
+        """Escribe el último segmento, sincroniza a disco y retorna el SHA-256 en claro"""
+        if not self._finished:
+            self._write_segment(bytes(self._buffer), True)
+            self._buffer = bytearray()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._finished = True
+        return self.content_sha256
+
+    def abort(self):
+        self._file.close()
+        self._finished = True
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.abort()
+        elif not self._finished:
+            self.finish()
+
+
+class FileTooLargeError(ValueError):
+    """El archivo supera FileValidator.MAX_FILE_SIZE"""
+
 
 # Funciones de utilidad para validar tipos de archivo
 class FileValidator:
@@ -189,6 +391,17 @@ class FileValidator:
     }
     
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+
+    # Bytes iniciales que se inspeccionan para detectar el tipo real
+    SNIFF_SIZE = 1024
+    MAGIC_SIGNATURES = [
+        (b'%PDF-', 'application/pdf'),
+        (b'\xff\xd8\xff', 'image/jpeg'),
+        (b'\x89PNG\r\n\x1a\n', 'image/png'),
+        (b'GIF87a', 'image/gif'),
+        (b'GIF89a', 'image/gif'),
+        (b'BM', 'image/bmp'),
+    ]
     
     @staticmethod
     def validate_file_type(filename: str, mime_type: str) -> str:
@@ -221,10 +434,44 @@ class FileValidator:
             bool: True si el tamaño es válido
             
         Raises:
-            ValueError: Si el archivo es demasiado grande
+            FileTooLargeError: Si el archivo es demasiado grande
         """
         if file_size > FileValidator.MAX_FILE_SIZE:
             max_size_mb = FileValidator.MAX_FILE_SIZE / (1024 * 1024)
-            raise ValueError(f"Archivo demasiado grande. Máximo permitido: {max_size_mb}MB")
+            raise FileTooLargeError(f"Archivo demasiado grande. Máximo permitido: {max_size_mb}MB")
         
-        return True
\ No newline at end of file
+        return True
+
+    @staticmethod
+    def sniff_mime_type(head: bytes) -> Optional[str]:
+        """
+        Detecta el tipo MIME real a partir de los primeros bytes del contenido
+        (firmas "magic"); None si no coincide con ningún tipo permitido.
+        """
+        for signature, mime_type in FileValidator.MAGIC_SIGNATURES:
+            if head.startswith(signature):
+                return mime_type
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            return 'image/webp'
+        # La especificación PDF admite basura antes de la cabecera %PDF-
+        if b'%PDF-' in head[:FileValidator.SNIFF_SIZE]:
+            return 'application/pdf'
+        return None
+
+    @staticmethod
+    def validate_content(file_type: str, head: bytes) -> str:
+        """
+        Verifica que el contenido corresponda a la categoría declarada
+
+        Returns:
+            str: Tipo MIME detectado en el contenido
+
+        Raises:
+            ValueError: Si el contenido no es de un tipo permitido o no coincide
+        """
+        mime_type = FileValidator.sniff_mime_type(head)
+        if mime_type is None or mime_type not in FileValidator.ALLOWED_MIME_TYPES[file_type]:
+            raise ValueError(
+                f"El contenido del archivo no corresponde a un tipo {file_type} permitido"
+            )
+        return mime_type
\ No newline at end of file
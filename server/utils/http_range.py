@@ -0,0 +1,55 @@
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiableError(ValueError):
+    """El rango pedido no se solapa con el contenido (HTTP 416)"""
+
+    def __init__(self, total_size: int):
+        super().__init__(f"Rango no satisfacible para un contenido de {total_size} bytes")
+        self.total_size = total_size
+
+
+def parse_range_header(range_header: Optional[str], total_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta un header `Range: bytes=...` (RFC 9110) para un único rango.
+
+    Returns:
+        (inicio, fin) inclusivos, o None si no hay header, si es de otra unidad,
+        si tiene varios rangos o si está mal formado (se responde el contenido completo).
+
+    Raises:
+        RangeNotSatisfiableError: Si el rango es válido pero queda fuera del contenido
+    """
+    if not range_header:
+        return None
+
+    unit, _, spec = range_header.strip().partition("=")
+    if unit.strip().lower() != "bytes" or not spec or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if first == "":
+            # Rango sufijo: los últimos N bytes
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiableError(total_size)
+            start = max(0, total_size - suffix)
+            end = total_size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else total_size - 1
+            if last and end < start:
+                return None
+    except ValueError as e:
+        if isinstance(e, RangeNotSatisfiableError):
+            raise
+        return None
+
+    if start >= total_size or total_size == 0:
+        raise RangeNotSatisfiableError(total_size)
+
+    return start, min(end, total_size - 1)
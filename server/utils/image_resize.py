@@ -1,4 +1,5 @@
 import io
+import os
 from typing import BinaryIO
 from PIL import Image
 
@@ -29,3 +30,18 @@ def resize_image_stream(file_stream: BinaryIO, mime_type: str) -> BinaryIO:
     output_buffer.seek(0)
 
     return output_buffer
+
+
+def resize_image_file(source_path: str, target_path: str, mime_type: str) -> int:
+    """
+    Redimensiona la imagen de `source_path` y la guarda en `target_path`.
+    Trabaja con rutas para no copiar el contenido entre procesos.
+
+    Returns:
+        int: Tamaño en bytes de la imagen resultante
+    """
+    with open(source_path, "rb") as source:
+        resized = resize_image_stream(source, mime_type)
+    with open(target_path, "wb") as target:
+        target.write(resized.getbuffer())
+    return os.path.getsize(target_path)
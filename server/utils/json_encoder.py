@@ -51,6 +51,9 @@ class CustomJSONEncoder(json.JSONEncoder):
         
         # Serializar columnas de la tabla
         for column in obj.__table__.columns:
+            # Columnas internas (p. ej. derivadas de búsqueda)
+            if column.info.get("hidden"):
+                continue
             value = getattr(obj, column.name)
             # Ya estamos manejando la conversión en el método default
             data[column.name] = value
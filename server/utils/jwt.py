@@ -3,6 +3,9 @@ import jwt
 from fastapi import  HTTPException, status
 from jwt.exceptions import PyJWTError
 from config.config import secret_key, hash_algorithm
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def create_access_token(data: dict, expires_delta:timedelta | None = None): 
@@ -22,20 +25,19 @@ def decode_access_token(token: str) -> dict:
         
         # Verificar que los campos necesarios existan
         if "sub" not in payload:
-            print("Error: 'sub' no está presente en el payload del token")
+            logger.warning("'sub' no está presente en el payload del token")
         if "user_id" not in payload:
-            print("Error: 'user_id' no está presente en el payload del token")
+            logger.warning("'user_id' no está presente en el payload del token")
             
         token_data = {
             "username": payload.get("sub"),
             "user_id": payload.get("user_id")
         }
         
-        print(f"Token decodificado correctamente. Payload: {token_data}")
         return token_data
     except PyJWTError as jwt_err:
-        print(f"Error al decodificar el token: {jwt_err}")
+        logger.info(f"Error al decodificar el token: {jwt_err}")
         return False
     except Exception as e:
-        print(f"Error inesperado al decodificar el token: {e}")
+        logger.error(f"Error inesperado al decodificar el token: {e}")
         return False
@@ -0,0 +1,93 @@
+import threading
+from collections import deque
+from typing import Deque
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LatencyStats:
+    """
+    Ventana acotada de muestras de latencia (en segundos) con percentiles.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = sorted(self._samples)
+            count = self.count
+        return {
+            "count": count,
+            "avg_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+        }
+
+
+class TransferMetrics:
+    """
+    Métricas de transferencias en streaming (descargas de archivos).
+
+    - ttfb: tiempo hasta que el primer segmento en claro está listo para enviarse.
+    - bytes_in_flight: bytes desencriptados que todavía no fueron entregados al
+      servidor ASGI (memoria retenida por las transferencias activas).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ttfb = LatencyStats()
+        self.active = 0
+        self.bytes_in_flight = 0
+        self.bytes_sent = 0
+        self.completed = 0
+        self.aborted = 0
+
+    def started(self) -> None:
+        with self._lock:
+            self.active += 1
+
+    def finished(self, completed: bool) -> None:
+        with self._lock:
+            self.active -= 1
+            if completed:
+                self.completed += 1
+            else:
+                self.aborted += 1
+
+    def chunk_ready(self, size: int) -> None:
+        with self._lock:
+            self.bytes_in_flight += size
+
+    def chunk_sent(self, size: int) -> None:
+        with self._lock:
+            self.bytes_in_flight -= size
+            self.bytes_sent += size
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {
+                "active": self.active,
+                "bytes_in_flight": self.bytes_in_flight,
+                "bytes_sent": self.bytes_sent,
+                "completed": self.completed,
+                "aborted": self.aborted,
+            }
+        data["ttfb"] = self.ttfb.snapshot()
+        return data
+
+
+download_metrics = TransferMetrics()
@@ -0,0 +1,155 @@
+"""
+Paginación por cursor (keyset).
+
+En lugar de OFFSET (que recorre y descarta todas las filas de las páginas
+anteriores), cada página continúa desde la última fila de la anterior con una
+condición sobre las columnas de orden, que un índice compuesto resuelve con un
+seek. El cursor es opaco para el cliente: base64 de los valores de orden de la
+última fila entregada.
+
+Las columnas de orden deben identificar la fila de forma única (terminar en la
+clave primaria) y no ser nulas.
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+# Headers con los que los listados informan el cursor siguiente y el total
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no es válido para este listado"""
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _load_value(column, value: Any) -> Any:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_dump_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """
+    Raises:
+        InvalidCursorError: Si el cursor está mal formado o no corresponde a las columnas
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cantidad de valores")
+        return [_load_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+
+def _after(columns: Sequence, values: Sequence[Any], descending: bool):
+    """
+    Condición "viene después de `values`" en el orden dado, expandida como
+    (a < x) OR (a = x AND b < y) ..., que los optimizadores resuelven como rango
+    sobre el índice compuesto (a diferencia de la comparación de tuplas en MySQL).
+    """
+    conditions = []
+    for i, column in enumerate(columns):
+        step = column < values[i] if descending else column > values[i]
+        conditions.append(and_(*[columns[j] == values[j] for j in range(i)], step))
+    return or_(*conditions)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    order_columns: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    with_total: bool = False,
+    rows: bool = False,
+) -> Page:
+    """
+    Ejecuta una página de `stmt` ordenada por `order_columns`.
+
+    Args:
+        stmt: Consulta con filtros y opciones de carga, sin ORDER BY ni LIMIT.
+            Las colecciones deben cargarse con selectinload (un joinedload de
+            colección rompe el LIMIT).
+        order_columns: Columnas de orden; la última debe ser la clave primaria.
+        limit: Tamaño de página.
+        cursor: Cursor devuelto por la página anterior (None para la primera).
+        with_total: Si además se cuenta el total de filas que cumplen los
+            filtros (COUNT, solo a pedido).
+        rows: Si `stmt` selecciona columnas sueltas (proyección) en lugar de
+            una entidad: los items son las filas, que deben incluir las
+            columnas de orden.
+
+    Raises:
+        InvalidCursorError: Si el cursor no es válido
+    """
+    total = None
+    if with_total:
+        count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+        total = (await db.execute(count_stmt)).scalar() or 0
+
+    page_stmt = stmt
+    if cursor:
+        page_stmt = page_stmt.where(
+            _after(order_columns, decode_cursor(cursor, order_columns), descending)
+        )
+    ordering = [column.desc() if descending else column.asc() for column in order_columns]
+    page_stmt = page_stmt.order_by(*ordering).limit(limit + 1)
+
+    result = await db.execute(page_stmt)
+    items = list(result.all() if rows else result.scalars().unique().all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_columns])
+    return Page(items, next_cursor, total)
+
+
+def page_headers(page: Page) -> Dict[str, str]:
+    """Headers con el cursor siguiente y el total (si se pidió)"""
+    headers = {}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total is not None:
+        headers[TOTAL_COUNT_HEADER] = str(page.total)
+    return headers
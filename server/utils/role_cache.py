@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Union
+
+from config.config import role_cache_max_size, role_cache_ttl_seconds
+
+
+class CachedRole(NamedTuple):
+    role_name: Optional[str]
+    active: bool
+
+
+class RoleCache:
+    """
+    Cache LRU con expiración (TTL) para la resolución de roles por usuario.
+
+    Evita consultar users + roles en cada verificación de permisos. Las entradas
+    se invalidan explícitamente al editar o eliminar un usuario y, en cualquier
+    caso, expiran tras `ttl_seconds` (cubre el caso de varios workers).
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[CachedRole, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(user_id: Union[str, uuid.UUID]) -> str:
+        return str(user_id)
+
+    def get(self, user_id: Union[str, uuid.UUID]) -> Optional[CachedRole]:
+        key = self._key(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self, user_id: Union[str, uuid.UUID], role_name: Optional[str], active: bool = True
+    ) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+
+        key = self._key(user_id)
+        with self._lock:
+            self._entries[key] = (
+                CachedRole(role_name=role_name, active=active),
+                time.monotonic() + self.ttl_seconds,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: Union[str, uuid.UUID]) -> None:
+        with self._lock:
+            if self._entries.pop(self._key(user_id), None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Instancia única compartida por las dependencias de roles y el servicio de usuarios
+role_cache = RoleCache(max_size=role_cache_max_size, ttl_seconds=role_cache_ttl_seconds)
@@ -0,0 +1,238 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_SPACES = re.compile(r"\s+")
+_NON_WORD = re.compile(r"[^A-Z0-9]+")
+
+# Largo de las columnas normalizadas de nombres y apellidos (mayúsculas como
+# "ß" -> "SS" pueden alargar el texto original)
+NORMALIZED_NAME_LENGTH = 100
+
+# InnoDB no indexa palabras de menos de 3 caracteres (innodb_ft_min_token_size)
+# ni sus stopwords por defecto: exigirlas en modo booleano vaciaría el resultado
+FULLTEXT_MIN_WORD = 3
+FULLTEXT_STOPWORDS = {
+    "ABOUT", "ARE", "COM", "FOR", "FROM", "HOW", "THAT", "THE", "THIS",
+    "WAS", "WHAT", "WHEN", "WHERE", "WHO", "WILL", "WITH", "UND", "WWW",
+}
+
+_PHRASE = re.compile(r'"([^"]*)"')
+
+# Los trigramas se guardan como palabras de 4 caracteres ("q" + trigrama) para
+# superar el tamaño mínimo de token de FULLTEXT y no chocar con las stopwords
+TRIGRAM_MARKER = "q"
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Mayúsculas, sin acentos y con los espacios colapsados ("  Pérez " -> "PEREZ")"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _SPACES.sub(" ", stripped.upper()).strip()
+
+
+def search_words(value: Optional[str]) -> List[str]:
+    """Palabras normalizadas (solo letras y dígitos) de un texto"""
+    return [word for word in _NON_WORD.split(normalize_text(value)) if word]
+
+
+def fulltext_words(words: List[str]) -> List[str]:
+    """Palabras que un índice FULLTEXT de InnoDB puede exigir"""
+    return [
+        word
+        for word in words
+        if len(word) >= FULLTEXT_MIN_WORD and word not in FULLTEXT_STOPWORDS
+    ]
+
+
+def parse_search_query(value: Optional[str]) -> Tuple[List[str], List[List[str]]]:
+    """
+    Separa una búsqueda en palabras sueltas y frases entre comillas
+    ('robo "calle falsa"' -> ["ROBO"], [["CALLE", "FALSA"]]), normalizadas.
+    Una frase de una sola palabra cuenta como palabra suelta.
+    """
+    words: List[str] = []
+    phrases: List[List[str]] = []
+    for index, part in enumerate(_PHRASE.split(value or "")):
+        part_words = search_words(part)
+        if index % 2 == 1 and len(part_words) > 1:
+            phrases.append(part_words)
+        else:
+            words += part_words
+    return words, phrases
+
+
+def _normalized_with_offsets(value: str) -> Tuple[str, List[int]]:
+    """Texto normalizado (sin colapsar espacios) y la posición original de cada carácter"""
+    chars: List[str] = []
+    offsets: List[int] = []
+    for index, char in enumerate(value):
+        decomposed = unicodedata.normalize("NFKD", char)
+        for normalized in "".join(c for c in decomposed if not unicodedata.combining(c)).upper():
+            chars.append(normalized)
+            offsets.append(index)
+    return "".join(chars), offsets
+
+
+def highlight_snippets(
+    fields: Dict[str, Optional[str]],
+    words: List[str],
+    phrases: List[List[str]],
+    width: int = 160,
+    max_snippets: int = 3,
+) -> List[Dict]:
+    """
+    Fragmentos de los campos que contienen la búsqueda, con las posiciones
+    [inicio, fin) de cada coincidencia dentro del fragmento (el cliente las
+    resalta; no se devuelve HTML). Las palabras coinciden por prefijo, sin
+    distinguir acentos ni mayúsculas, igual que el índice.
+    """
+    terms = [r"[^A-Z0-9]+".join(map(re.escape, phrase)) for phrase in phrases]
+    terms += [re.escape(word) for word in words]
+    if not terms:
+        return []
+    pattern = re.compile(
+        r"(?<![A-Z0-9])(?:" + "|".join(sorted(terms, key=len, reverse=True)) + ")"
+    )
+
+    snippets = []
+    for field, value in fields.items():
+        if not value:
+            continue
+        normalized, offsets = _normalized_with_offsets(value)
+        matches = [
+            (offsets[m.start()], offsets[m.end() - 1] + 1)
+            for m in pattern.finditer(normalized)
+        ]
+        if not matches:
+            continue
+
+        start = max(0, matches[0][0] - width // 4)
+        if start > 0:
+            space = value.find(" ", start, matches[0][0])
+            start = space + 1 if space != -1 else start
+        end = min(len(value), start + width)
+        if end < len(value):
+            space = value.rfind(" ", matches[0][1], end)
+            end = space if space != -1 else end
+
+        prefix = "…" if start > 0 else ""
+        text = prefix + value[start:end] + ("…" if end < len(value) else "")
+        highlights = [
+            [match_start - start + len(prefix), min(match_end, end) - start + len(prefix)]
+            for match_start, match_end in matches
+            if match_start >= start and match_start < end
+        ]
+        snippets.append({"field": field, "text": text, "highlights": highlights})
+        if len(snippets) >= max_snippets:
+            break
+    return snippets
+
+
+def word_trigrams(word: str) -> Set[str]:
+    padded = f"_{word}_"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_tokens(words: Iterable[str]) -> List[str]:
+    """Tokens de trigramas para la columna indexada con FULLTEXT"""
+    tokens = set()
+    for word in words:
+        tokens.update(TRIGRAM_MARKER + trigram for trigram in word_trigrams(word))
+    return sorted(tokens)
+
+
+def infix_trigram_tokens(words: Iterable[str]) -> List[str]:
+    """
+    Tokens de los trigramas interiores (sin los bordes de palabra): los tiene
+    toda palabra que contenga a cada una de `words` en cualquier posición.
+    """
+    tokens = set()
+    for word in words:
+        tokens.update(TRIGRAM_MARKER + word[i : i + 3] for i in range(len(word) - 2))
+    return sorted(tokens)
+
+
+def word_similarity(query_words: List[str], candidate_words: List[str]) -> float:
+    """
+    Similitud difusa entre la búsqueda y un candidato: para cada palabra buscada,
+    el mejor índice de Jaccard de trigramas contra las palabras del candidato
+    (o 1.0 si alguna empieza con ella); se promedia sobre las palabras buscadas.
+    """
+    if not query_words or not candidate_words:
+        return 0.0
+    candidate_trigrams = [(word, word_trigrams(word)) for word in candidate_words]
+    total = 0.0
+    for query_word in query_words:
+        query_trigrams = word_trigrams(query_word)
+        best = 0.0
+        for word, trigrams in candidate_trigrams:
+            if word.startswith(query_word):
+                best = 1.0
+                break
+            union = len(query_trigrams | trigrams)
+            if union:
+                best = max(best, len(query_trigrams & trigrams) / union)
+        total += best
+    return total / len(query_words)
+
+
+# Columnas de `persons` que calcula person_search_columns
+PERSON_SEARCH_COLUMNS = ["search_text", "search_trigrams", "names_normalized", "lastnames_normalized"]
+
+
+def person_search_columns(
+    identification: Optional[str] = None,
+    names: Optional[str] = None,
+    lastnames: Optional[str] = None,
+    address: Optional[str] = None,
+    country: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Columnas derivadas de búsqueda de una persona (mantener en cada escritura):
+
+    - search_text: palabras normalizadas de todos los campos buscables
+      (FULLTEXT en modo booleano, búsqueda por prefijo).
+    - search_trigrams: trigramas de nombres y apellidos (FULLTEXT en lenguaje
+      natural, búsqueda difusa).
+    - names_normalized / lastnames_normalized: nombres y apellidos
+      normalizados (índice B-tree, búsqueda exacta y por prefijo).
+    """
+    name_words = search_words(names) + search_words(lastnames)
+    words = (
+        search_words(identification)
+        + name_words
+        + search_words(address)
+        + search_words(country)
+    )
+    return {
+        "search_text": " ".join(words),
+        "search_trigrams": " ".join(trigram_tokens(name_words)),
+        "names_normalized": normalize_text(names)[:NORMALIZED_NAME_LENGTH],
+        "lastnames_normalized": normalize_text(lastnames)[:NORMALIZED_NAME_LENGTH],
+    }
+
+
+# Campos de `records` que cubre records.search_text
+RECORD_SEARCH_FIELDS = ["title", "type_record", "content", "observations"]
+
+
+def record_search_text(
+    title: Optional[str] = None,
+    type_record: Optional[str] = None,
+    content: Optional[str] = None,
+    observations: Optional[str] = None,
+) -> str:
+    """
+    Columna derivada de búsqueda de un antecedente (mantener en cada
+    escritura): palabras normalizadas de título, tipo, contenido y
+    observaciones, en ese orden (FULLTEXT en modo booleano).
+    """
+    return " ".join(
+        search_words(title)
+        + search_words(type_record)
+        + search_words(content)
+        + search_words(observations)
+    )